@@ -0,0 +1,8 @@
+"""
+Benchmarks de los servicios de turnos y solicitudes sobre datos sembrados con seed_load.
+
+    python -m benchmarks --escalas chica,mediana --salida resultados.json
+    python -m benchmarks --comparar benchmarks/base.json
+
+Ver benchmarks/README.md.
+"""
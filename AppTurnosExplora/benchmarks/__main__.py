@@ -0,0 +1,77 @@
+"""
+python -m benchmarks [--escalas chica,mediana] [--repeticiones 50] [--salida r.json]
+                     [--guardar-base benchmarks/base.json] [--comparar benchmarks/base.json]
+
+Corre sobre una base de datos de pruebas (test_<NAME>, como manage.py test) que se crea y se
+destruye en cada ejecución: la base de datos configurada no se toca. Con --comparar sale con
+código 1 si hay regresiones.
+"""
+import argparse
+import json
+import os
+import sys
+
+
+def main(argv=None):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+    from .comparacion import comparar, formatear
+    from .ejecucion import ESCALAS, ejecutar
+
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks de servicios de turnos y solicitudes')
+    parser.add_argument('--escalas', default='chica,mediana', help=f'Separadas por coma: {", ".join(ESCALAS)}')
+    parser.add_argument('--repeticiones', type=int, default=50)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--caso', help='Solo los casos cuyo nombre contiene este texto')
+    parser.add_argument('--salida', help='Archivo JSON del reporte (por defecto se imprime)')
+    parser.add_argument('--guardar-base', help='Además guarda el reporte como línea base en este archivo')
+    parser.add_argument('--comparar', help='Línea base JSON contra la que comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help='Aumento relativo de latencia y memoria admitido al comparar (0.25 = 25%%)')
+    opciones = parser.parse_args(argv)
+
+    nombres = [nombre.strip() for nombre in opciones.escalas.split(',') if nombre.strip()]
+    desconocidas = [nombre for nombre in nombres if nombre not in ESCALAS]
+    if desconocidas or opciones.repeticiones < 1:
+        parser.error(f'Escalas desconocidas: {", ".join(desconocidas)}' if desconocidas
+                     else '--repeticiones debe ser positivo')
+    base = None
+    if opciones.comparar:
+        with open(opciones.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+
+    setup_test_environment(debug=False)
+    bases_de_datos = setup_databases(verbosity=0, interactive=False)
+    try:
+        reporte = ejecutar(
+            {nombre: ESCALAS[nombre] for nombre in nombres}, opciones.repeticiones, opciones.semilla,
+            opciones.caso, progreso=lambda linea: print(linea, file=sys.stderr),
+        )
+    finally:
+        teardown_databases(bases_de_datos, verbosity=0)
+        teardown_test_environment()
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    for destino in (opciones.salida, opciones.guardar_base):
+        if destino:
+            with open(destino, 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+    if not opciones.salida:
+        print(texto)
+
+    if base is not None:
+        diferencias = comparar(base, reporte, opciones.tolerancia)
+        print(formatear(diferencias), file=sys.stderr)
+        regresiones = [d for d in diferencias if d.regresion]
+        if regresiones:
+            print(f'{len(regresiones)} regresiones', file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from empleados.models import Empleado
+from solicitudes.models import CambioPermanenteDetalle, SolicitudCambio, TipoSolicitudCambio
+from solicitudes.services.solicitud_factory import SolicitudFactory
+from solicitudes.services.solicitud_service import SolicitudService
+from solicitudes.services.strategies import (
+    CambioTurnoStrategy, CTPermanenteStrategy, DFDSStrategy, DobladaStrategy
+)
+from turnos.management.commands.seed_load import PREFIJO
+from turnos.services.roster_service import RosterService
+from turnos.services.turno_service import TurnoService
+
+# Estrategia de cada tipo de solicitud que se valida (los nombres que usa la vista de creación)
+ESTRATEGIAS = {
+    'Cambio Turno': CambioTurnoStrategy,
+    'DOBLADA': DobladaStrategy,
+    'D FDS': DFDSStrategy,
+    'CT PERMANENTE': CTPermanenteStrategy,
+}
+# Días del periodo de los cambios permanentes aplicados
+DIAS_CAMBIO_PERMANENTE = 90
+
+
+def limpiar_cache():
+    """Cada repetición mide la resolución, no un acierto de JornadaCache"""
+    caches[getattr(settings, 'TURNOS_CACHE_ALIAS', 'default')].clear()
+
+
+class Caso:
+    """
+    Una función medida. `argumentos(entrada)` arma los argumentos de la llamada a partir de
+    una entrada de Datos.entradas (fuera del tiempo medido); `antes()` corre antes de cada
+    repetición. Los casos que escriben (`escribe=True`) se revierten después de cada llamada.
+    """
+
+    def __init__(self, nombre, funcion, argumentos, escribe=False, antes=limpiar_cache):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.argumentos = argumentos
+        self.escribe = escribe
+        self.antes = antes
+
+
+class Datos:
+    """Entradas al azar (pero reproducibles) sobre los exploradores sembrados por seed_load"""
+
+    def __init__(self, semilla):
+        self.azar = random.Random(semilla)
+        self.hoy = timezone.now().date()
+        self.exploradores = list(
+            Empleado.objects.filter(user__username__startswith=PREFIJO, activo=True).order_by('id')
+        )
+        self.tipos = {
+            nombre: TipoSolicitudCambio.objects.get_or_create(nombre=nombre, defaults={'activo': True})[0]
+            for nombre in ESTRATEGIAS
+        }
+        for nombre, estrategia in ESTRATEGIAS.items():
+            SolicitudFactory.register_strategy(nombre, estrategia)
+
+    def _pareja(self, fecha):
+        """Explorador y compañero de la jornada contraria en `fecha` (o cualquiera si no hay)"""
+        por_jornada = TurnoService.get_exploradores_por_jornada(str(fecha))
+        am = [e['id'] for e in por_jornada['am']]
+        pm = [e['id'] for e in por_jornada['pm']]
+        if am and pm:
+            ids = [self.azar.choice(am), self.azar.choice(pm)]
+            self.azar.shuffle(ids)
+        else:
+            ids = [e.id for e in self.azar.sample(self.exploradores, 2)]
+        por_id = {e.id: e for e in self.exploradores}
+        return por_id[ids[0]], por_id[ids[1]]
+
+    def entradas(self, cantidad):
+        """
+        `fecha` (lecturas) cae en el último semestre o el próximo mes; `futura` (solicitudes,
+        que no se aceptan con fecha pasada) en los próximos dos meses, con una pareja de
+        jornadas contrarias ese día
+        """
+        entradas = []
+        for _ in range(cantidad):
+            fecha = self.hoy + timedelta(days=self.azar.randint(-180, 30))
+            futura = self.hoy + timedelta(days=self.azar.randint(1, 60))
+            solicitante, receptor = self._pareja(futura)
+            entradas.append({
+                'fecha': fecha,
+                'fecha_str': fecha.isoformat(),
+                'futura': futura,
+                'futura_str': futura.isoformat(),
+                # El sábado de esa semana, para D FDS
+                'sabado_str': (futura + timedelta(days=(5 - futura.weekday()) % 7)).isoformat(),
+                'solicitante': solicitante,
+                'receptor': receptor,
+            })
+        return entradas
+
+
+def _datos_validacion(tipo, entrada):
+    datos = {
+        'explorador_solicitante': entrada['solicitante'],
+        'explorador_receptor': entrada['receptor'],
+        'fecha_cambio_turno': entrada['sabado_str'] if tipo == 'D FDS' else entrada['futura_str'],
+    }
+    if tipo == 'CT PERMANENTE':
+        datos['fecha_inicio'] = entrada['futura_str']
+        datos['fecha_fin'] = (entrada['futura'] + timedelta(days=DIAS_CAMBIO_PERMANENTE)).isoformat()
+    return datos
+
+
+def _solicitud_permanente(datos, entrada):
+    """Solicitud CT PERMANENTE pendiente con su detalle, lista para aplicar"""
+    solicitud = SolicitudCambio.objects.create(
+        explorador_solicitante=entrada['solicitante'],
+        explorador_receptor=entrada['receptor'],
+        tipo_cambio=datos.tipos['CT PERMANENTE'],
+        fecha_cambio_turno=entrada['futura'],
+        estado='pendiente',
+    )
+    CambioPermanenteDetalle.objects.create(
+        solicitud=solicitud,
+        fecha_inicio=entrada['futura'],
+        fecha_fin=entrada['futura'] + timedelta(days=DIAS_CAMBIO_PERMANENTE),
+    )
+    return (solicitud,)
+
+
+def _rango_con_roster(inicio, fin):
+    with override_settings(TURNOS_ROSTER_ACTIVO=True):
+        return TurnoService.get_exploradores_por_jornada_rango(inicio, fin)
+
+
+def _semana(entrada):
+    return entrada['fecha_str'], (entrada['fecha'] + timedelta(days=6)).isoformat()
+
+
+def _semana_en_horizonte(entrada):
+    """La semana de la entrada corrida para caer dentro del horizonte de RosterDia"""
+    desde, hasta = RosterService.get_horizonte()
+    inicio = min(max(entrada['fecha'], desde), hasta - timedelta(days=6))
+    return inicio.isoformat(), (inicio + timedelta(days=6)).isoformat()
+
+
+def casos(datos):
+    """Los casos medidos, en orden de reporte"""
+    lista = [
+        Caso('get_turno_explorador', SolicitudService.get_turno_explorador,
+             lambda e: (e['solicitante'].id, e['fecha_str'])),
+        Caso('get_empleados_jornada_contraria',
+             lambda fecha, empleado: list(SolicitudService.get_empleados_jornada_contraria(fecha, empleado)),
+             lambda e: (e['fecha_str'], e['solicitante'])),
+        Caso('get_exploradores_por_jornada_rango', TurnoService.get_exploradores_por_jornada_rango, _semana),
+        Caso('get_exploradores_por_jornada_rango[roster]', _rango_con_roster, _semana_en_horizonte),
+    ]
+    for tipo in ESTRATEGIAS:
+        lista.append(Caso(
+            f'validar_solicitud[{tipo}]', SolicitudFactory.validar_solicitud,
+            lambda e, tipo=tipo: (datos.tipos[tipo], _datos_validacion(tipo, e)),
+        ))
+    lista.append(Caso(
+        'CTPermanenteStrategy.aplicar_cambios', CTPermanenteStrategy().aplicar_cambios,
+        lambda e: _solicitud_permanente(datos, e), escribe=True,
+    ))
+    return lista
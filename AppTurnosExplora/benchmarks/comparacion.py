@@ -0,0 +1,47 @@
+from collections import namedtuple
+
+# Una métrica de un caso en una escala; `regresion` si empeoró más allá de la tolerancia
+Diferencia = namedtuple('Diferencia', ['escala', 'caso', 'metrica', 'base', 'actual', 'cambio', 'regresion'])
+
+# Métrica -> (ruta dentro del resultado de un caso, aumento absoluto mínimo para ser regresión).
+# Latencias y memoria toleran ruido relativo y por debajo del mínimo no cuentan (en casos de
+# microsegundos un 30 % es ruido); las consultas son deterministas y cualquier aumento cuenta
+METRICAS = {
+    'latencia_p50': ('latencia_ms', 'p50', 0.1),
+    'latencia_p95': ('latencia_ms', 'p95', 0.1),
+    'consultas': ('consultas', 'max', 0),
+    'memoria_p50': ('memoria_kib', 'p50', 4),
+}
+
+
+def comparar(base, actual, tolerancia=0.25):
+    """
+    Diferencias entre dos reportes de benchmarks.ejecucion.ejecutar, para cada caso presente
+    en ambos. `tolerancia` es el aumento relativo admitido en latencia y memoria (0.25 = 25 %).
+    """
+    diferencias = []
+    for escala, resultado in actual['escalas'].items():
+        casos_base = base['escalas'].get(escala, {}).get('casos', {})
+        for caso, metricas in resultado['casos'].items():
+            if caso not in casos_base:
+                continue
+            for metrica, (grupo, clave, minimo) in METRICAS.items():
+                valor_base = casos_base[caso][grupo][clave]
+                valor = metricas[grupo][clave]
+                cambio = (valor - valor_base) / valor_base if valor_base else None
+                regresion = valor - valor_base > minimo
+                if metrica != 'consultas':
+                    regresion = regresion and (cambio is None or cambio > tolerancia)
+                diferencias.append(Diferencia(escala, caso, metrica, valor_base, valor, cambio, regresion))
+    return diferencias
+
+
+def formatear(diferencias):
+    """Tabla de texto con una línea por métrica; las regresiones se marcan con '!'"""
+    lineas = []
+    for d in diferencias:
+        cambio = f'{d.cambio:+.1%}' if d.cambio is not None else '   n/d'
+        marca = '!' if d.regresion else ' '
+        lineas.append(f'{marca} {d.escala:8} {d.caso:45} {d.metrica:13} '
+                      f'{d.base:>11} -> {d.actual:>11}  {cambio:>8}')
+    return '\n'.join(lineas)
@@ -0,0 +1,67 @@
+import io
+import platform
+import subprocess
+from pathlib import Path
+
+import django
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from .casos import Datos, casos
+from .medicion import medir
+
+# Parámetros de seed_load de cada escala
+ESCALAS = {
+    'chica': {'exploradores': 50, 'solicitudes': 1000, 'anios': 1},
+    'mediana': {'exploradores': 200, 'solicitudes': 5000, 'anios': 2},
+    'grande': {'exploradores': 500, 'solicitudes': 20000, 'anios': 2},
+}
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(escalas, repeticiones=50, semilla=42, filtro=None, progreso=None):
+    """
+    Siembra cada escala con seed_load (borrando la anterior), mide los casos y devuelve el
+    reporte. `escalas` es {nombre: parámetros de seed_load}; `filtro` limita los casos a
+    los que contienen ese texto; `progreso(texto)` recibe una línea por caso medido.
+    """
+    reporte = {
+        'meta': {
+            'fecha': timezone.now().isoformat(timespec='seconds'),
+            'commit': _commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'motor': connection.vendor,
+            'repeticiones': repeticiones,
+            'semilla': semilla,
+        },
+        'escalas': {},
+    }
+    try:
+        for nombre, parametros in escalas.items():
+            call_command('seed_load', limpiar=True, semilla=semilla, stdout=io.StringIO(), **parametros)
+            datos = Datos(semilla)
+            entradas = datos.entradas(repeticiones)
+            resultados = {}
+            for caso in casos(datos):
+                if filtro and filtro not in caso.nombre:
+                    continue
+                resultados[caso.nombre] = medir(caso, entradas)
+                if progreso:
+                    latencia = resultados[caso.nombre]['latencia_ms']
+                    progreso(f'{nombre:8} {caso.nombre:45} p50 {latencia["p50"]:9.3f} ms  '
+                             f'p95 {latencia["p95"]:9.3f} ms  {resultados[caso.nombre]["consultas"]["max"]:>4} consultas')
+            reporte['escalas'][nombre] = {'parametros': parametros, 'casos': resultados}
+    finally:
+        call_command('seed_load', solo_limpiar=True, stdout=io.StringIO())
+    return reporte
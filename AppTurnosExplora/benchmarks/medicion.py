@@ -0,0 +1,109 @@
+import gc
+import statistics
+import tracemalloc
+from time import perf_counter
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Repeticiones instrumentadas (consultas y memoria): ambas mediciones alteran el tiempo,
+# así que se hacen en pasadas aparte y con menos repeticiones que la de latencia
+REPETICIONES_INSTRUMENTADAS = 5
+
+
+def percentil(valores, p):
+    """Percentil `p` (0-100) con interpolación lineal entre los dos valores más cercanos"""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return None
+    posicion = (len(ordenados) - 1) * p / 100
+    abajo = int(posicion)
+    arriba = min(abajo + 1, len(ordenados) - 1)
+    return ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posicion - abajo)
+
+
+def _resumen(valores, decimales):
+    return {
+        'min': round(min(valores), decimales),
+        'p50': round(percentil(valores, 50), decimales),
+        'p90': round(percentil(valores, 90), decimales),
+        'p95': round(percentil(valores, 95), decimales),
+        'p99': round(percentil(valores, 99), decimales),
+        'max': round(max(valores), decimales),
+        'media': round(statistics.fmean(valores), decimales),
+    }
+
+
+def _ejecutar(caso, entrada, medir):
+    """
+    Corre el caso una vez sobre `entrada` y devuelve lo que mida `medir(llamada)`.
+    Los casos que escriben corren dentro de una transacción que se revierte, así cada
+    repetición ve los mismos datos.
+    """
+    if not caso.escribe:
+        caso.antes()
+        return medir(lambda: caso.funcion(*caso.argumentos(entrada)))
+
+    from django.db import transaction
+    with transaction.atomic():
+        caso.antes()
+        argumentos = caso.argumentos(entrada)
+        resultado = medir(lambda: caso.funcion(*argumentos))
+        transaction.set_rollback(True)
+    return resultado
+
+
+def _tiempo(llamada):
+    inicio = perf_counter()
+    llamada()
+    return (perf_counter() - inicio) * 1000
+
+
+def _consultas(llamada):
+    with CaptureQueriesContext(connection) as contexto:
+        llamada()
+    return len(contexto.captured_queries)
+
+
+def _memoria(llamada):
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    llamada()
+    _, pico = tracemalloc.get_traced_memory()
+    return (pico - base) / 1024
+
+
+def medir(caso, entradas, calentamiento=3):
+    """
+    Latencia (ms), consultas y pico de memoria asignada (KiB) de `caso` sobre `entradas`.
+
+    La latencia se mide con perf_counter en todas las entradas, sin instrumentar y con el
+    recolector de basura apagado; consultas y memoria (tracemalloc) se miden en pasadas
+    aparte sobre las primeras entradas.
+    """
+    for entrada in entradas[:calentamiento]:
+        _ejecutar(caso, entrada, lambda llamada: llamada())
+
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        latencias = [_ejecutar(caso, entrada, _tiempo) for entrada in entradas]
+    finally:
+        if gc_activo:
+            gc.enable()
+
+    instrumentadas = entradas[:REPETICIONES_INSTRUMENTADAS]
+    consultas = [_ejecutar(caso, entrada, _consultas) for entrada in instrumentadas]
+
+    tracemalloc.start()
+    try:
+        memoria = [_ejecutar(caso, entrada, _memoria) for entrada in instrumentadas]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'repeticiones': len(latencias),
+        'latencia_ms': _resumen(latencias, 3),
+        'consultas': {'p50': percentil(consultas, 50), 'max': max(consultas)},
+        'memoria_kib': {'p50': round(percentil(memoria, 50), 1), 'max': round(max(memoria), 1)},
+    }
@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from solicitudes.models import SolicitudCambio
+from turnos.models import Turno
+
+from .comparacion import comparar
+from .ejecucion import ejecutar
+from .medicion import percentil
+
+ESCALA_MINIMA = {'minima': {'exploradores': 8, 'solicitudes': 20, 'anios': 1}}
+
+
+class BenchmarksTest(TestCase):
+
+    def test_percentil_interpola(self):
+        self.assertEqual(percentil([4, 1, 3, 2], 50), 2.5)
+        self.assertEqual(percentil([1, 2, 3], 100), 3)
+        self.assertIsNone(percentil([], 50))
+
+    def test_ejecutar_mide_todos_los_casos_y_no_deja_datos(self):
+        turnos = Turno.objects.count()
+        reporte = ejecutar(ESCALA_MINIMA, repeticiones=2)
+
+        casos = reporte['escalas']['minima']['casos']
+        self.assertIn('CTPermanenteStrategy.aplicar_cambios', casos)
+        self.assertIn('validar_solicitud[CT PERMANENTE]', casos)
+        for resultado in casos.values():
+            self.assertEqual(resultado['repeticiones'], 2)
+            self.assertLessEqual(resultado['latencia_ms']['p50'], resultado['latencia_ms']['max'])
+        # El cambio permanente consulta y escribe, y se revierte
+        self.assertGreater(casos['CTPermanenteStrategy.aplicar_cambios']['consultas']['max'], 0)
+        self.assertEqual(Turno.objects.count(), turnos)
+        self.assertFalse(SolicitudCambio.objects.exists())
+
+    def test_comparar_marca_regresiones(self):
+        def reporte(p50, consultas):
+            return {'escalas': {'chica': {'casos': {'caso': {
+                'latencia_ms': {'p50': p50, 'p95': p50},
+                'consultas': {'max': consultas},
+                'memoria_kib': {'p50': 10},
+            }}}}}
+
+        base = reporte(10.0, 3)
+        regresiones = {d.metrica for d in comparar(base, reporte(14.0, 4), 0.25) if d.regresion}
+        self.assertEqual(regresiones, {'latencia_p50', 'latencia_p95', 'consultas'})
+        # Diferencias dentro de la tolerancia, o de microsegundos, no cuentan
+        self.assertFalse(any(d.regresion for d in comparar(base, reporte(12.0, 3), 0.25)))
+        micro = reporte(0.002, 0)
+        self.assertFalse(any(d.regresion for d in comparar(micro, reporte(0.004, 0), 0.25)))
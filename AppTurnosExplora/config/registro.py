@@ -0,0 +1,62 @@
+"""
+Piezas de logging referenciadas desde LOGGING en settings.
+
+- FormateadorJSON: una línea JSON por registro, con los campos de `extra` al primer nivel.
+- FiltroMuestreo: deja pasar solo una fracción de los registros DEBUG (o hasta el nivel que
+  se configure) de ciertos loggers, p. ej. de una vista de mucho tráfico; los de auditoría
+  (INFO) y superiores pasan siempre.
+
+Los diagnósticos que cuestan (consultas, recorridos de querysets) van detrás de
+`logger.isEnabledFor(logging.DEBUG)`, así en producción no se ejecutan.
+"""
+import json
+import logging
+import random
+
+# Atributos propios de LogRecord: lo demás viene de `extra`
+_ATRIBUTOS_REGISTRO = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class FormateadorJSON(logging.Formatter):
+
+    def format(self, record):
+        datos = {
+            'fecha': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_REGISTRO and not clave.startswith('_'):
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    `tasas` es {prefijo de logger: fracción en [0, 1]}; se aplica el prefijo más largo que
+    coincida ('solicitudes.views' gana sobre 'solicitudes'). Sin prefijo, todo pasa.
+    `nivel_maximo` (nombre o número) es el nivel más alto que se muestrea.
+    """
+
+    def __init__(self, tasas=None, nivel_maximo=logging.DEBUG):
+        super().__init__()
+        self.tasas = dict(tasas or {})
+        if isinstance(nivel_maximo, str):
+            nivel_maximo = logging.getLevelName(nivel_maximo.upper())
+        self.nivel_maximo = nivel_maximo
+
+    def tasa(self, nombre):
+        coincidencias = [
+            prefijo for prefijo in self.tasas
+            if nombre == prefijo or nombre.startswith(prefijo + '.')
+        ]
+        return self.tasas[max(coincidencias, key=len)] if coincidencias else 1.0
+
+    def filter(self, record):
+        if record.levelno > self.nivel_maximo:
+            return True
+        tasa = self.tasa(record.name)
+        return tasa >= 1 or random.random() < tasa
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     #apps
     'core.login',
     'core.dashboard',
+    'core.perf',
     'empleados',
     'solicitudes',
     'permisos',
@@ -55,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.perf.middleware.PerfiladoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,6 +66,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     #otros middlewares
     'simple_history.middleware.HistoryRequestMiddleware',
+    'turnos.middleware.JornadaCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -81,6 +84,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'solicitudes.context_processors.notificaciones',
             ],
         },
     },
@@ -172,6 +176,79 @@ DEFAULT_FROM_EMAIL = 'manuel.moreno@parqueexplora.org'
 # Para desarrollo: usar backend de consola (comentado)
 # EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Bandeja de salida (CorreoPendiente): las peticiones encolan y el comando
+# `python manage.py enviar_correos --continuo` envía los correos
+CORREO_LOTE = 50  # Correos por conexión SMTP
+CORREO_MAX_INTENTOS = 5
+CORREO_BACKOFF_SEGUNDOS = 60  # 1, 2, 4, 8... minutos entre reintentos
+CORREO_BACKOFF_MAXIMO_SEGUNDOS = 6 * 60 * 60
+CORREO_LEASE_SEGUNDOS = 5 * 60  # Tiempo que un worker reserva un lote antes de que otro lo retome
+CORREO_CONEXION_MAX_INACTIVA = 60  # Segundos que el worker conserva abierta la sesión SMTP sin uso
+
 # URL del sitio para enlaces en emails
 SITE_URL = 'http://127.0.0.1:8000'  # Para desarrollo local
 # SITE_URL = 'https://tu-dominio.com'  # Para producción
+
+# Tabla materializada RosterDia (turnos efectivos por explorador y día)
+# Activar después de ejecutar: python manage.py reconstruir_roster
+# y programar ese comando a diario para que el horizonte avance. Desactivada, las señales no
+# la mantienen: al volver a activarla hay que reconstruirla primero.
+TURNOS_ROSTER_ACTIVO = False
+TURNOS_ROSTER_DIAS_ATRAS = 31
+TURNOS_ROSTER_HORIZONTE_DIAS = 120
+
+# Caché compartida (jornadas resueltas por explorador y fecha, ver turnos/services/jornada_cache.py)
+# locmem es por proceso: con varios workers usar un backend compartido, por ejemplo
+# 'django.core.cache.backends.redis.RedisCache' con LOCATION 'redis://127.0.0.1:6379'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'turnos-explora',
+    }
+}
+TURNOS_CACHE_ALIAS = 'default'
+TURNOS_CACHE_TIMEOUT = 60 * 60  # También acota cambios de nombre/horario en Jornada o Sala
+NOTIFICACIONES_CONTADOR_TIMEOUT = 10 * 60  # Contador del badge de notificaciones no leídas
+# Stream SSE del badge de notificaciones. Requiere servir la app con ASGI (config/asgi.py):
+# bajo WSGI cada pestaña abierta ocuparía un worker. Apagado, el badge se lee del contador
+# cacheado al cargar cada página.
+NOTIFICACIONES_SSE_ACTIVO = False
+NOTIFICACIONES_SSE_KEEPALIVE = 25  # Segundos entre comentarios keepalive del stream de notificaciones
+NOTIFICACIONES_SSE_DURACION_MAXIMA = 5 * 60  # El navegador reconecta al cerrarse
+
+# Perfilado de peticiones (core/perf): cabeceras Server-Timing y X-Perf-* en cada respuesta y
+# reporte en /perf/ (solo staff). Pensado para desarrollo y pruebas de carga: las cabeceras
+# exponen tiempos internos a cualquier cliente
+PERFILADO_ACTIVO = False
+PERFILADO_MUESTRAS = 200  # Tamaño del búfer circular por proceso
+PERFILADO_UMBRAL_MS = 0  # Solo se guardan en el búfer las peticiones más lentas que esto
+
+# Logging estructurado (config/registro.py): una línea JSON por registro en la consola.
+# APP_LOG_LEVEL=DEBUG habilita los diagnósticos, que solo se calculan con DEBUG activo;
+# LOGGING_MUESTREO recorta el volumen de registros DEBUG por logger; INFO (auditoría) y
+# superiores pasan siempre
+APP_LOG_LEVEL = os.environ.get('APP_LOG_LEVEL', 'INFO')
+LOGGING_MUESTREO = {
+    'solicitudes.views': 0.1,
+}
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'config.registro.FormateadorJSON'},
+    },
+    'filters': {
+        'muestreo': {'()': 'config.registro.FiltroMuestreo', 'tasas': LOGGING_MUESTREO},
+    },
+    'handlers': {
+        'consola': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+            'filters': ['muestreo'],
+        },
+    },
+    'loggers': {
+        app: {'handlers': ['consola'], 'level': APP_LOG_LEVEL, 'propagate': False}
+        for app in ('core', 'empleados', 'solicitudes', 'permisos', 'turnos')
+    },
+}
@@ -0,0 +1,441 @@
+"""
+Presupuesto de consultas por endpoint.
+
+Recorre todas las URLs de turnos, solicitudes y empleados sobre el mismo conjunto de datos
+sembrado (FabricaDatos) y falla si alguna hace más consultas SQL que su presupuesto. Así una
+consulta N+1 nueva en una vista o plantilla se detecta en la suite y no en producción.
+
+- PRESUPUESTOS: máximo de consultas por nombre de URL con los datos de FabricaDatos. Se puede
+  ajustar sin tocar este archivo con el setting PRESUPUESTO_CONSULTAS ({nombre: máximo}).
+- Una URL nueva sin caso ni presupuesto hace fallar test_todas_las_urls_tienen_presupuesto.
+- Con PRESUPUESTO_CONSULTAS_REPORTE=<ruta> se escribe un JSON con consultas, tiempo y
+  estado de cada endpoint (para comparar entre ramas).
+"""
+
+import json
+import logging
+import os
+from collections import namedtuple
+from datetime import time, timedelta
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from config.registro import FiltroMuestreo, FormateadorJSON
+from empleados.models import (
+    CompetenciaEmpleado, Empleado, EmpleadoRole, Jornada, RestriccionEmpleado, Role, Sala, SancionEmpleado
+)
+from permisos.models import PDH
+from solicitudes.models import Notificacion, SolicitudCambio, TipoSolicitudCambio
+from solicitudes.services.notificacion_service import NotificacionService
+from turnos.models import AsignarJornadaExplorador, AsignarSalaExplorador, DiaEspecial, Turno
+
+APPS = ('turnos', 'solicitudes', 'empleados')
+
+# Consultas máximas por endpoint con los datos de FabricaDatos (incluye sesión y usuario).
+# Los valores altos son deuda conocida: bajar el número al optimizar la vista, nunca subirlo
+# sin una razón explícita.
+PRESUPUESTOS = {
+    # turnos
+    'mis_turnos': 8,  # sin fragmentos en caché: versión del roster + calendario
+    'cambios_turno': 3,
+    'consolidado_horas': 3,
+    'dias_especiales': 3,
+    'dias_especiales_visualizar': 4,
+    'dias_especiales_list': 4,
+    'dias_especiales_create': 3,
+    'dias_especiales_edit': 4,
+    'dias_especiales_delete': 4,
+    'turnos_list': 3,
+    'turnos_create': 19,
+    'turnos_edit': 20,
+    'turnos_delete': 5,
+    'turnos_calendario': 3,
+    'api_turnos_por_dia': 6,  # +1: versión del roster (ETag)
+    'turnos_por_mes_api': 6,  # +1: versión del roster (ETag)
+    'mis_turnos_por_mes_api': 7,  # +1: versión del roster (ETag)
+    # solicitudes
+    'solicitudes:solicitudes': 6,
+    'solicitudes:notificaciones_list': 7,
+    'solicitudes:marcar_notificacion_leida': 6,
+    'solicitudes:marcar_todas_notificaciones_leidas': 6,
+    'solicitudes:mis_solicitudes_list': 5,
+    'solicitudes:solicitudes_pendientes_list': 5,
+    'solicitudes:aprobar_solicitud': 14,  # +1: UPDATE condicional que pasa a 'aprobada'
+    'solicitudes:rechazar_solicitud': 13,
+    'solicitudes:aprobar_solicitud_receptor': 14,
+    'solicitudes:rechazar_solicitud_receptor': 12,
+    'solicitudes:aprobar_solicitud_ambos': 40,
+    'solicitudes:cancelar_solicitud': 14,  # +2: savepoint de la transición (en producción, la transacción)
+    'solicitudes:resolver_solicitudes_lote': 15,  # constante en el tamaño del lote
+    'solicitudes:cambio_turno_inicio': 4,
+    'solicitudes:solicitar_cambio_turno': 5,
+    'solicitudes:obtener_empleados_disponibles': 9,
+    'solicitudes:obtener_turno_explorador': 6,
+    'solicitudes:procesar_solicitud': 19,
+    'solicitudes:aprobar_solicitud_email': 16,
+    'solicitudes:rechazar_solicitud_email': 15,
+    'solicitudes:aprobar_solicitud_receptor_email': 15,
+    'solicitudes:rechazar_solicitud_receptor_email': 13,
+    'solicitudes:tiposolicitudcambio_list': 4,
+    'solicitudes:tiposolicitudcambio_create': 3,
+    'solicitudes:tiposolicitudcambio_edit': 4,
+    'solicitudes:tiposolicitudcambio_delete': 4,
+    'solicitudes:notificaciones_solicitudes': 6,
+    'solicitudes:dashboard_solicitudes': 6,
+    # empleados
+    'empleados': 7,
+    'empleado_autocompletar': 5,  # +2 para no admin: empleado y rol (el filtro por sala va en la misma consulta)
+    'empleado_detail': 4,
+    'empleado_edit': 9,
+    'empleado_delete': 5,
+    'secciones': 3,
+    'jornadas_list': 4,
+    'jornadas_create': 3,
+    'jornadas_edit': 4,
+    'jornadas_delete': 4,
+    'roles_list': 4,
+    'roles_create': 3,
+    'roles_edit': 4,
+    'roles_delete': 4,
+    'empleado_usuario_create': 9,
+    'asignar_roles_salas': 8,
+    'salas_list': 4,
+    'salas_create': 3,
+    'salas_edit': 4,
+    'salas_delete': 4,
+    'restricciones_list': 5,
+    'restricciones_create': 17,
+    'restricciones_edit': 18,
+    'restricciones_delete': 6,
+    'sanciones_list': 8,
+    'sanciones_create': 20,
+    'sanciones_edit': 21,
+    'sanciones_delete': 6,
+    'pdh_list': 4,
+    'pdh_create': 67,  # __str__ de cada opción de solicitud y empleado
+    'pdh_edit': 68,  # __str__ de cada opción de solicitud y empleado
+    'pdh_delete': 4,
+    'pdh_visualizar': 4,
+    'sanciones_visualizar': 8,
+    'restricciones_visualizar': 5,
+    'change_password': 5,
+}
+
+# URLs que no se miden aquí, con el motivo
+EXCLUIDAS = {
+    'solicitudes:notificaciones_stream': 'respuesta SSE abierta; cubierta por NotificacionesStreamTest',
+}
+
+# usuario: atributo de FabricaDatos con el User que hace la petición (None = anónimo)
+Caso = namedtuple('Caso', ['url', 'metodo', 'usuario', 'args', 'datos'])
+
+
+class FabricaDatos:
+    """
+    Datos de una sede pequeña: un supervisor, `exploradores` exploradores repartidos en
+    AM/PM y salas, turnos de cambio en el mes actual, días especiales, solicitudes
+    pendientes con sus notificaciones y el resto de catálogos que usan las vistas.
+    """
+
+    def __init__(self, exploradores=12, solicitudes=6):
+        self.num_exploradores = exploradores
+        self.num_solicitudes = solicitudes
+
+    def _empleado(self, username, jornada, sala, supervisor=None, rol=None):
+        empleado = Empleado.objects.create(
+            user=User.objects.create(username=username, email=f'{username}@test.com'),
+            nombre=username.capitalize(), apellido='Prueba', cedula=username[-10:],
+            email=f'{username}@test.com', supervisor=supervisor,
+        )
+        AsignarJornadaExplorador.objects.create(explorador=empleado, jornada=jornada, fecha_inicio=self.inicio)
+        AsignarSalaExplorador.objects.create(explorador=empleado, sala=sala, fecha_inicio=self.inicio)
+        CompetenciaEmpleado.objects.create(empleado=empleado, sala=sala)
+        EmpleadoRole.objects.create(empleado=empleado, role=rol or self.rol_explorador)
+        return empleado
+
+    def _solicitud(self, solicitante, receptor, dias):
+        solicitud = SolicitudCambio.objects.create(
+            explorador_solicitante=solicitante, explorador_receptor=receptor, tipo_cambio=self.tipo_cambio,
+            fecha_cambio_turno=self.hoy + timedelta(days=dias), comentario='Cambio por trámite',
+        )
+        NotificacionService.crear_notificacion_solicitud(solicitud)
+        return solicitud
+
+    def crear(self):
+        self.hoy = timezone.now().date()
+        self.inicio = self.hoy.replace(day=1) - timedelta(days=60)
+        self.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        self.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        self.salas = [Sala.objects.create(nombre=n) for n in ('Acuario', 'Planetario', 'Ciencia')]
+        self.rol_explorador = Role.objects.create(nombre='Explorador')
+        self.rol_supervisor = Role.objects.create(nombre='Supervisor')
+        self.tipo_cambio = TipoSolicitudCambio.objects.create(nombre='Cambio Turno')
+        for nombre in ('DOBLADA', 'CT PERMANENTE', 'D FDS'):
+            TipoSolicitudCambio.objects.create(nombre=nombre)
+
+        self.admin = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.supervisor = self._empleado('supervisor', self.am, self.salas[0], rol=self.rol_supervisor)
+        self.exploradores = [
+            self._empleado(f'explorador{i:02d}', self.pm if i % 2 else self.am, self.salas[i % 3], self.supervisor)
+            for i in range(self.num_exploradores)
+        ]
+        self.explorador, self.companero = self.exploradores[0], self.exploradores[1]
+
+        for i, explorador in enumerate(self.exploradores):
+            Turno.objects.create(
+                explorador=explorador, fecha=self.hoy.replace(day=1 + i % 28),
+                jornada=self.am if i % 2 else self.pm, sala=self.salas[i % 3], tipo_cambio='Cambio Turno',
+            )
+        self.turno = Turno.objects.filter(explorador=self.explorador).first()
+        for i in range(5):
+            self.dia_especial = DiaEspecial.objects.create(
+                fecha=self.hoy.replace(day=1 + i * 5), tipo='Feriado', descripcion=f'Feriado {i}'
+            )
+
+        self.solicitudes = [
+            self._solicitud(self.exploradores[i], self.exploradores[i + 1], dias=3 + i)
+            for i in range(0, self.num_solicitudes * 2, 2)
+        ]
+        self.solicitud = self.solicitudes[0]
+        # El supervisor también es el receptor: habilita "aprobar en ambos roles"
+        self.solicitud_ambos = self._solicitud(self.companero, self.supervisor, dias=20)
+        self.notificacion = Notificacion.objects.filter(destinatario=self.companero).first()
+
+        self.restriccion = RestriccionEmpleado.objects.create(
+            empleado=self.explorador, fecha_inicio=self.inicio, recomendacion='Sin escaleras', tipo_restriccion='Médica'
+        )
+        self.sancion = SancionEmpleado.objects.create(
+            explorador=self.explorador, supervisor=self.supervisor, fecha_inicio=self.inicio, motivo='Atraso'
+        )
+        self.pdh = PDH.objects.create(
+            explorador=self.explorador, solicitud=self.solicitud, fecha=self.hoy, horas=2, supervisor=self.supervisor
+        )
+        return self
+
+    def token(self, solicitud, empleado, tipo):
+        return NotificacionService._generar_token(solicitud.id, empleado.id, tipo)
+
+
+def casos(d):
+    """Una petición representativa por URL, sobre los datos `d` de FabricaDatos"""
+    mes = d.hoy.replace(day=1)
+    fin_mes = (mes + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    fecha_cambio = str(d.solicitud.fecha_cambio_turno)
+    get, post = 'get', 'post'
+    return [
+        # turnos
+        Caso('mis_turnos', get, 'explorador', (), {}),
+        Caso('cambios_turno', get, 'explorador', (), {}),
+        Caso('consolidado_horas', get, 'explorador', (), {}),
+        Caso('dias_especiales', get, 'explorador', (), {}),
+        Caso('dias_especiales_visualizar', get, 'explorador', (), {}),
+        Caso('dias_especiales_list', get, 'admin', (), {}),
+        Caso('dias_especiales_create', get, 'admin', (), {}),
+        Caso('dias_especiales_edit', get, 'admin', (d.dia_especial.id,), {}),
+        Caso('dias_especiales_delete', get, 'admin', (d.dia_especial.id,), {}),
+        Caso('turnos_list', get, 'explorador', (), {}),
+        Caso('turnos_create', get, 'admin', (), {}),
+        Caso('turnos_edit', get, 'admin', (d.turno.id,), {}),
+        Caso('turnos_delete', get, 'admin', (d.turno.id,), {}),
+        Caso('turnos_calendario', get, 'explorador', (), {}),
+        Caso('api_turnos_por_dia', get, 'explorador', (), {'fecha': str(d.hoy)}),
+        Caso('turnos_por_mes_api', get, 'explorador', (), {'fecha_inicio': str(mes), 'fecha_fin': str(fin_mes)}),
+        Caso('mis_turnos_por_mes_api', get, 'explorador', (), {'mes': f'{mes.month:02d}', 'anio': str(mes.year)}),
+        # solicitudes
+        Caso('solicitudes:solicitudes', get, 'explorador', (), {}),
+        Caso('solicitudes:notificaciones_list', get, 'companero', (), {}),
+        Caso('solicitudes:marcar_notificacion_leida', post, 'companero', (d.notificacion.id,), {}),
+        Caso('solicitudes:marcar_todas_notificaciones_leidas', post, 'companero', (), {}),
+        Caso('solicitudes:mis_solicitudes_list', get, 'explorador', (), {}),
+        Caso('solicitudes:solicitudes_pendientes_list', get, 'supervisor', (), {}),
+        Caso('solicitudes:aprobar_solicitud', post, 'supervisor', (d.solicitud.id,), {}),
+        Caso('solicitudes:rechazar_solicitud', post, 'supervisor', (d.solicitud.id,), {}),
+        Caso('solicitudes:aprobar_solicitud_receptor', post, 'companero', (d.solicitud.id,), {}),
+        Caso('solicitudes:rechazar_solicitud_receptor', post, 'companero', (d.solicitud.id,), {}),
+        Caso('solicitudes:aprobar_solicitud_ambos', post, 'supervisor', (d.solicitud_ambos.id,), {}),
+        Caso('solicitudes:cancelar_solicitud', post, 'explorador', (d.solicitud.id,), {}),
+        Caso('solicitudes:resolver_solicitudes_lote', post, 'supervisor', (),
+             {'accion': 'aprobar', 'ids': [solicitud.id for solicitud in d.solicitudes]}),
+        Caso('solicitudes:cambio_turno_inicio', get, 'explorador', (), {}),
+        Caso('solicitudes:solicitar_cambio_turno', get, 'explorador', (d.tipo_cambio.id,), {}),
+        Caso('solicitudes:obtener_empleados_disponibles', get, 'explorador', (),
+             {'fecha': fecha_cambio, 'tipo_solicitud_id': d.tipo_cambio.id}),
+        Caso('solicitudes:obtener_turno_explorador', get, 'explorador', (),
+             {'fecha': fecha_cambio, 'explorador_id': d.companero.id, 'tipo_solicitud_id': d.tipo_cambio.id}),
+        Caso('solicitudes:procesar_solicitud', post, 'explorador', (), {
+            'tipo_solicitud_id': d.tipo_cambio.id, 'empleado_receptor': d.companero.id,
+            'fecha_solicitud': str(d.hoy + timedelta(days=30)), 'comentarios': 'Trámite',
+        }),
+        Caso('solicitudes:aprobar_solicitud_email', get, None,
+             (d.solicitud.id, d.token(d.solicitud, d.supervisor, 'supervisor')), {}),
+        Caso('solicitudes:rechazar_solicitud_email', get, None,
+             (d.solicitud.id, d.token(d.solicitud, d.supervisor, 'supervisor')), {}),
+        Caso('solicitudes:aprobar_solicitud_receptor_email', get, None,
+             (d.solicitud.id, d.token(d.solicitud, d.companero, 'receptor')), {}),
+        Caso('solicitudes:rechazar_solicitud_receptor_email', get, None,
+             (d.solicitud.id, d.token(d.solicitud, d.companero, 'receptor')), {}),
+        Caso('solicitudes:tiposolicitudcambio_list', get, 'admin', (), {}),
+        Caso('solicitudes:tiposolicitudcambio_create', get, 'admin', (), {}),
+        Caso('solicitudes:tiposolicitudcambio_edit', get, 'admin', (d.tipo_cambio.id,), {}),
+        Caso('solicitudes:tiposolicitudcambio_delete', get, 'admin', (d.tipo_cambio.id,), {}),
+        Caso('solicitudes:notificaciones_solicitudes', get, 'supervisor', (), {}),
+        Caso('solicitudes:dashboard_solicitudes', get, 'supervisor', (), {}),
+        # empleados
+        Caso('empleados', get, 'admin', (), {}),
+        Caso('empleado_autocompletar', get, 'explorador', (), {'q': 'explo'}),
+        Caso('empleado_detail', get, 'admin', (d.explorador.id,), {}),
+        Caso('empleado_edit', get, 'admin', (d.explorador.id,), {}),
+        Caso('empleado_delete', get, 'admin', (d.explorador.id,), {}),
+        Caso('secciones', get, 'admin', (), {}),
+        Caso('jornadas_list', get, 'admin', (), {}),
+        Caso('jornadas_create', get, 'admin', (), {}),
+        Caso('jornadas_edit', get, 'admin', (d.am.id,), {}),
+        Caso('jornadas_delete', get, 'admin', (d.am.id,), {}),
+        Caso('roles_list', get, 'admin', (), {}),
+        Caso('roles_create', get, 'admin', (), {}),
+        Caso('roles_edit', get, 'admin', (d.rol_explorador.id,), {}),
+        Caso('roles_delete', get, 'admin', (d.rol_explorador.id,), {}),
+        Caso('empleado_usuario_create', get, 'admin', (), {}),
+        Caso('asignar_roles_salas', get, 'admin', (d.explorador.id,), {}),
+        Caso('salas_list', get, 'admin', (), {}),
+        Caso('salas_create', get, 'admin', (), {}),
+        Caso('salas_edit', get, 'admin', (d.salas[0].id,), {}),
+        Caso('salas_delete', get, 'admin', (d.salas[0].id,), {}),
+        Caso('restricciones_list', get, 'admin', (), {}),
+        Caso('restricciones_create', get, 'admin', (), {}),
+        Caso('restricciones_edit', get, 'admin', (d.restriccion.id,), {}),
+        Caso('restricciones_delete', get, 'admin', (d.restriccion.id,), {}),
+        Caso('sanciones_list', get, 'admin', (), {}),
+        Caso('sanciones_create', get, 'admin', (), {}),
+        Caso('sanciones_edit', get, 'admin', (d.sancion.id,), {}),
+        Caso('sanciones_delete', get, 'admin', (d.sancion.id,), {}),
+        Caso('pdh_list', get, 'admin', (), {}),
+        Caso('pdh_create', get, 'admin', (), {}),
+        Caso('pdh_edit', get, 'admin', (d.pdh.id,), {}),
+        Caso('pdh_delete', get, 'admin', (d.pdh.id,), {}),
+        Caso('pdh_visualizar', get, 'explorador', (), {}),
+        Caso('sanciones_visualizar', get, 'explorador', (), {}),
+        Caso('restricciones_visualizar', get, 'explorador', (), {}),
+        Caso('change_password', get, 'admin', (d.explorador.user_id,), {}),
+    ]
+
+
+def nombres_de_urls(apps=APPS):
+    """Nombres (con namespace) de todas las URLs con nombre de `apps` en el URLconf raíz"""
+    nombres = set()
+
+    def recorrer(patrones, namespace, dentro):
+        for patron in patrones:
+            if isinstance(patron, URLResolver):
+                modulo = getattr(patron.urlconf_module, '__name__', '')
+                app = modulo.split('.')[0]
+                ns = f'{namespace}{patron.namespace}:' if patron.namespace else namespace
+                recorrer(patron.url_patterns, ns, dentro or (app in apps and modulo == f'{app}.urls'))
+            elif isinstance(patron, URLPattern) and dentro and patron.name:
+                nombres.add(f'{namespace}{patron.name}')
+
+    recorrer(get_resolver().url_patterns, '', False)
+    return nombres
+
+
+class PresupuestoConsultasTest(TestCase):
+    """Cada endpoint de turnos, solicitudes y empleados respeta su presupuesto de consultas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.datos = FabricaDatos().crear()
+
+    def _presupuesto(self, url):
+        return {**PRESUPUESTOS, **getattr(settings, 'PRESUPUESTO_CONSULTAS', {})}.get(url)
+
+    def _medir(self, caso):
+        """(estado, consultas, milisegundos) de la petición, revirtiendo lo que escriba"""
+        for cache in caches.all():
+            cache.clear()
+        self.client.logout()
+        usuario = getattr(self.datos, caso.usuario) if caso.usuario else None
+        if usuario is not None:
+            self.client.force_login(usuario if isinstance(usuario, User) else usuario.user)
+        url = reverse(caso.url, args=caso.args)
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                inicio = perf_counter()
+                response = getattr(self.client, caso.metodo)(url, caso.datos)
+                milisegundos = (perf_counter() - inicio) * 1000
+            transaction.set_rollback(True)
+        return response.status_code, len(ctx.captured_queries), milisegundos
+
+    def test_todas_las_urls_tienen_presupuesto(self):
+        medidas = {caso.url for caso in casos(self.datos)}
+        faltantes = nombres_de_urls() - medidas - set(EXCLUIDAS)
+        self.assertFalse(faltantes, f'URLs sin caso en config/tests.py: {sorted(faltantes)}')
+        self.assertFalse(medidas - set(PRESUPUESTOS), 'Casos sin presupuesto')
+
+    def test_presupuesto_por_endpoint(self):
+        reporte = {}
+        for caso in casos(self.datos):
+            with self.subTest(url=caso.url):
+                estado, consultas, milisegundos = self._medir(caso)
+                presupuesto = self._presupuesto(caso.url)
+                reporte[caso.url] = {
+                    'estado': estado, 'consultas': consultas, 'presupuesto': presupuesto,
+                    'ms': round(milisegundos, 1),
+                }
+                self.assertLess(estado, 500)
+                self.assertLessEqual(consultas, presupuesto, f'{caso.url}: {consultas} consultas')
+
+        ruta = os.environ.get('PRESUPUESTO_CONSULTAS_REPORTE')
+        if ruta:
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                json.dump(reporte, archivo, indent=2, sort_keys=True)
+
+
+class RegistroEstructuradoTest(TestCase):
+    """Formato JSON, muestreo y diagnósticos que solo se calculan con DEBUG"""
+
+    def test_formateador_json_incluye_extra(self):
+        registro = logging.LogRecord('solicitudes.views', logging.INFO, __file__, 1, 'Hola %s', ('mundo',), None)
+        registro.solicitud_id = 7
+        datos = json.loads(FormateadorJSON().format(registro))
+        self.assertEqual(datos['mensaje'], 'Hola mundo')
+        self.assertEqual(datos['nivel'], 'INFO')
+        self.assertEqual(datos['solicitud_id'], 7)
+        self.assertNotIn('args', datos)
+
+    def test_muestreo_por_prefijo_mas_largo(self):
+        filtro = FiltroMuestreo({'solicitudes': 1.0, 'solicitudes.views': 0.0})
+
+        def registro(nombre, nivel):
+            return logging.LogRecord(nombre, nivel, __file__, 1, 'x', (), None)
+
+        self.assertFalse(filtro.filter(registro('solicitudes.views', logging.DEBUG)))
+        # Los registros de auditoría no se muestrean
+        self.assertTrue(filtro.filter(registro('solicitudes.views', logging.INFO)))
+        self.assertTrue(filtro.filter(registro('solicitudes.views', logging.WARNING)))
+        self.assertFalse(
+            FiltroMuestreo({'solicitudes': 0.0}, nivel_maximo='info').filter(registro('solicitudes.views', logging.INFO))
+        )
+        self.assertTrue(filtro.filter(registro('solicitudes.services', logging.DEBUG)))
+        self.assertTrue(filtro.filter(registro('solicitudes.viewsets', logging.DEBUG)))
+
+    def test_diagnosticos_del_conteo_solo_con_debug(self):
+        datos = FabricaDatos(exploradores=4, solicitudes=2).crear()
+        self.client.force_login(datos.supervisor.user)
+        url = reverse('solicitudes:solicitudes')
+
+        with CaptureQueriesContext(connection) as sin_debug:
+            self.client.get(url)
+        with self.assertLogs('solicitudes.views', 'DEBUG') as registros, \
+                CaptureQueriesContext(connection) as con_debug:
+            self.client.get(url)
+
+        self.assertEqual(len(con_debug), len(sin_debug) + 1)
+        self.assertIn('Conteo de solicitudes pendientes', [r.getMessage() for r in registros.records])
@@ -25,4 +25,5 @@ urlpatterns = [
     path('turnos/', include('turnos.urls')),
     path('permisos/', include('permisos.urls')),
     path('solicitudes/', include('solicitudes.urls', namespace='solicitudes')),
+    path('perf/', include('core.perf.urls')),
 ]
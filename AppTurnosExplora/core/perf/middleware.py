@@ -0,0 +1,45 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .perfilador import Perfil, RegistroPerfiles
+
+
+class PerfiladoMiddleware:
+    """
+    Perfilado opcional de peticiones (PERFILADO_ACTIVO): tiempo total, tiempo y número de
+    consultas SQL, consultas duplicadas por huella y tiempo de render de la plantilla.
+
+    Los resultados van en las cabeceras de la respuesta (Server-Timing, que las herramientas
+    de desarrollo del navegador muestran, y X-Perf-*) y en el búfer que muestra /perf/.
+    Debe ir primero en MIDDLEWARE para contar también las consultas de sesión y usuario.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'PERFILADO_ACTIVO', False):
+            return self.get_response(request)
+
+        perfil = Perfil(request)
+        request.perfil = perfil
+        with ExitStack() as pila:
+            for conexion in connections.all():
+                pila.enter_context(conexion.execute_wrapper(perfil))
+            response = self.get_response(request)
+
+        perfil.terminar(request, response)
+        RegistroPerfiles.registrar(perfil)
+        for cabecera, valor in perfil.cabeceras().items():
+            response[cabecera] = valor
+        return response
+
+    def process_template_response(self, request, response):
+        # El render de una TemplateResponse ocurre después de este hook
+        perfil = getattr(request, 'perfil', None)
+        if perfil is not None:
+            perfil.iniciar_plantilla()
+            response.add_post_render_callback(perfil.terminar_plantilla)
+        return response
@@ -0,0 +1,183 @@
+import hashlib
+import re
+import threading
+from collections import Counter, deque
+from time import perf_counter
+
+from django.conf import settings
+from django.utils import timezone
+
+# Listas IN (%s, %s, ...) y literales numéricos: consultas que solo difieren en eso son "la misma"
+_LISTA_PARAMETROS = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_NUMERO = re.compile(r'\b\d+\b')
+_ESPACIOS = re.compile(r'\s+')
+LARGO_SQL_REPORTE = 400
+
+
+def huella(sql):
+    """SQL normalizado: IN (...) colapsado, números como ? y espacios simples"""
+    sql = _LISTA_PARAMETROS.sub('(...)', sql)
+    return _ESPACIOS.sub(' ', _NUMERO.sub('?', sql)).strip()
+
+
+class Perfil:
+    """
+    Mediciones de una petición. Se alimenta con el execute_wrapper de las conexiones
+    (cada consulta) y con el render de la TemplateResponse, si la hay.
+    """
+
+    def __init__(self, request):
+        self.metodo = request.method
+        self.ruta = request.path
+        self.vista = None
+        self.estado = None
+        self.fecha = timezone.now()
+        self.inicio = perf_counter()
+        self.total_ms = 0.0
+        self.bd_ms = 0.0
+        self.plantilla_ms = 0.0
+        self._inicio_plantilla = None
+        self.consultas = 0
+        self._por_huella = Counter()
+        self._tiempo_por_huella = Counter()
+        self._exactas = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper: mide la consulta y la acumula por huella"""
+        inicio = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = (perf_counter() - inicio) * 1000
+            self.bd_ms += duracion
+            self.consultas += 1
+            normalizada = huella(sql)
+            self._por_huella[normalizada] += 1
+            self._tiempo_por_huella[normalizada] += duracion
+            # repr: los params pueden venir como lista (no hashable)
+            self._exactas[(sql, repr(params))] += 1
+
+    def iniciar_plantilla(self):
+        self._inicio_plantilla = perf_counter()
+
+    def terminar_plantilla(self, response=None):
+        if self._inicio_plantilla is not None:
+            self.plantilla_ms += (perf_counter() - self._inicio_plantilla) * 1000
+            self._inicio_plantilla = None
+
+    def terminar(self, request, response):
+        self.total_ms = (perf_counter() - self.inicio) * 1000
+        self.estado = response.status_code
+        coincidencia = getattr(request, 'resolver_match', None)
+        self.vista = coincidencia.view_name if coincidencia else None
+
+    @property
+    def duplicadas(self):
+        """Consultas de más por huella: N+1 típicos (la misma consulta con otro id)"""
+        return sum(veces - 1 for veces in self._por_huella.values())
+
+    @property
+    def repetidas(self):
+        """Consultas idénticas, con los mismos parámetros, ejecutadas más de una vez"""
+        return sum(veces - 1 for veces in self._exactas.values())
+
+    def huellas_duplicadas(self, limite=5):
+        return [
+            {
+                'id': hashlib.sha1(sql.encode()).hexdigest()[:10],
+                'veces': veces,
+                'ms': round(self._tiempo_por_huella[sql], 2),
+                'sql': sql[:LARGO_SQL_REPORTE],
+            }
+            for sql, veces in self._por_huella.most_common(limite) if veces > 1
+        ]
+
+    def cabeceras(self):
+        return {
+            'Server-Timing': (
+                f'total;dur={self.total_ms:.1f}, '
+                f'db;dur={self.bd_ms:.1f};desc="{self.consultas} consultas", '
+                f'plantilla;dur={self.plantilla_ms:.1f}'
+            ),
+            'X-Perf-Consultas': str(self.consultas),
+            'X-Perf-Consultas-Duplicadas': str(self.duplicadas),
+            'X-Perf-Huellas-Duplicadas': ','.join(h['id'] for h in self.huellas_duplicadas()),
+        }
+
+    def como_dict(self):
+        return {
+            'fecha': self.fecha.isoformat(timespec='seconds'),
+            'metodo': self.metodo,
+            'ruta': self.ruta,
+            'vista': self.vista,
+            'estado': self.estado,
+            'total_ms': round(self.total_ms, 2),
+            'bd_ms': round(self.bd_ms, 2),
+            'plantilla_ms': round(self.plantilla_ms, 2),
+            'consultas': self.consultas,
+            'duplicadas': self.duplicadas,
+            'repetidas': self.repetidas,
+            'huellas_duplicadas': self.huellas_duplicadas(),
+        }
+
+
+class RegistroPerfiles:
+    """
+    Búfer circular, en memoria y por proceso, con las últimas PERFILADO_MUESTRAS peticiones
+    que superaron PERFILADO_UMBRAL_MS. El reporte de /perf/ las ordena de la más lenta a la
+    más rápida.
+    """
+
+    _muestras = None
+    _candado = threading.RLock()
+
+    @classmethod
+    def _buffer(cls):
+        capacidad = getattr(settings, 'PERFILADO_MUESTRAS', 100)
+        with cls._candado:
+            if cls._muestras is None or cls._muestras.maxlen != capacidad:
+                cls._muestras = deque(cls._muestras or (), maxlen=capacidad)
+            return cls._muestras
+
+    @classmethod
+    def _copia(cls):
+        # Otro hilo puede estar agregando: se copia bajo el candado y se recorre la copia
+        with cls._candado:
+            return list(cls._buffer())
+
+    @classmethod
+    def registrar(cls, perfil):
+        if perfil.total_ms >= getattr(settings, 'PERFILADO_UMBRAL_MS', 0):
+            muestra = perfil.como_dict()
+            with cls._candado:
+                cls._buffer().append(muestra)
+
+    @classmethod
+    def mas_lentas(cls, limite=None):
+        muestras = sorted(cls._copia(), key=lambda m: m['total_ms'], reverse=True)
+        return muestras[:limite] if limite else muestras
+
+    @classmethod
+    def por_vista(cls):
+        """Resumen por vista de las muestras del búfer, de la de más tiempo total a la de menos"""
+        grupos = {}
+        for muestra in cls._copia():
+            grupos.setdefault(muestra['vista'] or muestra['ruta'], []).append(muestra)
+        resumen = []
+        for vista, muestras in grupos.items():
+            tiempos = sorted(m['total_ms'] for m in muestras)
+            resumen.append({
+                'vista': vista,
+                'peticiones': len(muestras),
+                'total_ms_p50': tiempos[len(tiempos) // 2],
+                'total_ms_max': tiempos[-1],
+                'bd_ms_media': round(sum(m['bd_ms'] for m in muestras) / len(muestras), 2),
+                'consultas_max': max(m['consultas'] for m in muestras),
+                'duplicadas_max': max(m['duplicadas'] for m in muestras),
+            })
+        return sorted(resumen, key=lambda r: r['total_ms_p50'] * r['peticiones'], reverse=True)
+
+    @classmethod
+    def vaciar(cls):
+        with cls._candado:
+            cls._buffer().clear()
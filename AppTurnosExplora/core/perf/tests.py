@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from empleados.models import Empleado
+from .perfilador import Perfil, RegistroPerfiles, huella
+
+
+class PerfiladoTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('perf_staff', password='x', is_staff=True)
+        cls.usuario = User.objects.create_user('perf_usuario', password='x')
+
+    def setUp(self):
+        RegistroPerfiles.vaciar()
+
+    def test_huella_agrupa_consultas_que_solo_difieren_en_valores(self):
+        self.assertEqual(
+            huella('SELECT * FROM t WHERE id IN (%s, %s,%s) LIMIT 21'),
+            huella('SELECT  *  FROM t WHERE id IN (%s) LIMIT 5'),
+        )
+
+    def test_perfil_cuenta_duplicadas_y_repetidas(self):
+        perfil = Perfil(RequestFactory().get('/'))
+        with connection.execute_wrapper(perfil):
+            list(Empleado.objects.filter(id=1))
+            list(Empleado.objects.filter(id=2))
+            list(Empleado.objects.filter(id=2))
+        self.assertEqual(perfil.consultas, 3)
+        self.assertEqual(perfil.duplicadas, 2)
+        self.assertEqual(perfil.repetidas, 1)
+        self.assertEqual(perfil.huellas_duplicadas()[0]['veces'], 3)
+
+    def test_perfil_acepta_params_no_hashables(self):
+        perfil = Perfil(RequestFactory().get('/'))
+        ejecutar = lambda sql, params, many, context: None
+        perfil(ejecutar, 'UPDATE t SET a = %s', [[1], [1]], True, {})
+        perfil(ejecutar, 'UPDATE t SET a = %s', [[1], [1]], True, {})
+        self.assertEqual(perfil.repetidas, 1)
+
+    @override_settings(PERFILADO_ACTIVO=True)
+    def test_cabeceras_y_registro(self):
+        self.client.force_login(self.staff)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('empleados'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('plantilla;dur=', response['Server-Timing'])
+        self.assertEqual(int(response['X-Perf-Consultas']), len(consultas))
+
+        muestra = RegistroPerfiles.mas_lentas()[0]
+        self.assertEqual(muestra['vista'], 'empleados')
+        self.assertEqual(muestra['consultas'], len(consultas))
+        self.assertGreater(muestra['plantilla_ms'], 0)
+
+    def test_inactivo_no_agrega_cabeceras(self):
+        self.client.force_login(self.usuario)
+        response = self.client.get(reverse('empleados'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(RegistroPerfiles.mas_lentas(), [])
+
+    @override_settings(PERFILADO_ACTIVO=True, PERFILADO_MUESTRAS=2)
+    def test_reporte_solo_staff_y_buffer_acotado(self):
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(reverse('perf_reporte')).status_code, 403)
+
+        self.client.force_login(self.staff)
+        for _ in range(3):
+            self.client.get(reverse('empleados'))
+        data = self.client.get(reverse('perf_reporte'), {'formato': 'json'}).json()
+        self.assertTrue(data['activo'])
+        # El búfer conserva solo las 2 últimas peticiones: el 403 y la primera ya salieron
+        self.assertEqual(len(data['mas_lentas']), 2)
+        self.assertEqual(data['por_vista'][0]['vista'], 'empleados')
+
+        self.assertEqual(self.client.get(reverse('perf_reporte')).status_code, 200)
+        # Vaciar deja solo la propia petición POST
+        self.client.post(reverse('perf_reporte'))
+        self.assertEqual([m['metodo'] for m in RegistroPerfiles.mas_lentas()], ['POST'])
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import PerfReporteView
+
+urlpatterns = [
+    path('', PerfReporteView.as_view(), name='perf_reporte'),
+]
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.views.generic import TemplateView
+
+from .perfilador import RegistroPerfiles
+
+
+class PerfReporteView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """Peticiones más lentas del búfer de PerfiladoMiddleware (solo staff); ?formato=json para el JSON"""
+    template_name = 'perf/reporte.html'
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('formato') == 'json':
+            return JsonResponse({
+                'activo': getattr(settings, 'PERFILADO_ACTIVO', False),
+                'por_vista': RegistroPerfiles.por_vista(),
+                'mas_lentas': RegistroPerfiles.mas_lentas(),
+            })
+        return super().get(request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        RegistroPerfiles.vaciar()
+        return redirect('perf_reporte')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_title'] = 'Rendimiento'
+        context['activo'] = getattr(settings, 'PERFILADO_ACTIVO', False)
+        context['umbral_ms'] = getattr(settings, 'PERFILADO_UMBRAL_MS', 0)
+        context['por_vista'] = RegistroPerfiles.por_vista()
+        context['mas_lentas'] = RegistroPerfiles.mas_lentas(limite=50)
+        return context
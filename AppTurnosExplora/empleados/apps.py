@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class EmpleadosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'empleados'
+
+    def ready(self):
+        # Mantener el índice de búsqueda de empleados
+        from . import signals  # noqa: F401
@@ -0,0 +1,83 @@
+import random
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from empleados.models import Empleado
+from empleados.services.busqueda_empleados import BusquedaEmpleados
+
+NOMBRES = ['José', 'María', 'Ángela', 'Andrés', 'Sofía', 'Martín', 'Lucía', 'Tomás', 'Inés', 'Ramón',
+           'Begoña', 'Joaquín', 'Noemí', 'Raúl', 'Verónica', 'Iñaki', 'Mónica', 'Héctor', 'Valentina', 'Óscar']
+APELLIDOS = ['Gómez', 'Pérez', 'Núñez', 'Ibáñez', 'Muñoz', 'Rodríguez', 'Martínez', 'Sánchez', 'López',
+             'Fernández', 'Peña', 'Álvarez', 'Díaz', 'Jiménez', 'Castañeda', 'Quiñones', 'Ordóñez', 'Beltrán']
+
+
+class _Revertir(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Siembra empleados sintéticos y compara la búsqueda con icontains frente al índice de '
+            'términos (tiempo y EXPLAIN). Por defecto revierte los datos al terminar')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empleados', type=int, default=10000, help='Empleados sintéticos a crear')
+        parser.add_argument('--repeticiones', type=int, default=50, help='Ejecuciones por consulta')
+        parser.add_argument('--conservar', action='store_true', help='No revertir los empleados creados')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._sembrar(options['empleados'])
+                self._medir(options['repeticiones'])
+                if not options['conservar']:
+                    raise _Revertir
+        except _Revertir:
+            self.stdout.write('Datos sintéticos revertidos')
+
+    def _sembrar(self, cantidad):
+        azar = random.Random(42)
+        inicio = perf_counter()
+        base = User.objects.count()
+        users = User.objects.bulk_create(
+            [User(username=f'bench_busqueda_{base + i}') for i in range(cantidad)], batch_size=1000
+        )
+        empleados = Empleado.objects.bulk_create([
+            Empleado(
+                user=user,
+                nombre=azar.choice(NOMBRES),
+                apellido=f'{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}',
+                cedula=f'B{base + i:09d}',
+                email=f'{user.username}@example.com',
+            )
+            for i, user in enumerate(users)
+        ], batch_size=1000)
+        BusquedaEmpleados.indexar(empleados)
+        self.stdout.write(f'{cantidad} empleados sembrados e indexados en {perf_counter() - inicio:.1f} s '
+                          f'({Empleado.objects.count()} en total)')
+
+    def _medir(self, repeticiones):
+        for query in ['mar', 'nun', 'jose', 'maria gom', 'castaneda quinones']:
+            palabras = query.split()
+            icontains = Empleado.objects.all()
+            for palabra in palabras:
+                icontains = icontains.filter(
+                    Q(nombre__icontains=palabra) | Q(apellido__icontains=palabra) | Q(cedula__icontains=palabra)
+                )
+            consultas = {
+                'icontains': icontains.order_by('apellido', 'nombre', 'id'),
+                'índice de términos': BusquedaEmpleados.buscar(query),
+            }
+            self.stdout.write(self.style.MIGRATE_HEADING(f'"{query}"'))
+            for nombre, queryset in consultas.items():
+                pagina = queryset[:10]
+                inicio = perf_counter()
+                for _ in range(repeticiones):
+                    list(pagina)
+                promedio_ms = (perf_counter() - inicio) * 1000 / repeticiones
+                self.stdout.write(f'  {nombre}: {promedio_ms:.3f} ms/consulta, {queryset.count()} resultados')
+                for linea in pagina.explain().splitlines():
+                    self.stdout.write(f'    {linea}')
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.2 on 2026-10-18 08:18
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def indexar_empleados(apps, schema_editor):
+    # Copia de BusquedaEmpleados.terminos: la migración no depende del código actual del servicio
+    Empleado = apps.get_model('empleados', 'Empleado')
+    TerminoBusquedaEmpleado = apps.get_model('empleados', 'TerminoBusquedaEmpleado')
+    separadores = re.compile(r'[^0-9a-z]+')
+
+    def terminos(*textos):
+        resultado = set()
+        for texto in textos:
+            descompuesto = unicodedata.normalize('NFKD', str(texto or ''))
+            normalizado = ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+            resultado.update(p[:50] for p in separadores.split(normalizado) if p)
+        return resultado
+
+    filas = [
+        TerminoBusquedaEmpleado(empleado_id=empleado.id, termino=termino)
+        for empleado in Empleado.objects.only('id', 'nombre', 'apellido', 'cedula').iterator()
+        for termino in terminos(empleado.nombre, empleado.apellido, empleado.cedula)
+    ]
+    TerminoBusquedaEmpleado.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empleados', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TerminoBusquedaEmpleado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('termino', models.CharField(max_length=50)),
+                ('empleado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terminos_busqueda', to='empleados.empleado')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['termino', 'empleado'], name='termino_busqueda_idx')],
+                'constraints': [models.UniqueConstraint(fields=('empleado', 'termino'), name='termino_busqueda_unico')],
+            },
+        ),
+        migrations.RunPython(indexar_empleados, migrations.RunPython.noop),
+    ]
@@ -29,8 +29,9 @@ class Empleado(models.Model):
         return f"{self.nombre} {self.apellido} ({self.user.username})"
     
     def notificaciones_no_leidas_count(self):
-        """Retorna el número de notificaciones no leídas"""
-        return self.notificaciones.filter(leida=False).count()
+        """Retorna el número de notificaciones no leídas (contador cacheado)"""
+        from solicitudes.services.contador_notificaciones import ContadorNotificaciones
+        return ContadorNotificaciones.obtener(self.id)
 
 class Role(models.Model):
     nombre = models.CharField(max_length=50)
@@ -89,3 +90,25 @@ class SancionEmpleado(models.Model):
     def __str__(self):
         return f"{self.explorador.nombre} {self.explorador.apellido} - {self.fecha_inicio} supervisado por {self.supervisor.nombre} {self.supervisor.apellido}"
 
+
+class TerminoBusquedaEmpleado(models.Model):
+    """
+    Índice de búsqueda de empleados: una fila por palabra normalizada (minúsculas, sin tildes)
+    de nombre, apellido y cédula. Buscar por prefijo sobre `termino` es un rango del índice,
+    a diferencia de LIKE '%q%' sobre Empleado. Lo mantiene BusquedaEmpleados; sin historial
+    porque se deriva de Empleado.
+    """
+    empleado = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name='terminos_busqueda')
+    termino = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['empleado', 'termino'], name='termino_busqueda_unico'),
+        ]
+        indexes = [
+            # Cubre la búsqueda: rango por termino y el empleado_id sin leer la tabla
+            models.Index(fields=['termino', 'empleado'], name='termino_busqueda_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.termino} - {self.empleado_id}"
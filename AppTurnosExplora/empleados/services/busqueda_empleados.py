@@ -0,0 +1,102 @@
+import re
+import unicodedata
+
+from django.db import connection, transaction
+
+from empleados.models import Empleado, TerminoBusquedaEmpleado
+
+_SEPARADORES = re.compile(r'[^0-9a-z]+')
+LONGITUD_TERMINO = 50
+
+
+class BusquedaEmpleados:
+    """
+    Búsqueda de empleados por prefijo de palabra, sin distinguir mayúsculas ni tildes
+    ("jose" encuentra "José", "ma go" encuentra "María Gómez").
+
+    Cada empleado tiene una fila en TerminoBusquedaEmpleado por palabra normalizada de
+    nombre, apellido y cédula. Buscar un prefijo es un rango sobre el índice
+    (termino, empleado), así que el costo depende de las coincidencias y no del total de
+    empleados, a diferencia de icontains ('%q%'), que recorre toda la tabla. Los términos
+    se actualizan en el post_save de Empleado (empleados.signals); las cargas con
+    bulk_create o update() deben llamar a indexar() o reindexar_todo().
+    """
+
+    @staticmethod
+    def normalizar(texto):
+        """Minúsculas y sin tildes ni diéresis ('Ñúñez' -> 'nunez')"""
+        descompuesto = unicodedata.normalize('NFKD', str(texto or ''))
+        return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+    @staticmethod
+    def terminos(*textos):
+        """Palabras normalizadas y únicas de los textos, recortadas al largo de la columna"""
+        terminos = set()
+        for texto in textos:
+            for palabra in _SEPARADORES.split(BusquedaEmpleados.normalizar(texto)):
+                if palabra:
+                    terminos.add(palabra[:LONGITUD_TERMINO])
+        return terminos
+
+    @staticmethod
+    def _terminos_empleado(empleado):
+        return BusquedaEmpleados.terminos(empleado.nombre, empleado.apellido, empleado.cedula)
+
+    @staticmethod
+    def indexar(empleados):
+        """Reemplaza los términos de `empleados` con un DELETE y un INSERT"""
+        empleados = list(empleados)
+        if not empleados:
+            return
+        with transaction.atomic():
+            TerminoBusquedaEmpleado.objects.filter(empleado_id__in=[e.id for e in empleados]).delete()
+            TerminoBusquedaEmpleado.objects.bulk_create([
+                TerminoBusquedaEmpleado(empleado_id=empleado.id, termino=termino)
+                for empleado in empleados
+                for termino in BusquedaEmpleados._terminos_empleado(empleado)
+            ])
+
+    @staticmethod
+    def reindexar_todo(lote=1000):
+        """Reconstruye el índice completo por lotes; devuelve el número de empleados indexados"""
+        total = 0
+        ultimo_id = 0
+        while True:
+            empleados = list(
+                Empleado.objects.filter(id__gt=ultimo_id).order_by('id')
+                .only('id', 'nombre', 'apellido', 'cedula')[:lote]
+            )
+            if not empleados:
+                return total
+            BusquedaEmpleados.indexar(empleados)
+            total += len(empleados)
+            ultimo_id = empleados[-1].id
+
+    @staticmethod
+    def _prefijo(prefijo):
+        """
+        Filtro "termino empieza por `prefijo`" que puede usar el índice.
+
+        En MySQL istartswith es LIKE 'x%', que recorre solo el rango del índice (startswith
+        sería LIKE BINARY, que no lo usa). En otros motores LIKE puede no usar el índice, así
+        que se expresa como rango [prefijo, siguiente) sobre términos ya normalizados.
+        """
+        if connection.vendor == 'mysql':
+            return {'termino__istartswith': prefijo}
+        return {'termino__gte': prefijo, 'termino__lt': prefijo[:-1] + chr(ord(prefijo[-1]) + 1)}
+
+    @staticmethod
+    def buscar(query, queryset=None):
+        """
+        Empleados de `queryset` (todos por defecto) que tienen, para cada palabra de `query`,
+        algún término que empieza por ella. Ordenados por apellido y nombre.
+        """
+        queryset = Empleado.objects.all() if queryset is None else queryset
+        prefijos = BusquedaEmpleados.terminos(query)
+        if not prefijos:
+            return queryset.none()
+        for prefijo in prefijos:
+            queryset = queryset.filter(id__in=TerminoBusquedaEmpleado.objects.filter(
+                **BusquedaEmpleados._prefijo(prefijo)
+            ).values('empleado_id'))
+        return queryset.order_by('apellido', 'nombre', 'id')
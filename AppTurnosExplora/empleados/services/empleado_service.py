@@ -1,5 +1,6 @@
-from django.db.models import Q
-from empleados.models import Empleado, CompetenciaEmpleado
+from django.db.models import OuterRef, Prefetch, Subquery
+from empleados.models import Empleado, CompetenciaEmpleado, EmpleadoRole
+from empleados.services.busqueda_empleados import BusquedaEmpleados
 
 class EmpleadoService:
     @staticmethod
@@ -12,9 +13,35 @@ class EmpleadoService:
     @staticmethod
     def buscar_empleados(query):
         """
-        Búsqueda de empleados por nombre, apellido o número de empleado
+        Búsqueda de empleados por nombre, apellido o cédula: prefijo de cada palabra,
+        sin distinguir mayúsculas ni tildes (ver BusquedaEmpleados)
         """
-        return Empleado.objects.filter(Q(nombre__icontains=query) | Q(apellido__icontains=query) | Q(cedula__icontains=query))  # type: ignore
+        return BusquedaEmpleados.buscar(query)
+
+    @staticmethod
+    def directorio(queryset):
+        """
+        Prepara un queryset de empleados para el listado con un número fijo de consultas:
+        usuario en el mismo SELECT, jornada más reciente como subconsulta (jornada_actual)
+        y salas y roles precargados.
+        """
+        from turnos.models import AsignarJornadaExplorador
+
+        ultima_jornada = (
+            AsignarJornadaExplorador.objects
+            .filter(explorador=OuterRef('pk'))
+            .order_by('-fecha_inicio', '-id')
+            .values('jornada__nombre')[:1]
+        )
+        return (
+            queryset
+            .select_related('user')
+            .annotate(jornada_actual=Subquery(ultima_jornada))
+            .prefetch_related(
+                Prefetch('competenciaempleado_set', queryset=CompetenciaEmpleado.objects.select_related('sala')),
+                Prefetch('empleadorole_set', queryset=EmpleadoRole.objects.select_related('role')),
+            )
+        )
 
     @staticmethod
     def get_empleados_disponibles_turno(fecha, turno_id):
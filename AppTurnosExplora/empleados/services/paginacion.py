@@ -0,0 +1,120 @@
+import base64
+import binascii
+import datetime
+import json
+from collections import namedtuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# elementos de la página y cursores (None si no hay) para pedir la siguiente y la anterior
+Pagina = namedtuple('Pagina', ['elementos', 'siguiente', 'anterior'])
+
+
+class _CodificadorCursor(DjangoJSONEncoder):
+    """Como DjangoJSONEncoder pero con microsegundos: recortarlos correría el cursor"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class PaginacionKeyset:
+    """
+    Paginación por cursor (keyset) sobre un orden total de campos, p. ej. ['apellido', 'nombre', 'id'].
+
+    En vez de OFFSET, cada página filtra "después de la última fila vista", así que el costo no
+    crece con el número de página y las filas insertadas entre peticiones no desplazan el
+    listado. El último campo del orden debe ser único (normalmente 'id'); con '-campo' se
+    ordena descendente.
+    """
+
+    @staticmethod
+    def codificar(valores):
+        return base64.urlsafe_b64encode(json.dumps(valores, cls=_CodificadorCursor).encode()).decode()
+
+    @staticmethod
+    def url(request, parametro, cursor):
+        """Query string de la página `cursor` ('despues' o 'antes') conservando los demás parámetros"""
+        if not cursor:
+            return None
+        params = request.GET.copy()
+        params.pop('despues', None)
+        params.pop('antes', None)
+        params[parametro] = cursor
+        return f'?{params.urlencode()}'
+
+    @staticmethod
+    def decodificar(cursor, campos):
+        """Valores del cursor, o None si no es válido para este orden"""
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+        if not isinstance(valores, list) or len(valores) != len(campos):
+            return None
+        return valores
+
+    @staticmethod
+    def _filtro(campos, valores, adelante):
+        """
+        Filas estrictamente después (o antes) de `valores` en el orden de `campos`:
+        (a > x) OR (a = x AND b > y) OR ...
+        """
+        filtro = Q()
+        iguales = Q()
+        for campo, valor in zip(campos, valores):
+            nombre = campo.lstrip('-')
+            mayor = campo.startswith('-') != adelante
+            filtro |= iguales & Q(**{f'{nombre}__{"gt" if mayor else "lt"}': valor})
+            iguales &= Q(**{nombre: valor})
+        return filtro
+
+    @staticmethod
+    def _invertir(campos):
+        return [campo[1:] if campo.startswith('-') else f'-{campo}' for campo in campos]
+
+    @staticmethod
+    def _cursor(elemento, campos):
+        return PaginacionKeyset.codificar([getattr(elemento, campo.lstrip('-')) for campo in campos])
+
+    @staticmethod
+    def paginar(queryset, campos, tamano, despues=None, antes=None):
+        """
+        Una página de `queryset` en el orden de `campos` con una sola consulta.
+
+        Args:
+            despues: cursor de la página siguiente (Pagina.siguiente)
+            antes: cursor de la página anterior (Pagina.anterior)
+
+        Returns:
+            Pagina
+        """
+        valores_despues = PaginacionKeyset.decodificar(despues, campos) if despues else None
+        valores_antes = PaginacionKeyset.decodificar(antes, campos) if antes and not valores_despues else None
+
+        if valores_antes:
+            # Hacia atrás: se recorre en orden inverso y se da vuelta la página
+            filas = list(
+                queryset.filter(PaginacionKeyset._filtro(campos, valores_antes, adelante=False))
+                .order_by(*PaginacionKeyset._invertir(campos))[:tamano + 1]
+            )
+            hay_mas = len(filas) > tamano
+            elementos = filas[:tamano][::-1]
+            return Pagina(
+                elementos,
+                PaginacionKeyset._cursor(elementos[-1], campos) if elementos else None,
+                PaginacionKeyset._cursor(elementos[0], campos) if elementos and hay_mas else None,
+            )
+
+        if valores_despues:
+            queryset = queryset.filter(PaginacionKeyset._filtro(campos, valores_despues, adelante=True))
+        filas = list(queryset.order_by(*campos)[:tamano + 1])
+        hay_mas = len(filas) > tamano
+        elementos = filas[:tamano]
+        return Pagina(
+            elementos,
+            PaginacionKeyset._cursor(elementos[-1], campos) if elementos and hay_mas else None,
+            PaginacionKeyset._cursor(elementos[0], campos) if elementos and valores_despues else None,
+        )
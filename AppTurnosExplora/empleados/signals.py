@@ -0,0 +1,21 @@
+"""
+Señales que mantienen el índice de búsqueda de empleados (TerminoBusquedaEmpleado).
+
+Las cargas masivas (bulk_create, update) no emiten señales: deben llamar a
+BusquedaEmpleados.indexar() o reindexar_todo().
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from empleados.models import Empleado
+from empleados.services.busqueda_empleados import BusquedaEmpleados
+
+CAMPOS_INDEXADOS = {'nombre', 'apellido', 'cedula'}
+
+
+@receiver(post_save, sender=Empleado)
+def empleado_guardado(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or (update_fields is not None and not CAMPOS_INDEXADOS & set(update_fields)):
+        return
+    BusquedaEmpleados.indexar([instance])
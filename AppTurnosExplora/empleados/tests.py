@@ -1,6 +1,17 @@
+from datetime import date, time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
 from config.wsgi import *
-from empleados.models import Role
+from empleados.models import CompetenciaEmpleado, Empleado, EmpleadoRole, Jornada, Role, Sala, TerminoBusquedaEmpleado
+from empleados.services.busqueda_empleados import BusquedaEmpleados
+from empleados.views import EmpleadoListView
+from turnos.models import AsignarJornadaExplorador
 
 
 #listar
@@ -68,3 +79,133 @@ class RoleTestCase(TestCase):
 #r= Role.objects.limit(1)
 #print(r)
 
+
+class EmpleadoListViewTest(TestCase):
+    """El directorio de empleados pagina por cursor con un número fijo de consultas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        cls.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        cls.sala = Sala.objects.create(nombre='Acuario')
+        cls.rol = Role.objects.create(nombre='Explorador')
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+
+    def _crear_empleados(self, cantidad):
+        inicio = Empleado.objects.count()
+        for i in range(inicio, inicio + cantidad):
+            empleado = Empleado.objects.create(
+                user=User.objects.create(username=f'directorio{i}'),
+                nombre=f'Nombre{i:03d}', apellido=f'Apellido{i % 7}', cedula=str(10000 + i), email=f'd{i}@test.com'
+            )
+            AsignarJornadaExplorador.objects.create(
+                explorador=empleado, jornada=self.am, fecha_inicio=date(2024, 1, 1), fecha_fin=date(2024, 12, 31)
+            )
+            AsignarJornadaExplorador.objects.create(explorador=empleado, jornada=self.pm, fecha_inicio=date(2025, 1, 1))
+            CompetenciaEmpleado.objects.create(empleado=empleado, sala=self.sala)
+            EmpleadoRole.objects.create(empleado=empleado, role=self.rol)
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_consultas_constantes(self):
+        self.client.force_login(self.admin)
+        self._crear_empleados(5)
+        _, base = self._get(reverse('empleados'))
+        self._crear_empleados(40)
+        response, consultas = self._get(reverse('empleados'))
+        self.assertEqual(consultas, base)
+        self.assertContains(response, '<span class="badge badge-secondary">PM</span>', count=45, html=True)
+
+    @patch.object(EmpleadoListView, 'TAMANO_PAGINA', 10)
+    def test_paginas_por_cursor(self):
+        self.client.force_login(self.admin)
+        self._crear_empleados(23)
+        esperado = list(Empleado.objects.order_by('apellido', 'nombre', 'id'))
+
+        vistos, paginas, url = [], [], reverse('empleados')
+        while url:
+            response, _ = self._get(url)
+            paginas.append(list(response.context['empleados']))
+            vistos += paginas[-1]
+            siguiente = response.context['url_siguiente']
+            url = f"{reverse('empleados')}{siguiente}" if siguiente else None
+        self.assertEqual(vistos, esperado)
+        self.assertEqual([len(p) for p in paginas], [10, 10, 3])
+
+        # Volver atrás desde la última página devuelve la anterior
+        response, _ = self._get(f"{reverse('empleados')}{response.context['url_anterior']}")
+        self.assertEqual(list(response.context['empleados']), paginas[1])
+
+
+class BusquedaEmpleadosTest(TestCase):
+    """Búsqueda por prefijo de palabra, sin mayúsculas ni tildes, sobre el índice de términos"""
+
+    @classmethod
+    def setUpTestData(cls):
+        datos = [('José María', 'Núñez Peña', '1001'), ('Maria', 'Gómez', '1002'),
+                 ('Ángela', 'Ibáñez', '2001'), ('Josefina', 'López', '2002')]
+        cls.empleados = [
+            Empleado.objects.create(user=User.objects.create(username=f'busqueda{i}'), nombre=nombre,
+                                    apellido=apellido, cedula=cedula, email=f'b{i}@test.com')
+            for i, (nombre, apellido, cedula) in enumerate(datos)
+        ]
+
+    def _buscar(self, query):
+        return [e.apellido for e in BusquedaEmpleados.buscar(query)]
+
+    def test_prefijo_sin_tildes(self):
+        self.assertEqual(self._buscar('jose'), ['López', 'Núñez Peña'])
+        self.assertEqual(self._buscar('NUÑ'), ['Núñez Peña'])
+        self.assertEqual(self._buscar('angela ibanez'), ['Ibáñez'])
+        self.assertEqual(self._buscar('maria'), ['Gómez', 'Núñez Peña'])
+        self.assertEqual(self._buscar('maria gom'), ['Gómez'])
+        self.assertEqual(self._buscar('20'), ['Ibáñez', 'López'])
+        # Solo prefijos de palabra, no subcadenas
+        self.assertEqual(self._buscar('ez'), [])
+        self.assertEqual(self._buscar(' - '), [])
+
+    def test_reindexa_al_guardar(self):
+        empleado = self.empleados[1]
+        empleado.apellido = 'Ordóñez'
+        empleado.save()
+        self.assertEqual(self._buscar('ordo'), ['Ordóñez'])
+        self.assertEqual(self._buscar('gomez'), [])
+        # Guardar otros campos no toca el índice
+        with CaptureQueriesContext(connection) as ctx:
+            empleado.save(update_fields=['activo'])
+        self.assertFalse([q for q in ctx.captured_queries if 'terminobusqueda' in q['sql']])
+
+    def test_reindexar_todo(self):
+        TerminoBusquedaEmpleado.objects.all().delete()
+        self.assertEqual(BusquedaEmpleados.reindexar_todo(lote=3), 4)
+        self.assertEqual(self._buscar('pena'), ['Núñez Peña'])
+
+    def test_autocompletar(self):
+        self.client.force_login(User.objects.create(username='consulta', is_staff=True))
+        url = reverse('empleado_autocompletar')
+        self.assertEqual(self.client.get(url, {'q': 'j'}).json(), {'resultados': []})
+        self.assertEqual(self.client.get(url, {'q': 'jo', 'limite': 'x'}).status_code, 400)
+
+        self.empleados[3].activo = False
+        self.empleados[3].save()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'q': 'jo', 'limite': 1})
+        resultados = response.json()['resultados']
+        self.assertEqual(resultados, [{'id': self.empleados[0].id, 'nombre': 'José María', 'apellido': 'Núñez Peña'}])
+        # Sesión, usuario y la búsqueda
+        self.assertEqual(len(ctx.captured_queries), 3)
+
+    def test_autocompletar_sin_admin_solo_sus_salas(self):
+        acuario, planetario = Sala.objects.create(nombre='Acuario'), Sala.objects.create(nombre='Planetario')
+        for empleado, sala in zip(self.empleados, (acuario, planetario, acuario, planetario)):
+            CompetenciaEmpleado.objects.create(empleado=empleado, sala=sala)
+        url = reverse('empleado_autocompletar')
+
+        self.client.force_login(self.empleados[2].user)
+        self.assertEqual([r['apellido'] for r in self.client.get(url, {'q': 'jose'}).json()['resultados']], ['Núñez Peña'])
+        self.client.force_login(User.objects.create(username='sin_empleado'))
+        self.assertEqual(self.client.get(url, {'q': 'jose'}).json()['resultados'], [])
@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    EmpleadoListView, EmpleadoDetailView, EmpleadoEditView, EmpleadoDeleteView,
+    EmpleadoListView, EmpleadoAutocompletarView, EmpleadoDetailView, EmpleadoEditView, EmpleadoDeleteView,
     RestriccionesView, SeccionesView, JornadasView,
     RoleListView, RoleCreateView, EmpleadoUsuarioCreateView, AsignarRolesSalasView,
     SalaListView, SalaCreateView, SalaUpdateView, SalaDeleteView,
@@ -14,6 +14,7 @@ from .views import (
 
 urlpatterns = [
     path('', EmpleadoListView.as_view(), name='empleados'),
+    path('autocompletar/', EmpleadoAutocompletarView.as_view(), name='empleado_autocompletar'),
     path('detail/<int:pk>/', EmpleadoDetailView.as_view(), name='empleado_detail'),
     path('edit/<int:pk>/', EmpleadoEditView.as_view(), name='empleado_edit'),
     path('delete/<int:pk>/', EmpleadoDeleteView.as_view(), name='empleado_delete'),
@@ -4,11 +4,14 @@ from django.views.generic import ListView, DetailView, UpdateView, TemplateView
 from django.views.generic.edit import CreateView, DeleteView
 from django.core.exceptions import PermissionDenied
 from .services.empleado_service import EmpleadoService
+from .services.paginacion import PaginacionKeyset
+from .services.busqueda_empleados import BusquedaEmpleados
 from .models import Empleado, Role, Sala, EmpleadoRole, CompetenciaEmpleado, Jornada, RestriccionEmpleado, SancionEmpleado
 from permisos.models import PDH
 from django import forms
 from django.contrib.auth.models import User
 from django.views import View
+from django.http import JsonResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.forms import SetPasswordForm
@@ -40,62 +43,58 @@ class AdminRequiredMixin:
         # Si no cumple ninguna condición, denegar acceso
         raise PermissionDenied("No tienes permisos de administrador.")
 
+def _es_admin(user):
+    """Staff o empleado con rol Supervisor"""
+    if user.is_staff:
+        return True
+    empleado = getattr(user, 'empleado', None)
+    return bool(empleado and empleado.empleadorole_set.filter(role__nombre__icontains='supervisor').exists())
+
 # Create your views here.
 
 class EmpleadoListView(LoginRequiredMixin, ListView):
     template_name = 'empleados/lista.html'
     context_object_name = 'empleados'
-    
+    # Orden total para la paginación por cursor (el id desempata)
+    ORDEN = ['apellido', 'nombre', 'id']
+    TAMANO_PAGINA = 50
+
+    def _es_admin(self):
+        """Staff o empleado con rol Supervisor (se calcula una vez por petición)"""
+        if not hasattr(self, '_admin'):
+            self._admin = _es_admin(self.request.user)
+        return self._admin
+
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # Función para verificar si el usuario es administrador
-        def is_admin_user(user):
-            if user.is_staff:
-                return True
-            try:
-                empleado = user.empleado
-                return empleado.empleadorole_set.filter(role__nombre__icontains='supervisor').exists()
-            except:
-                return False
-        context['is_admin_user'] = is_admin_user(self.request.user)
-        # Si el usuario no tiene empleado, mostrar advertencia
-        try:
-            _ = self.request.user.empleado
-            context['has_empleado'] = True
-        except Exception:
-            context['has_empleado'] = False
-        # Agregar jornadas actuales de cada empleado
-        empleados = context.get('empleados', [])
-        empleados_jornadas = []
-        for empleado in empleados:
-            asignacion = AsignarJornadaExplorador.objects.filter(explorador=empleado).order_by('-fecha_inicio').first()
-            jornada = asignacion.jornada.nombre if asignacion else "-"
-            empleados_jornadas.append((empleado, jornada))
-        context['empleados_jornadas'] = empleados_jornadas
+        # Una página del listado: una consulta para las filas (con jornada y usuario) y dos para salas y roles
+        pagina = PaginacionKeyset.paginar(
+            EmpleadoService.directorio(self.object_list),
+            self.ORDEN,
+            self.TAMANO_PAGINA,
+            despues=self.request.GET.get('despues'),
+            antes=self.request.GET.get('antes'),
+        )
+        context = super().get_context_data(object_list=pagina.elementos, **kwargs)
+        context['is_admin_user'] = self._es_admin()
+        context['has_empleado'] = hasattr(self.request.user, 'empleado')
+        context['q'] = self.request.GET.get('q', '')
+        context['url_siguiente'] = PaginacionKeyset.url(self.request, 'despues', pagina.siguiente)
+        context['url_anterior'] = PaginacionKeyset.url(self.request, 'antes', pagina.anterior)
         return context
     
     def get_queryset(self):
-        user = self.request.user
-
-        if user.is_superuser or user.is_staff:
-            return Empleado.objects.all()
-        
-        if user.is_supervisor:
-            return Empleado.objects.filter(empleadorole_set__role__nombre__icontains='supervisor')
-        
-        
-        try:
-            empleado = self.request.user.empleado
-        except Exception:
-            return Empleado.objects.none()
-
         # Mostrar todos los empleados si es admin o supervisor
-        if self.request.user.is_staff or empleado.empleadorole_set.filter(role__nombre__icontains='supervisor').exists():
+        if self._es_admin():
             query = self.request.GET.get('q', '')
             if query:
                 return EmpleadoService.buscar_empleados(query)
             return Empleado.objects.all()
 
+        try:
+            empleado = self.request.user.empleado
+        except Exception:
+            return Empleado.objects.none()
+
         # Si no es admin/supervisor, filtrar por sala o mostrar ninguno
         sala_id = self.request.GET.get('sala')
         if sala_id:
@@ -105,6 +104,45 @@ class EmpleadoListView(LoginRequiredMixin, ListView):
             return EmpleadoService.get_empleados_by_sala(competencia.sala_id)
         return Empleado.objects.none()
 
+class EmpleadoAutocompletarView(LoginRequiredMixin, View):
+    """
+    Sugerencias de empleados activos para campos de búsqueda: GET ?q=<texto>&limite=<n>.
+    Una sola consulta sobre el índice de términos; devuelve solo lo necesario para mostrar.
+    Igual que EmpleadoListView, quien no es admin solo ve a los empleados de sus salas.
+    """
+    MIN_CARACTERES = 2
+    MAX_CARACTERES = 100
+    LIMITE = 10
+    LIMITE_MAXIMO = 25
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()[:self.MAX_CARACTERES]
+        if len(query) < self.MIN_CARACTERES:
+            return JsonResponse({'resultados': []})
+        try:
+            limite = min(max(int(request.GET.get('limite', self.LIMITE)), 1), self.LIMITE_MAXIMO)
+        except ValueError:
+            return JsonResponse({'error': 'El límite debe ser un número'}, status=400)
+
+        resultados = list(
+            BusquedaEmpleados.buscar(query, self._visibles(request.user))
+            .values('id', 'nombre', 'apellido')[:limite]
+        )
+        return JsonResponse({'resultados': resultados})
+
+    @staticmethod
+    def _visibles(user):
+        empleados = Empleado.objects.filter(activo=True)
+        if _es_admin(user):
+            return empleados
+        empleado = getattr(user, 'empleado', None)
+        if empleado is None:
+            return empleados.none()
+        salas = CompetenciaEmpleado.objects.filter(empleado=empleado).values('sala_id')
+        return empleados.filter(
+            id__in=CompetenciaEmpleado.objects.filter(sala_id__in=salas).values('empleado_id')
+        )
+
 class EmpleadoDetailView(LoginRequiredMixin, DetailView):
     model = Empleado
     template_name = 'empleados/detail.html'
@@ -376,13 +414,13 @@ class PDHListView(LoginRequiredMixin, ListView):
 class PDHCreateView(LoginRequiredMixin, AdminRequiredMixin, CreateView):
     model = PDH
     template_name = 'empleados/pdh_create.html'
-    fields = ['empleado', 'fecha', 'horas', 'monto', 'estado']
+    fields = ['explorador', 'solicitud', 'fecha', 'horas', 'supervisor', 'tipo_registro', 'comentario']
     success_url = '/empleados/pdh/'
 
 class PDHUpdateView(LoginRequiredMixin, AdminRequiredMixin, UpdateView):
     model = PDH
     template_name = 'empleados/pdh_edit.html'
-    fields = ['empleado', 'fecha', 'horas', 'monto', 'estado']
+    fields = ['explorador', 'solicitud', 'fecha', 'horas', 'supervisor', 'tipo_registro', 'comentario']
     success_url = '/empleados/pdh/'
 
 class PDHDeleteView(LoginRequiredMixin, AdminRequiredMixin, DeleteView):
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SolicitudesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'solicitudes'
+
+    def ready(self):
+        # Mantener el contador de notificaciones no leídas
+        from . import signals  # noqa: F401
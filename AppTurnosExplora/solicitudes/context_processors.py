@@ -0,0 +1,28 @@
+from django.conf import settings
+
+from .services.contador_notificaciones import ContadorNotificaciones
+
+
+def notificaciones(request):
+    """
+    Expone `notificaciones_no_leidas_count` para el badge del menú y
+    `notificaciones_sse_activo` para conectar el stream que lo actualiza.
+
+    Se pasa como callable: la plantilla solo lo evalúa si lo usa (una vez por request
+    aunque aparezca varias veces), y se lee del contador cacheado (con el empleado del
+    usuario también cacheado), sin consultar Empleado ni Notificacion.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    leido = {}
+
+    def notificaciones_no_leidas_count():
+        if 'valor' not in leido:
+            leido['valor'] = ContadorNotificaciones.obtener_de_usuario(user.id)
+        return leido['valor']
+
+    return {
+        'notificaciones_no_leidas_count': notificaciones_no_leidas_count,
+        'notificaciones_sse_activo': getattr(settings, 'NOTIFICACIONES_SSE_ACTIVO', False),
+    }
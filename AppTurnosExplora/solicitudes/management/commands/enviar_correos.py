@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from solicitudes.services.correo_service import CorreoService
+from solicitudes.services.transporte_correo import TransporteCorreo
+
+
+class Command(BaseCommand):
+    help = 'Envía los correos pendientes de la bandeja de salida (CorreoPendiente)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, help='Correos por conexión (por defecto CORREO_LOTE)')
+        parser.add_argument('--continuo', action='store_true',
+                            help='No terminar: seguir revisando la cola cada --intervalo segundos')
+        parser.add_argument('--intervalo', type=float, default=5, help='Segundos de espera con la cola vacía')
+
+    def handle(self, *args, **options):
+        total_enviados, total_fallidos = 0, 0
+        try:
+            while True:
+                enviados, fallidos = CorreoService.procesar_pendientes(options['lote'])
+                total_enviados += enviados
+                total_fallidos += fallidos
+                if enviados or fallidos:
+                    continue
+                if not options['continuo']:
+                    break
+                time.sleep(options['intervalo'])
+        finally:
+            TransporteCorreo.cerrar()
+
+        metricas = TransporteCorreo.metricas()
+        self.stdout.write(self.style.SUCCESS(f'Correos enviados: {total_enviados}, con error: {total_fallidos}'))
+        self.stdout.write(
+            f"Conexiones abiertas: {metricas['aperturas']}, sesiones de envío: {metricas['sesiones']}, "
+            f"reutilización: {metricas['tasa_reutilizacion']:.0%}"
+        )
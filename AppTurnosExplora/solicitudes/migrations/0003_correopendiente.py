@@ -0,0 +1,32 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoPendiente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=255)),
+                ('mensaje', models.TextField()),
+                ('mensaje_html', models.TextField(blank=True, null=True)),
+                ('remitente', models.CharField(max_length=254)),
+                ('destinatarios', models.JSONField()),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('ultimo_error', models.TextField(blank=True, null=True)),
+                ('creado_en', models.DateTimeField(auto_now_add=True)),
+                ('enviado_en', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='correo_pendiente_idx')],
+            },
+        ),
+    ]
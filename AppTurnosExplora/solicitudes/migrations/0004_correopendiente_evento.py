@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0003_correopendiente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correopendiente',
+            name='evento',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
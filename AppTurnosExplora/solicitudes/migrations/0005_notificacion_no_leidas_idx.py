@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solicitudes', '0004_correopendiente_evento'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['destinatario', 'leida'], name='notificacion_no_leidas_idx'),
+        ),
+    ]
@@ -24,6 +24,10 @@ class Notificacion(models.Model):
     
     class Meta:
         ordering = ['-fecha_creacion']
+        indexes = [
+            # Contador y listado de no leídas por empleado
+            models.Index(fields=['destinatario', 'leida'], name='notificacion_no_leidas_idx'),
+        ]
     
     def __str__(self):
         return f"{self.titulo} - {self.destinatario.nombre} {self.destinatario.apellido}"
@@ -98,4 +102,38 @@ class DobladaDetalle(models.Model):
         return f"solicitud: {self.solicitud.id} - fecha: {self.solicitud.fecha_solicitud}" #type:ignore
 
 
+class CorreoPendiente(models.Model):
+    """
+    Bandeja de salida de correos. Las peticiones solo encolan; el comando enviar_correos
+    los envía en lotes sobre una misma conexión SMTP, con reintentos y backoff.
+    """
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    asunto = models.CharField(max_length=255)
+    mensaje = models.TextField()
+    mensaje_html = models.TextField(null=True, blank=True)
+    remitente = models.CharField(max_length=254)
+    destinatarios = models.JSONField()
+    # Correos del mismo evento de negocio (p. ej. una aprobación) se envían juntos en una sesión SMTP
+    evento = models.CharField(max_length=100, null=True, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    intentos = models.PositiveIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(null=True, blank=True)
+    creado_en = models.DateTimeField(auto_now_add=True)
+    enviado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_pendiente_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} -> {', '.join(self.destinatarios)} ({self.estado})"
+
+
 # Create your models here.
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class CanalNotificaciones:
+    """
+    Pub/sub en memoria del proceso para empujar notificaciones a los clientes conectados
+    (NotificacionesStreamView, Server-Sent Events).
+
+    Cada conexión se suscribe con una cola asyncio en el event loop del servidor ASGI;
+    publicar() puede llamarse desde código síncrono en cualquier hilo (por ejemplo un
+    on_commit dentro de una vista síncrona) y entrega con call_soon_threadsafe.
+
+    Solo alcanza a las conexiones del mismo proceso: con varios workers ASGI hace falta un
+    broker compartido (p. ej. Redis pub/sub) detrás de la misma interfaz.
+    """
+
+    MAX_PENDIENTES = 100
+
+    _lock = threading.Lock()
+    _suscriptores = {}  # {user_id: {(loop, cola), ...}}
+
+    @classmethod
+    @asynccontextmanager
+    async def suscripcion(cls, user_id):
+        """Cola con los eventos del usuario mientras dure el bloque"""
+        suscriptor = (asyncio.get_running_loop(), asyncio.Queue(maxsize=cls.MAX_PENDIENTES))
+        with cls._lock:
+            cls._suscriptores.setdefault(user_id, set()).add(suscriptor)
+        try:
+            yield suscriptor[1]
+        finally:
+            with cls._lock:
+                suscriptores = cls._suscriptores.get(user_id)
+                if suscriptores is not None:
+                    suscriptores.discard(suscriptor)
+                    if not suscriptores:
+                        del cls._suscriptores[user_id]
+
+    @staticmethod
+    def _entregar(cola, evento):
+        try:
+            cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente que no consume: se descarta; al reconectar recibe el contador completo
+            logger.warning("Cola de notificaciones llena, evento descartado", extra={'evento': evento.get('tipo')})
+
+    @classmethod
+    def publicar(cls, user_id, evento):
+        """Envía `evento` (dict serializable) a todas las conexiones abiertas del usuario"""
+        with cls._lock:
+            suscriptores = list(cls._suscriptores.get(user_id, ()))
+        for loop, cola in suscriptores:
+            try:
+                loop.call_soon_threadsafe(cls._entregar, cola, evento)
+            except RuntimeError:
+                # El event loop de esa conexión ya se cerró
+                pass
+
+    @classmethod
+    def conectados(cls, user_id):
+        """Número de conexiones abiertas del usuario en este proceso"""
+        with cls._lock:
+            return len(cls._suscriptores.get(user_id, ()))
@@ -0,0 +1,123 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from empleados.models import Empleado
+from solicitudes.models import Notificacion
+from .canal_notificaciones import CanalNotificaciones
+
+
+class ContadorNotificaciones:
+    """
+    Contador cacheado de notificaciones no leídas por empleado (badge del menú).
+
+    La clave es el id del Empleado destinatario (destinatario_id de Notificacion), así que
+    quien escribe no necesita cargar el destinatario. Desde el request se llega al empleado
+    con otra entrada de caché (User -> Empleado), y leer el contador en cada página no cuesta
+    consultas mientras ambas estén en caché; si falta la del empleado, una sola consulta trae
+    el empleado y su contador.
+
+    Si el contador no existe, la primera lectura lo siembra con un COUNT y cache.add, que
+    nunca pisa un valor ya sembrado. Desde ahí crear, leer y borrar lo ajustan con incr/decr
+    (atómicos en la caché) después del commit, sin volver a contar. Los ajustes con usuario
+    conocido se publican en CanalNotificaciones. El timeout acota cualquier desfase restante.
+    """
+
+    PREFIJO = 'solicitudes:no_leidas'
+    PREFIJO_EMPLEADO = 'solicitudes:empleado_de_usuario'
+
+    @staticmethod
+    def _cache():
+        return caches[getattr(settings, 'TURNOS_CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'NOTIFICACIONES_CONTADOR_TIMEOUT', 10 * 60)
+
+    @staticmethod
+    def _clave(empleado_id):
+        return f'{ContadorNotificaciones.PREFIJO}:{empleado_id}'
+
+    @staticmethod
+    def obtener_de_usuario(user_id):
+        """Número de notificaciones no leídas del empleado del User (0 si no tiene)"""
+        cache = ContadorNotificaciones._cache()
+        clave_empleado = f'{ContadorNotificaciones.PREFIJO_EMPLEADO}:{user_id}'
+        empleado_id = cache.get(clave_empleado)
+        if empleado_id is not None:
+            return ContadorNotificaciones.obtener(empleado_id) if empleado_id else 0
+
+        fila = (
+            Empleado.objects.filter(user_id=user_id)
+            .annotate(no_leidas=Count('notificaciones', filter=Q(notificaciones__leida=False)))
+            .values_list('id', 'no_leidas')
+            .first()
+        )
+        empleado_id, valor = fila or (0, 0)
+        if not connection.in_atomic_block:
+            cache.set(clave_empleado, empleado_id, ContadorNotificaciones._timeout())
+            if empleado_id:
+                cache.add(ContadorNotificaciones._clave(empleado_id), valor, ContadorNotificaciones._timeout())
+        return valor
+
+    @staticmethod
+    def obtener(empleado_id):
+        """Número de notificaciones no leídas del empleado"""
+        cache = ContadorNotificaciones._cache()
+        clave = ContadorNotificaciones._clave(empleado_id)
+        valor = cache.get(clave)
+        if valor is None:
+            valor = Notificacion.objects.filter(destinatario_id=empleado_id, leida=False).count()
+            # Dentro de una transacción el COUNT puede incluir filas que aún se pueden revertir
+            if not connection.in_atomic_block:
+                cache.add(clave, valor, ContadorNotificaciones._timeout())
+        return valor
+
+    @staticmethod
+    def _aplicar(empleado_id, delta, user_id=None):
+        cache = ContadorNotificaciones._cache()
+        clave = ContadorNotificaciones._clave(empleado_id)
+        try:
+            valor = cache.incr(clave, delta)
+            if valor < 0:
+                cache.delete(clave)
+                valor = None
+        except ValueError:
+            # No estaba sembrado: se contará en la próxima lectura
+            valor = None
+        if user_id is not None:
+            CanalNotificaciones.publicar(user_id, {'tipo': 'contador', 'delta': delta, 'no_leidas': valor})
+
+    @staticmethod
+    def ajustar(deltas, usuarios=None):
+        """
+        Suma `deltas` ({empleado_id: delta}) a los contadores cacheados al confirmar la
+        transacción. `usuarios` ({empleado_id: user_id}) indica a quién publicar el ajuste.
+        """
+        usuarios = usuarios or {}
+        for empleado_id, delta in deltas.items():
+            if delta:
+                transaction.on_commit(
+                    lambda e=empleado_id, d=delta, u=usuarios.get(empleado_id): ContadorNotificaciones._aplicar(e, d, u)
+                )
+
+    @staticmethod
+    def ajustar_empleado(empleado, delta):
+        ContadorNotificaciones.ajustar({empleado.id: delta}, {empleado.id: empleado.user_id})
+
+    @staticmethod
+    def sumar_creadas(notificaciones):
+        """Suma las notificaciones recién creadas (no leídas) a sus destinatarios"""
+        no_leidas = [n for n in notificaciones if not n.leida]
+        ContadorNotificaciones.ajustar(
+            Counter(n.destinatario_id for n in no_leidas),
+            {n.destinatario_id: n.destinatario.user_id for n in no_leidas if Notificacion.destinatario.is_cached(n)},
+        )
+
+    @staticmethod
+    def invalidar(empleado_id):
+        """Descarta el contador del empleado; se recalcula en la próxima lectura"""
+        transaction.on_commit(lambda: ContadorNotificaciones._cache().delete(ContadorNotificaciones._clave(empleado_id)))
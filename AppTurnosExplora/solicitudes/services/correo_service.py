@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from itertools import groupby
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from solicitudes.models import CorreoPendiente
+from .transporte_correo import TransporteCorreo
+
+logger = logging.getLogger(__name__)
+
+# Evento de negocio en curso; los correos encolados dentro se agrupan en un solo envío
+_evento_actual = ContextVar('correo_evento', default=None)
+
+
+class CorreoService:
+    """
+    Bandeja de salida persistente (CorreoPendiente).
+
+    - encolar() / encolar_varios(): lo que usan las peticiones; solo insertan filas, sin tocar SMTP.
+      Al ser parte de la transacción de negocio, si esta se revierte el correo no sale.
+    - procesar_pendientes(): lo que ejecuta el comando enviar_correos; reclama un lote,
+      envía cada evento en una sesión de la conexión compartida del worker (TransporteCorreo)
+      y reprograma los fallidos con backoff exponencial.
+    """
+
+    @staticmethod
+    def _config(nombre, por_defecto):
+        return getattr(settings, nombre, por_defecto)
+
+    @staticmethod
+    @contextmanager
+    def evento(clave):
+        """Agrupa los correos encolados durante el bloque bajo el evento `clave`"""
+        token = _evento_actual.set(clave[:100])
+        try:
+            yield
+        finally:
+            _evento_actual.reset(token)
+
+    @staticmethod
+    def encolar(asunto, mensaje, destinatarios, remitente=None, mensaje_html=None, evento=None):
+        destinatarios = [d for d in destinatarios if d]
+        if not destinatarios:
+            return None
+        return CorreoPendiente.objects.create(
+            asunto=asunto[:255],
+            mensaje=mensaje,
+            mensaje_html=mensaje_html,
+            remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+            destinatarios=destinatarios,
+            evento=evento or _evento_actual.get(),
+        )
+
+    @staticmethod
+    def encolar_varios(correos, evento=None):
+        """
+        Encola varios correos de un mismo evento con un solo INSERT.
+
+        Args:
+            correos: dicts con asunto, mensaje, destinatarios y opcionalmente remitente y mensaje_html
+        """
+        evento = evento or _evento_actual.get()
+        pendientes = [
+            CorreoPendiente(
+                asunto=correo['asunto'][:255],
+                mensaje=correo['mensaje'],
+                mensaje_html=correo.get('mensaje_html'),
+                remitente=correo.get('remitente') or settings.DEFAULT_FROM_EMAIL,
+                destinatarios=destinatarios,
+                evento=evento[:100] if evento else None,
+            )
+            for correo in correos
+            for destinatarios in [[d for d in correo['destinatarios'] if d]]
+            if destinatarios
+        ]
+        return CorreoPendiente.objects.bulk_create(pendientes) if pendientes else []
+
+    @staticmethod
+    def _backoff(intentos):
+        """Espera antes del siguiente intento: base * 2^(intentos-1), con tope"""
+        base = CorreoService._config('CORREO_BACKOFF_SEGUNDOS', 60)
+        tope = CorreoService._config('CORREO_BACKOFF_MAXIMO_SEGUNDOS', 6 * 60 * 60)
+        return timedelta(seconds=min(base * 2 ** (intentos - 1), tope))
+
+    @staticmethod
+    def _reclamar_lote(limite):
+        """
+        Toma hasta `limite` correos vencidos y corre su proximo_intento un "lease" hacia adelante,
+        para que otro worker no los envíe en paralelo. Si este proceso muere, el lease vence
+        y se reintentan.
+        """
+        ahora = timezone.now()
+        lease = timedelta(seconds=CorreoService._config('CORREO_LEASE_SEGUNDOS', 5 * 60))
+        with transaction.atomic():
+            lote = list(
+                CorreoPendiente.objects
+                .select_for_update(skip_locked=True)
+                .filter(estado='pendiente', proximo_intento__lte=ahora)
+                .order_by('proximo_intento', 'id')[:limite]
+            )
+            if lote:
+                CorreoPendiente.objects.filter(id__in=[c.id for c in lote]).update(proximo_intento=ahora + lease)
+        return lote
+
+    @staticmethod
+    def _registrar_fallo(correo, error):
+        correo.intentos += 1
+        correo.ultimo_error = str(error)[:2000]
+        if correo.intentos >= CorreoService._config('CORREO_MAX_INTENTOS', 5):
+            correo.estado = 'fallido'
+            logger.error("Correo descartado tras %s intentos", correo.intentos, extra={'correo_id': correo.id})
+        else:
+            correo.proximo_intento = timezone.now() + CorreoService._backoff(correo.intentos)
+            logger.warning("Error enviando correo, se reintentará", extra={
+                'correo_id': correo.id, 'intentos': correo.intentos, 'proximo_intento': str(correo.proximo_intento)
+            })
+        correo.save(update_fields=['intentos', 'ultimo_error', 'estado', 'proximo_intento'])
+
+    @staticmethod
+    def _construir_mensaje(correo):
+        email = EmailMultiAlternatives(
+            subject=correo.asunto,
+            body=correo.mensaje,
+            from_email=correo.remitente,
+            to=correo.destinatarios,
+        )
+        if correo.mensaje_html:
+            email.attach_alternative(correo.mensaje_html, 'text/html')
+        return email
+
+    @staticmethod
+    def _agrupar_por_evento(lote):
+        """Grupos de correos a enviar juntos; los que no tienen evento van solos"""
+        lote = sorted(lote, key=lambda c: (c.evento is None, c.evento or '', c.id))
+        for evento, correos in groupby(lote, key=lambda c: c.evento):
+            if evento is None:
+                for correo in correos:
+                    yield [correo]
+            else:
+                yield list(correos)
+
+    @staticmethod
+    def procesar_pendientes(limite=None):
+        """
+        Envía un lote de correos pendientes: una sesión por evento, todas sobre la conexión
+        compartida del worker. Si un envío falla, solo ese correo cuenta el intento; los que
+        ya salieron quedan enviados y los que no se intentaron vuelven a la cola sin esperar.
+
+        Returns:
+            (enviados, fallidos) del lote
+        """
+        lote = CorreoService._reclamar_lote(limite or CorreoService._config('CORREO_LOTE', 50))
+        if not lote:
+            return 0, 0
+
+        enviados, fallidos = 0, 0
+        for grupo in CorreoService._agrupar_por_evento(lote):
+            salieron, error = TransporteCorreo.enviar([CorreoService._construir_mensaje(c) for c in grupo])
+            if salieron:
+                CorreoPendiente.objects.filter(id__in=[c.id for c in grupo[:salieron]]).update(
+                    estado='enviado', enviado_en=timezone.now(), intentos=F('intentos') + 1
+                )
+                enviados += salieron
+            if error is not None:
+                CorreoService._registrar_fallo(grupo[salieron], error)
+                fallidos += 1
+                sin_intentar = [c.id for c in grupo[salieron + 1:]]
+                if sin_intentar:
+                    CorreoPendiente.objects.filter(id__in=sin_intentar).update(proximo_intento=timezone.now())
+
+        logger.info("Lote de correos procesado", extra={
+            'enviados': enviados, 'fallidos': fallidos, **TransporteCorreo.metricas()
+        })
+        return enviados, fallidos
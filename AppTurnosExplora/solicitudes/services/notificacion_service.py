@@ -1,30 +1,43 @@
-from django.core.mail import send_mail
+from collections import namedtuple
 from django.conf import settings
+from django.db import transaction
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from solicitudes.models import Notificacion, SolicitudCambio
-from empleados.models import Empleado
-from datetime import datetime
 from django.utils import timezone
 import hashlib
 import hmac
-from django.core.mail.backends.smtp import EmailBackend
+from uuid import uuid4
+from .canal_notificaciones import CanalNotificaciones
+from .contador_notificaciones import ContadorNotificaciones
+from .correo_service import CorreoService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Una fila de Notificacion para `destinatario` ('solicitante', 'receptor' o 'supervisor' según `rol`)
+# y el email que la acompaña, si lo hay
+Aviso = namedtuple('Aviso', ['rol', 'destinatario', 'tipo', 'titulo', 'mensaje', 'email'])
+Email = namedtuple('Email', ['plantilla', 'asunto', 'remitente', 'contexto'])
+
 
 class NotificacionService:
     @staticmethod
     def _cargar_solicitud_completa(solicitud):
         """
-        Carga la solicitud con todas las relaciones necesarias para los emails
+        Carga la solicitud con todas las relaciones necesarias para las notificaciones y los emails
         """
+        return NotificacionService._solicitudes_con_relaciones().get(id=solicitud.id)
+
+    @staticmethod
+    def _solicitudes_con_relaciones():
         return SolicitudCambio.objects.select_related(
-            'explorador_solicitante',
-            'explorador_receptor', 
+            'explorador_solicitante__supervisor',
+            'explorador_receptor',
             'tipo_cambio',
-            'cambio_permanente'  # ← Esta es la clave
-        ).prefetch_related(
             'cambio_permanente'
-        ).get(id=solicitud.id)
-    
+        )
+
     @staticmethod
     def _convertir_fecha(fecha):
         """Convierte fecha a objeto date si es string"""
@@ -32,60 +45,14 @@ class NotificacionService:
             from datetime import datetime
             return datetime.strptime(fecha, '%Y-%m-%d').date()
         return fecha
-    
-    @staticmethod
-    def _configurar_email_backend(email_usuario):
-        """Configura el backend de email para usar el correo del usuario"""
-        try:
-            # Intentar usar el correo del usuario como EMAIL_HOST_USER
-            backend = EmailBackend(
-                host=settings.EMAIL_HOST,
-                port=settings.EMAIL_PORT,
-                username=email_usuario,  # Usar el correo del usuario
-                password=settings.EMAIL_HOST_PASSWORD,  # Usar la contraseña configurada
-                use_tls=settings.EMAIL_USE_TLS,
-                fail_silently=False
-            )
-            return backend
-        except Exception as e:
-            print(f"Error configurando email backend para {email_usuario}: {e}")
-            # Si falla, usar la configuración por defecto
-            return None
-    
-    @staticmethod
-    def _enviar_email_desde_usuario(subject, message, from_email, recipient_list, html_message=None):
-        """Envía email usando la configuración por defecto del sistema"""
-        try:
-            # Para desarrollo: usar backend de consola
-            if settings.EMAIL_BACKEND == 'django.core.mail.backends.console.EmailBackend':
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=from_email,  # Usar el email del usuario en desarrollo
-                    recipient_list=recipient_list,
-                    html_message=html_message,
-                    fail_silently=False,
-                )
-                print(f"✅ Email enviado a consola (desarrollo) desde {from_email} a {recipient_list}")
-                return True
-            else:
-                # Para producción: usar credenciales configuradas
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=recipient_list,
-                    html_message=html_message,
-                    fail_silently=False,
-                )
-                print(f"✅ Email enviado exitosamente desde {settings.DEFAULT_FROM_EMAIL} a {recipient_list}")
-                return True
-                
-        except Exception as e:
-            print(f"❌ Error enviando email: {e}")
-            print(f"❌ Detalles del error: {str(e)}")
-            return False
-    
+
+    @staticmethod
+    def _remitente(email_usuario):
+        """Con el backend de consola (desarrollo) se conserva el remitente del usuario"""
+        if settings.EMAIL_BACKEND == 'django.core.mail.backends.console.EmailBackend':
+            return email_usuario
+        return settings.DEFAULT_FROM_EMAIL
+
     @staticmethod
     def _generar_token(solicitud_id, empleado_id, tipo):
         """Genera un token de seguridad para aprobación por email"""
@@ -95,12 +62,12 @@ class NotificacionService:
             data.encode(),
             hashlib.sha256
         ).hexdigest()
-    
+
     @staticmethod
     def _generar_enlaces_aprobacion(solicitud):
         """Genera enlaces de aprobación para email"""
         enlaces = {}
-        
+
         # Enlaces para supervisor
         if solicitud.explorador_solicitante.supervisor:
             supervisor = solicitud.explorador_solicitante.supervisor
@@ -109,734 +76,542 @@ class NotificacionService:
                 'aprobar': f"{settings.SITE_URL}/solicitudes/aprobar-email/{solicitud.id}/{token_supervisor}/",
                 'rechazar': f"{settings.SITE_URL}/solicitudes/rechazar-email/{solicitud.id}/{token_supervisor}/"
             }
-        
+
         # Enlaces para receptor
         token_receptor = NotificacionService._generar_token(solicitud.id, solicitud.explorador_receptor.id, 'receptor')
         enlaces['receptor'] = {
             'aprobar': f"{settings.SITE_URL}/solicitudes/aprobar-receptor-email/{solicitud.id}/{token_receptor}/",
             'rechazar': f"{settings.SITE_URL}/solicitudes/rechazar-receptor-email/{solicitud.id}/{token_receptor}/"
         }
-        
+
         return enlaces
-    
+
     @staticmethod
-    def crear_notificacion_solicitud(solicitud):
+    def notificar(evento, solicitud, destinatarios=None, actor=None, comentario_respuesta=None):
         """
-        Crea notificaciones para el supervisor, el compañero receptor Y el solicitante
-        Maneja el caso especial donde supervisor = receptor
+        Crea las notificaciones y encola los emails de un evento sobre una solicitud.
+
+        La solicitud se carga una sola vez con sus relaciones; las filas de Notificacion de todos
+        los destinatarios se insertan con un bulk_create y los emails se encolan como un solo
+        evento de correo, dentro de la transacción en curso.
+
+        Args:
+            evento: 'solicitud_creada', 'aprobacion', 'rechazo', 'aprobacion_supervisor',
+                'aprobacion_receptor', 'rechazo_supervisor', 'rechazo_receptor' o 'cancelacion'
+            solicitud: SolicitudCambio del evento
+            destinatarios: roles a notificar (por defecto todos los del evento)
+            actor: Empleado que aprueba o rechaza
+            comentario_respuesta: comentario del actor
+
+        Returns:
+            Lista de Aviso creados
         """
-        print(f"DEBUG: Iniciando creación de notificaciones para solicitud {solicitud.id}")
-        print(f"DEBUG: Solicitante: {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido}")
-        print(f"DEBUG: Receptor: {solicitud.explorador_receptor.nombre} {solicitud.explorador_receptor.apellido}")
-        print(f"DEBUG: Fecha cambio turno: {solicitud.fecha_cambio_turno}")
-        
-        # Verificar si supervisor = receptor
-        supervisor = solicitud.explorador_solicitante.supervisor
-        receptor = solicitud.explorador_receptor
-        es_mismo_usuario = supervisor and supervisor.id == receptor.id
-        
-        print(f"DEBUG: Supervisor: {supervisor.nombre if supervisor else 'No asignado'}")
-        print(f"DEBUG: Receptor: {receptor.nombre}")
-        print(f"DEBUG: ¿Es el mismo usuario? {es_mismo_usuario}")
-        
-        if es_mismo_usuario:
-            # CASO ESPECIAL: Supervisor = Receptor
-            print(f"DEBUG: Caso especial - Supervisor = Receptor")
-            
-            # Crear notificación combinada
-            NotificacionService._crear_notificacion_supervisor_receptor(solicitud)
-            
-            # Enviar email combinado
-            try:
-                NotificacionService._enviar_email_supervisor_receptor(solicitud)
-                print(f"DEBUG: Email combinado enviado")
-            except Exception as e:
-                print(f"ERROR enviando email combinado: {e}")
-        else:
-            # CASO NORMAL: Supervisor ≠ Receptor
-            print(f"DEBUG: Caso normal - Supervisor ≠ Receptor")
-            
-            # Notificación para el supervisor
-            if supervisor:
-                print(f"DEBUG: Creando notificación para supervisor: {supervisor.nombre}")
-                NotificacionService._crear_notificacion_supervisor(solicitud)
-            else:
-                print(f"DEBUG: No hay supervisor asignado para {solicitud.explorador_solicitante.nombre}")
-            
-            # Notificación para el compañero receptor
-            print(f"DEBUG: Creando notificación para receptor: {receptor.nombre}")
-            NotificacionService._crear_notificacion_receptor(solicitud)
-            
-            # Enviar emails separados
-            print(f"DEBUG: Enviando emails separados...")
-            # Enviar email al supervisor
-            supervisor_email_sent = False
-            try:
-                supervisor_email_sent = NotificacionService._enviar_email_supervisor(solicitud)
-                if supervisor_email_sent:
-                    print(f"✅ Email al supervisor enviado exitosamente")
-                else:
-                    print(f"❌ Error enviando email al supervisor")
-            except Exception as e:
-                print(f"❌ ERROR enviando email al supervisor: {e}")
-            
-            # Enviar email al receptor
-            receptor_email_sent = False
-            try:
-                receptor_email_sent = NotificacionService._enviar_email_receptor(solicitud)
-                if receptor_email_sent:
-                    print(f"✅ Email al receptor enviado exitosamente")
-                else:
-                    print(f"❌ Error enviando email al receptor")
-            except Exception as e:
-                print(f"❌ ERROR enviando email al receptor: {e}")
-        
-        # Notificación para el solicitante (siempre se crea)
-        print(f"DEBUG: Creando notificación para solicitante: {solicitud.explorador_solicitante.nombre}")
-        NotificacionService._crear_notificacion_solicitante(solicitud)
-        
-        try:
-            NotificacionService._enviar_email_solicitante(solicitud)
-            print(f"DEBUG: Email al solicitante enviado")
-        except Exception as e:
-            print(f"ERROR enviando email al solicitante: {e}")
-        
-        print(f"DEBUG: Proceso de notificaciones completado")
-    
+        construir_avisos = NotificacionService._constructor_avisos(evento)
+        solicitud = NotificacionService._cargar_solicitud_completa(solicitud)
+        return NotificacionService._emitir(
+            evento, construir_avisos, [solicitud], destinatarios, actor, comentario_respuesta,
+            f"{evento}:{solicitud.id}"
+        )
+
     @staticmethod
-    def _crear_notificacion_supervisor(solicitud):
-        """Crea notificación para el supervisor"""
-        supervisor = solicitud.explorador_solicitante.supervisor
-        if not supervisor:
-            return
-        
-        titulo = f"Nueva solicitud de cambio de turno"
-        mensaje = f"""
-        {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} 
-        ha solicitado un cambio de turno con {solicitud.explorador_receptor.nombre} {solicitud.explorador_receptor.apellido}
-        para el día {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')}.
-        
-        Tipo de solicitud: {solicitud.tipo_cambio.nombre}
-        Estado: Pendiente de aprobación
+    def notificar_lote(evento, solicitudes, destinatarios=None, actor=None, comentario_respuesta=None):
         """
-        
-        print(f"DEBUG: Creando notificación para supervisor {supervisor.nombre}")
-        
-        Notificacion.objects.create(
-            destinatario=supervisor,
-            tipo='solicitud_cambio',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
-        )
-        
-        print(f"DEBUG: Notificación creada para supervisor {supervisor.nombre}")
-    
-    @staticmethod
-    def _crear_notificacion_receptor(solicitud):
-        """Crea notificación para el compañero receptor"""
-        titulo = f"Solicitud de cambio de turno recibida"
-        mensaje = f"""
-        {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} 
-        te ha enviado una solicitud de cambio de turno para el día {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')}.
-        
-        Tipo de solicitud: {solicitud.tipo_cambio.nombre}
-        Estado: Pendiente de tu aprobación
+        Como notificar, para el mismo evento sobre varias solicitudes (resolución en lote): las
+        solicitudes se cargan con una consulta, las Notificacion de todas van en un bulk_create
+        y los emails en un solo evento de correo.
         """
-        
-        print(f"DEBUG: Creando notificación para receptor {solicitud.explorador_receptor.nombre}")
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_receptor,
-            tipo='solicitud_cambio',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
+        construir_avisos = NotificacionService._constructor_avisos(evento)
+        if not solicitudes:
+            return []
+        solicitudes = list(
+            NotificacionService._solicitudes_con_relaciones()
+            .filter(id__in=[solicitud.id for solicitud in solicitudes])
+            .order_by('id')
         )
-        
-        print(f"DEBUG: Notificación creada para receptor {solicitud.explorador_receptor.nombre}")
-    
+        return NotificacionService._emitir(
+            evento, construir_avisos, solicitudes, destinatarios, actor, comentario_respuesta, f"{evento}:lote"
+        )
+
     @staticmethod
-    def _crear_notificacion_supervisor_receptor(solicitud):
-        """Crea notificación combinada para cuando supervisor = receptor"""
-        supervisor_receptor = solicitud.explorador_receptor
-        
-        titulo = f"Solicitud de cambio de turno - Rol Doble (Supervisor + Receptor)"
-        mensaje = f"""
-        {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} 
-        te ha enviado una solicitud de cambio de turno para el día {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')}.
-        
-        Tipo de solicitud: {solicitud.tipo_cambio.nombre}
+    def _constructor_avisos(evento):
+        construir_avisos = getattr(NotificacionService, f'_avisos_{evento}', None)
+        if construir_avisos is None:
+            raise ValueError(f"Evento de notificación desconocido: {evento}")
+        return construir_avisos
+
+    @staticmethod
+    def _emitir(evento, construir_avisos, solicitudes, destinatarios, actor, comentario_respuesta, clave_evento):
+        """Inserta las Notificacion y encola los emails de los avisos de `solicitudes`"""
+        pares = [
+            (solicitud, aviso)
+            for solicitud in solicitudes
+            for aviso in construir_avisos(solicitud, actor, comentario_respuesta)
+            if aviso.destinatario and (destinatarios is None or aviso.rol in destinatarios)
+        ]
+
+        correos = []
+        for solicitud, aviso in pares:
+            if not aviso.email:
+                continue
+            try:
+                html_message = render_to_string(aviso.email.plantilla, aviso.email.contexto)
+            except Exception:
+                # Un email que no se puede renderizar no impide las notificaciones
+                logger.exception("Error renderizando email", extra={
+                    'evento': evento, 'plantilla': aviso.email.plantilla, 'solicitud_id': solicitud.id
+                })
+                continue
+            correos.append({
+                'asunto': aviso.email.asunto,
+                'mensaje': strip_tags(html_message),
+                'mensaje_html': html_message,
+                'remitente': NotificacionService._remitente(aviso.email.remitente),
+                'destinatarios': [aviso.destinatario.email],
+            })
+
+        with transaction.atomic():
+            notificaciones = Notificacion.objects.bulk_create([
+                Notificacion(
+                    destinatario=aviso.destinatario,
+                    tipo=aviso.tipo,
+                    titulo=aviso.titulo,
+                    mensaje=aviso.mensaje,
+                    solicitud=solicitud
+                )
+                for solicitud, aviso in pares
+            ])
+            ContadorNotificaciones.sumar_creadas(notificaciones)
+            transaction.on_commit(lambda: NotificacionService._publicar(notificaciones))
+            CorreoService.encolar_varios(correos, evento=f"{clave_evento}:{uuid4().hex[:8]}")
+
+        logger.debug("Notificaciones creadas", extra={
+            'evento': evento, 'solicitudes': [solicitud.id for solicitud in solicitudes],
+            'notificaciones': len(pares), 'emails': len(correos)
+        })
+        return [aviso for _, aviso in pares]
+
+    @staticmethod
+    def _publicar(notificaciones):
+        """Empuja las notificaciones creadas a las conexiones abiertas de sus destinatarios"""
+        for notificacion in notificaciones:
+            CanalNotificaciones.publicar(notificacion.destinatario.user_id, {
+                'tipo': 'notificacion',
+                'id': notificacion.id,  # None en backends sin RETURNING en bulk_create (MySQL)
+                'tipo_notificacion': notificacion.tipo,
+                'titulo': notificacion.titulo,
+                'solicitud_id': notificacion.solicitud_id,
+                'fecha_creacion': notificacion.fecha_creacion.isoformat() if notificacion.fecha_creacion else None,
+            })
+
+    @staticmethod
+    def _nombres_y_fecha(solicitud):
+        """Nombre del solicitante, nombre del receptor y fecha del cambio formateada"""
+        solicitante = solicitud.explorador_solicitante
+        receptor = solicitud.explorador_receptor
+        return (
+            f"{solicitante.nombre} {solicitante.apellido}",
+            f"{receptor.nombre} {receptor.apellido}",
+            NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y'),
+        )
+
+    @staticmethod
+    def _email_supervisor(solicitud, enlaces):
+        """Email al supervisor con los enlaces para aprobar o rechazar"""
+        solicitante, _, _ = NotificacionService._nombres_y_fecha(solicitud)
+        return Email(
+            'solicitudes/emails/solicitud_supervisor.html',
+            f"Nueva solicitud de cambio de turno - {solicitante}",
+            solicitud.explorador_solicitante.email,
+            {'solicitud': solicitud, 'supervisor': solicitud.explorador_solicitante.supervisor, 'enlaces': enlaces}
+        )
+
+    @staticmethod
+    def _avisos_solicitud_creada(solicitud, actor=None, comentario_respuesta=None):
+        """
+        Supervisor, compañero receptor y solicitante.
+        Maneja el caso especial donde supervisor = receptor
+        """
+        nombre_solicitante, nombre_receptor, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        tipo = solicitud.tipo_cambio.nombre
+        solicitante = solicitud.explorador_solicitante
+        supervisor = solicitante.supervisor
+        receptor = solicitud.explorador_receptor
+        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud)
+        avisos = []
+
+        if supervisor and supervisor.id == receptor.id:
+            # CASO ESPECIAL: Supervisor = Receptor, una notificación y un email combinados
+            avisos.append(Aviso(
+                'receptor', receptor, 'solicitud_cambio',
+                "Solicitud de cambio de turno - Rol Doble (Supervisor + Receptor)",
+                f"""
+        {nombre_solicitante}
+        te ha enviado una solicitud de cambio de turno para el día {fecha}.
+
+        Tipo de solicitud: {tipo}
         Estado: Pendiente de aprobación
-        
-        IMPORTANTE: Como eres tanto su supervisor como el receptor de la solicitud, 
+
+        IMPORTANTE: Como eres tanto su supervisor como el receptor de la solicitud,
         necesitas aprobar esta solicitud en ambos roles.
-        """
-        
-        print(f"DEBUG: Creando notificación combinada para {supervisor_receptor.nombre}")
-        
-        Notificacion.objects.create(
-            destinatario=supervisor_receptor,
-            tipo='solicitud_cambio',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
-        )
-        
-        print(f"DEBUG: Notificación combinada creada para {supervisor_receptor.nombre}")
-    
-    @staticmethod
-    def _enviar_email_supervisor_receptor(solicitud):
-        """Envía email combinado cuando supervisor = receptor"""
-        # Cargar solicitud con relaciones completas
-        solicitud_completa = NotificacionService._cargar_solicitud_completa(solicitud)
-        supervisor_receptor = solicitud_completa.explorador_receptor
-        
-        subject = f"Solicitud de cambio de turno - Rol Doble - {solicitud_completa.explorador_solicitante.nombre} {solicitud_completa.explorador_solicitante.apellido}"
-        
-        # Generar enlaces de aprobación
-        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud_completa)
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/solicitud_supervisor_receptor.html', {
-            'solicitud': solicitud_completa,
-            'supervisor_receptor': supervisor_receptor,
-            'enlaces': enlaces
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=solicitud_completa.explorador_solicitante.email,
-                recipient_list=[supervisor_receptor.email],
-                html_message=html_message
-            )
-        except Exception as e:
-            print(f"Error enviando email combinado: {e}")
-    
-    @staticmethod
-    def _crear_notificacion_solicitante(solicitud):
-        """Crea notificación para el solicitante (para que pueda ver el estado)"""
-        titulo = f"Solicitud de cambio de turno enviada"
-        mensaje = f"""
-        Has enviado una solicitud de cambio de turno a {solicitud.explorador_receptor.nombre} {solicitud.explorador_receptor.apellido}
-        para el día {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')}.
-        
-        Tipo de solicitud: {solicitud.tipo_cambio.nombre}
+        """,
+                Email(
+                    'solicitudes/emails/solicitud_supervisor_receptor.html',
+                    f"Solicitud de cambio de turno - Rol Doble - {nombre_solicitante}",
+                    solicitante.email,
+                    {'solicitud': solicitud, 'supervisor_receptor': receptor, 'enlaces': enlaces}
+                )
+            ))
+        else:
+            # CASO NORMAL: Supervisor ≠ Receptor
+            if supervisor:
+                avisos.append(Aviso(
+                    'supervisor', supervisor, 'solicitud_cambio',
+                    "Nueva solicitud de cambio de turno",
+                    f"""
+        {nombre_solicitante}
+        ha solicitado un cambio de turno con {nombre_receptor}
+        para el día {fecha}.
+
+        Tipo de solicitud: {tipo}
         Estado: Pendiente de aprobación
-        
+        """,
+                    NotificacionService._email_supervisor(solicitud, enlaces)
+                ))
+            avisos.append(Aviso(
+                'receptor', receptor, 'solicitud_cambio',
+                "Solicitud de cambio de turno recibida",
+                f"""
+        {nombre_solicitante}
+        te ha enviado una solicitud de cambio de turno para el día {fecha}.
+
+        Tipo de solicitud: {tipo}
+        Estado: Pendiente de tu aprobación
+        """,
+                Email(
+                    'solicitudes/emails/solicitud_receptor.html',
+                    f"Solicitud de cambio de turno recibida - {nombre_solicitante}",
+                    solicitante.email,
+                    {'solicitud': solicitud, 'enlaces': enlaces}
+                )
+            ))
+
+        # Notificación para el solicitante (siempre se crea)
+        avisos.append(Aviso(
+            'solicitante', solicitante, 'solicitud_cambio',
+            "Solicitud de cambio de turno enviada",
+            f"""
+        Has enviado una solicitud de cambio de turno a {nombre_receptor}
+        para el día {fecha}.
+
+        Tipo de solicitud: {tipo}
+        Estado: Pendiente de aprobación
+
         Podrás ver el estado de tu solicitud en la sección de notificaciones.
-        """
-        
-        print(f"DEBUG: Creando notificación para solicitante {solicitud.explorador_solicitante.nombre}")
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_solicitante,
-            tipo='solicitud_cambio',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
-        )
-        
-        print(f"DEBUG: Notificación creada para solicitante {solicitud.explorador_solicitante.nombre}")
-    
-    @staticmethod
-    def _enviar_email_supervisor(solicitud):
-        """Envía email al supervisor"""
-        # Cargar solicitud con relaciones completas
-        solicitud_completa = NotificacionService._cargar_solicitud_completa(solicitud)
-        supervisor = solicitud_completa.explorador_solicitante.supervisor
-        if not supervisor:
-            return
-        
-        subject = f"Nueva solicitud de cambio de turno - {solicitud_completa.explorador_solicitante.nombre} {solicitud_completa.explorador_solicitante.apellido}"
-        
-        # Generar enlaces de aprobación
-        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud_completa)
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/solicitud_supervisor.html', {
-            'solicitud': solicitud_completa,
-            'supervisor': supervisor,
-            'enlaces': enlaces
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            return NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=solicitud_completa.explorador_solicitante.email,  # Email del usuario logueado
-                recipient_list=[supervisor.email],
-                html_message=html_message,
+        """,
+            Email(
+                'solicitudes/emails/confirmacion_solicitud.html',
+                "Confirmación de solicitud de cambio de turno",
+                solicitante.email,
+                {'solicitud': solicitud, 'empleado': solicitante}
             )
-        except Exception as e:
-            print(f"❌ Error enviando email al supervisor: {e}")
-            return False
-    
-    @staticmethod
-    def _enviar_email_receptor(solicitud):
-        """Envía email al compañero receptor"""
-        # Cargar solicitud con relaciones completas
-        solicitud_completa = NotificacionService._cargar_solicitud_completa(solicitud)
-        
-        subject = f"Solicitud de cambio de turno recibida - {solicitud_completa.explorador_solicitante.nombre} {solicitud_completa.explorador_solicitante.apellido}"
-        
-        # Generar enlaces de aprobación
-        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud_completa)
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/solicitud_receptor.html', {
-            'solicitud': solicitud_completa,
-            'enlaces': enlaces
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            return NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=solicitud_completa.explorador_solicitante.email,  # Email del usuario logueado
-                recipient_list=[solicitud_completa.explorador_receptor.email],
-                html_message=html_message,
+        ))
+        return avisos
+
+    @staticmethod
+    def _avisos_aprobacion(solicitud, aprobador, comentario_respuesta=None):
+        """Aprobación para el empleado que solicitó"""
+        _, _, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        tipo = solicitud.tipo_cambio.nombre
+        mensaje = f"Tu solicitud de {tipo} para el {fecha} ha sido aprobada por {aprobador.nombre} {aprobador.apellido}."
+        if comentario_respuesta:
+            mensaje += f"\n\nComentario del supervisor: {comentario_respuesta}"
+        return [Aviso(
+            'solicitante', solicitud.explorador_solicitante, 'aprobacion',
+            f"Solicitud Aprobada - {tipo}", mensaje,
+            Email(
+                'solicitudes/emails/solicitud_aprobada.html',
+                f"Solicitud Aprobada - {tipo}",
+                solicitud.explorador_solicitante.email,
+                {'solicitud': solicitud, 'aprobador': aprobador, 'comentario_respuesta': comentario_respuesta}
             )
-        except Exception as e:
-            print(f"❌ Error enviando email al receptor: {e}")
-            return False
-    
-    @staticmethod
-    def _enviar_email_solicitante(solicitud):
-        """Envía email de confirmación al solicitante"""
-        try:
-            # Cargar solicitud con relaciones completas
-            solicitud_completa = NotificacionService._cargar_solicitud_completa(solicitud)
-            
-            subject = f"Confirmación de solicitud de cambio de turno"
-            
-            html_message = render_to_string('solicitudes/emails/confirmacion_solicitud.html', {
-                'solicitud': solicitud_completa,
-                'empleado': solicitud_completa.explorador_solicitante
-            })
-            
-            plain_message = strip_tags(html_message)
-            
-            NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=solicitud_completa.explorador_solicitante.email,  # Email del usuario logueado
-                recipient_list=[solicitud_completa.explorador_solicitante.email],
-                html_message=html_message,
+        )]
+
+    @staticmethod
+    def _avisos_rechazo(solicitud, rechazador, comentario_respuesta=None):
+        """Rechazo para el empleado que solicitó"""
+        _, _, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        tipo = solicitud.tipo_cambio.nombre
+        mensaje = f"Tu solicitud de {tipo} para el {fecha} ha sido rechazada por {rechazador.nombre} {rechazador.apellido}."
+        if comentario_respuesta:
+            mensaje += f"\n\nComentario del supervisor: {comentario_respuesta}"
+        return [Aviso(
+            'solicitante', solicitud.explorador_solicitante, 'rechazo',
+            f"Solicitud Rechazada - {tipo}", mensaje,
+            Email(
+                'solicitudes/emails/solicitud_rechazada.html',
+                f"Solicitud Rechazada - {tipo}",
+                solicitud.explorador_solicitante.email,
+                {'solicitud': solicitud, 'rechazador': rechazador, 'comentario_respuesta': comentario_respuesta}
             )
-            
-            print(f"DEBUG: Email de confirmación enviado a {solicitud_completa.explorador_solicitante.email}")
-            
-        except Exception as e:
-            print(f"ERROR enviando email de confirmación al solicitante: {e}")
-            import traceback
-            print(f"ERROR traceback: {traceback.format_exc()}")
-    
+        )]
+
     @staticmethod
-    def marcar_como_leida(notificacion_id, empleado):
-        """
-        Marca una notificación como leída
-        """
-        try:
-            notificacion = Notificacion.objects.get(id=notificacion_id, destinatario=empleado)
-            notificacion.leida = True
-            notificacion.fecha_lectura = timezone.now()
-            notificacion.save()
-            return True
-        except Notificacion.DoesNotExist:
-            return False
+    def _avisos_aprobacion_supervisor(solicitud, supervisor, comentario_respuesta=None):
+        """Solicitante y, si aún no ha aprobado, receptor"""
+        nombre_solicitante, _, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        titulo = f"Solicitud Aprobada por Supervisor - {solicitud.tipo_cambio.nombre}"
+        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {fecha} ha sido aprobada por tu supervisor {supervisor.nombre} {supervisor.apellido}."
+        if comentario_respuesta:
+            mensaje += f"\n\nComentario del supervisor: {comentario_respuesta}"
+
+        avisos = [Aviso(
+            'solicitante', solicitud.explorador_solicitante, 'aprobacion', titulo, mensaje,
+            Email(
+                'solicitudes/emails/aprobacion_supervisor.html',
+                titulo,
+                supervisor.email,
+                {
+                    'solicitud': solicitud,
+                    'supervisor': supervisor,
+                    'comentario_respuesta': comentario_respuesta,
+                    'enlaces': NotificacionService._generar_enlaces_aprobacion(solicitud)
+                }
+            )
+        )]
+        if not solicitud.aprobado_receptor:
+            avisos.append(Aviso(
+                'receptor', solicitud.explorador_receptor, 'aprobacion', titulo,
+                f"La solicitud de {nombre_solicitante} para el {fecha} ha sido aprobada por el supervisor. Tu aprobación está pendiente.",
+                None
+            ))
+        return avisos
 
     @staticmethod
-    def obtener_notificaciones_no_leidas(empleado):
-        """
-        Obtiene las notificaciones no leídas de un empleado
-        """
-        return Notificacion.objects.filter(destinatario=empleado, leida=False).order_by('-fecha_creacion')
+    def _avisos_aprobacion_receptor(solicitud, receptor, comentario_respuesta=None):
+        """Solicitante y, si aún no ha aprobado, supervisor (con el email para que apruebe)"""
+        nombre_solicitante, _, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        titulo = f"Solicitud Aprobada por Compañero - {solicitud.tipo_cambio.nombre}"
+        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {fecha} ha sido aprobada por tu compañero {receptor.nombre} {receptor.apellido}."
+        if comentario_respuesta:
+            mensaje += f"\n\nComentario del compañero: {comentario_respuesta}"
+        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud)
+
+        avisos = [Aviso(
+            'solicitante', solicitud.explorador_solicitante, 'aprobacion', titulo, mensaje,
+            Email(
+                'solicitudes/emails/aprobacion_receptor.html',
+                titulo,
+                receptor.email,
+                {'solicitud': solicitud, 'receptor': receptor, 'comentario_respuesta': comentario_respuesta, 'enlaces': enlaces}
+            )
+        )]
+        supervisor = solicitud.explorador_solicitante.supervisor
+        if supervisor and not solicitud.aprobado_supervisor:
+            avisos.append(Aviso(
+                'supervisor', supervisor, 'aprobacion', titulo,
+                f"La solicitud de {nombre_solicitante} para el {fecha} ha sido aprobada por el compañero. Tu aprobación está pendiente.",
+                NotificacionService._email_supervisor(solicitud, enlaces)
+            ))
+        return avisos
 
     @staticmethod
-    def obtener_notificaciones(empleado):
-        """
-        Obtiene todas las notificaciones de un empleado
-        """
-        return Notificacion.objects.filter(destinatario=empleado).order_by('-fecha_creacion')
+    def _avisos_rechazo_supervisor(solicitud, supervisor, comentario_respuesta=None):
+        """Solicitante y receptor"""
+        nombre_solicitante, _, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        titulo = f"Solicitud Rechazada por Supervisor - {solicitud.tipo_cambio.nombre}"
+        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {fecha} ha sido rechazada por tu supervisor {supervisor.nombre} {supervisor.apellido}."
+        if comentario_respuesta:
+            mensaje += f"\n\nMotivo del rechazo: {comentario_respuesta}"
+
+        return [
+            Aviso(
+                'solicitante', solicitud.explorador_solicitante, 'rechazo', titulo, mensaje,
+                Email(
+                    'solicitudes/emails/rechazo_supervisor.html',
+                    titulo,
+                    supervisor.email,
+                    {
+                        'solicitud': solicitud,
+                        'supervisor': supervisor,
+                        'comentario_respuesta': comentario_respuesta,
+                        'enlaces': NotificacionService._generar_enlaces_aprobacion(solicitud)
+                    }
+                )
+            ),
+            Aviso(
+                'receptor', solicitud.explorador_receptor, 'rechazo', titulo,
+                f"La solicitud de {nombre_solicitante} para el {fecha} ha sido rechazada por el supervisor.",
+                None
+            ),
+        ]
 
     @staticmethod
-    def crear_notificacion_aprobacion(solicitud, aprobador, comentario_respuesta=None):
-        """
-        Crea notificación de aprobación para el empleado que solicitó
-        """
-        titulo = f"Solicitud Aprobada - {solicitud.tipo_cambio.nombre}"
-        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido aprobada por {aprobador.nombre} {aprobador.apellido}."
-        
+    def _avisos_rechazo_receptor(solicitud, receptor, comentario_respuesta=None):
+        """Solicitante y supervisor"""
+        nombre_solicitante, _, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        titulo = f"Solicitud Rechazada por Compañero - {solicitud.tipo_cambio.nombre}"
+        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {fecha} ha sido rechazada por tu compañero {receptor.nombre} {receptor.apellido}."
         if comentario_respuesta:
-            mensaje += f"\n\nComentario del supervisor: {comentario_respuesta}"
-        
-        # Notificación para el empleado que solicitó
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_solicitante,
-            tipo='aprobacion',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
-        )
-        
-        # Email al empleado que solicitó
-        NotificacionService._enviar_email_aprobacion(solicitud, aprobador, comentario_respuesta)
+            mensaje += f"\n\nMotivo del rechazo: {comentario_respuesta}"
+
+        return [
+            Aviso(
+                'solicitante', solicitud.explorador_solicitante, 'rechazo', titulo, mensaje,
+                Email(
+                    'solicitudes/emails/rechazo_receptor.html',
+                    titulo,
+                    receptor.email,
+                    {
+                        'solicitud': solicitud,
+                        'receptor': receptor,
+                        'comentario_respuesta': comentario_respuesta,
+                        'enlaces': NotificacionService._generar_enlaces_aprobacion(solicitud)
+                    }
+                )
+            ),
+            # Sin supervisor asignado, notificar() descarta este aviso
+            Aviso(
+                'supervisor', solicitud.explorador_solicitante.supervisor, 'rechazo', titulo,
+                f"La solicitud de {nombre_solicitante} para el {fecha} ha sido rechazada por el compañero.",
+                None
+            ),
+        ]
 
     @staticmethod
-    def crear_notificacion_rechazo(solicitud, rechazador, comentario_respuesta=None):
+    def _avisos_cancelacion(solicitud, actor=None, comentario_respuesta=None):
+        """Receptor de la solicitud cancelada"""
+        nombre_solicitante, _, fecha = NotificacionService._nombres_y_fecha(solicitud)
+        return [Aviso(
+            'receptor', solicitud.explorador_receptor, 'solicitud_cambio',
+            "Solicitud de cambio de turno cancelada",
+            f"""
+        {nombre_solicitante}
+        ha cancelado la solicitud de cambio de turno para el día {fecha}.
+
+        Tipo de solicitud: {solicitud.tipo_cambio.nombre}
+        Estado: Cancelada
+
+        Ya no necesitas aprobar o rechazar esta solicitud.
+        """,
+            Email(
+                'solicitudes/emails/cancelacion_solicitud.html',
+                f"Solicitud de cambio de turno cancelada - {nombre_solicitante}",
+                solicitud.explorador_solicitante.email,
+                {'solicitud': solicitud}
+            )
+        )]
+
+    @staticmethod
+    def crear_notificacion_solicitud(solicitud):
         """
-        Crea notificación de rechazo para el empleado que solicitó
+        Crea notificaciones para el supervisor, el compañero receptor Y el solicitante
+        Maneja el caso especial donde supervisor = receptor
         """
-        titulo = f"Solicitud Rechazada - {solicitud.tipo_cambio.nombre}"
-        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido rechazada por {rechazador.nombre} {rechazador.apellido}."
-        
-        if comentario_respuesta:
-            mensaje += f"\n\nComentario del supervisor: {comentario_respuesta}"
-        
-        # Notificación para el empleado que solicitó
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_solicitante,
-            tipo='rechazo',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
-        )
-        
-        # Email al empleado que solicitó
-        NotificacionService._enviar_email_rechazo(solicitud, rechazador, comentario_respuesta)
+        return NotificacionService.notificar('solicitud_creada', solicitud)
 
     @staticmethod
-    def _enviar_email_aprobacion(solicitud, aprobador, comentario_respuesta=None):
+    def crear_notificacion_aprobacion(solicitud, aprobador, comentario_respuesta=None):
         """
-        Envía email de aprobación al empleado que solicitó
+        Crea notificación de aprobación para el empleado que solicitó
         """
-        subject = f"Solicitud Aprobada - {solicitud.tipo_cambio.nombre}"
-        
-        context = {
-            'solicitud': solicitud,
-            'aprobador': aprobador,
-            'comentario_respuesta': comentario_respuesta,
-        }
-        
-        html_message = render_to_string('solicitudes/emails/solicitud_aprobada.html', context)
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=solicitud.explorador_solicitante.email,
-            recipient_list=[solicitud.explorador_solicitante.email],
-            html_message=html_message,
-            fail_silently=False,
+        return NotificacionService.notificar(
+            'aprobacion', solicitud, actor=aprobador, comentario_respuesta=comentario_respuesta
         )
 
     @staticmethod
-    def _enviar_email_rechazo(solicitud, rechazador, comentario_respuesta=None):
+    def crear_notificacion_rechazo(solicitud, rechazador, comentario_respuesta=None):
         """
-        Envía email de rechazo al empleado que solicitó
+        Crea notificación de rechazo para el empleado que solicitó
         """
-        subject = f"Solicitud Rechazada - {solicitud.tipo_cambio.nombre}"
-        
-        context = {
-            'solicitud': solicitud,
-            'rechazador': rechazador,
-            'comentario_respuesta': comentario_respuesta,
-        }
-        
-        html_message = render_to_string('solicitudes/emails/solicitud_rechazada.html', context)
-        plain_message = strip_tags(html_message)
-        
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=solicitud.explorador_solicitante.email,
-            recipient_list=[solicitud.explorador_solicitante.email],
-            html_message=html_message,
-            fail_silently=False,
-        ) 
+        return NotificacionService.notificar(
+            'rechazo', solicitud, actor=rechazador, comentario_respuesta=comentario_respuesta
+        )
 
     @staticmethod
     def crear_notificacion_aprobacion_supervisor(solicitud, supervisor, comentario_respuesta=None):
         """
         Crea notificación cuando el supervisor aprueba una solicitud
         """
-        # Notificación para el solicitante
-        titulo = f"Solicitud Aprobada por Supervisor - {solicitud.tipo_cambio.nombre}"
-        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido aprobada por tu supervisor {supervisor.nombre} {supervisor.apellido}."
-        if comentario_respuesta:
-            mensaje += f"\n\nComentario del supervisor: {comentario_respuesta}"
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_solicitante,
-            tipo='aprobacion',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
+        return NotificacionService.notificar(
+            'aprobacion_supervisor', solicitud, actor=supervisor, comentario_respuesta=comentario_respuesta
         )
-        
-        # Notificación para el receptor (si aún no ha aprobado)
-        if not solicitud.aprobado_receptor:
-            titulo_receptor = f"Solicitud Aprobada por Supervisor - {solicitud.tipo_cambio.nombre}"
-            mensaje_receptor = f"La solicitud de {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} para el {solicitud.fecha_cambio_turno.strftime('%d/%m/%Y')} ha sido aprobada por el supervisor. Tu aprobación está pendiente."
-            
-            Notificacion.objects.create(
-                destinatario=solicitud.explorador_receptor,
-                tipo='aprobacion',
-                titulo=titulo_receptor,
-                mensaje=mensaje_receptor,
-                solicitud=solicitud
-            )
-        
-        # Enviar email de aprobación
-        NotificacionService._enviar_email_aprobacion_supervisor(solicitud, supervisor, comentario_respuesta)
 
     @staticmethod
     def crear_notificacion_aprobacion_receptor(solicitud, receptor, comentario_respuesta=None):
         """
         Crea notificación cuando el receptor aprueba una solicitud
         """
-        # Notificación para el solicitante
-        titulo = f"Solicitud Aprobada por Compañero - {solicitud.tipo_cambio.nombre}"
-        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido aprobada por tu compañero {receptor.nombre} {receptor.apellido}."
-        if comentario_respuesta:
-            mensaje += f"\n\nComentario del compañero: {comentario_respuesta}"
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_solicitante,
-            tipo='aprobacion',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
+        return NotificacionService.notificar(
+            'aprobacion_receptor', solicitud, actor=receptor, comentario_respuesta=comentario_respuesta
         )
-        
-        # Notificación para el supervisor (si aún no ha aprobado)
-        if solicitud.explorador_solicitante.supervisor and not solicitud.aprobado_supervisor:
-            titulo_supervisor = f"Solicitud Aprobada por Compañero - {solicitud.tipo_cambio.nombre}"
-            mensaje_supervisor = (
-                f"La solicitud de {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} "
-                f"para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} "
-                f"ha sido aprobada por el compañero. Tu aprobación está pendiente."
-            )
-
-            Notificacion.objects.create(
-                destinatario=solicitud.explorador_solicitante.supervisor,
-                tipo='aprobacion',
-                titulo=titulo_supervisor,
-                mensaje=mensaje_supervisor,
-                solicitud=solicitud
-            )
-
-            # Enviar email al supervisor para que apruebe
-            try:
-                print(f"DEBUG EMAIL -> Enviando correo a supervisor {solicitud.explorador_solicitante.supervisor.email} tras aprobación del receptor")
-                enviado = NotificacionService._enviar_email_supervisor(solicitud)
-                print(f"DEBUG EMAIL -> Resultado envío a supervisor: {enviado}")
-            except Exception as e:
-                print(f"❌ Error enviando email al supervisor tras aprobación del receptor: {e}")
-
-        # Enviar email de aprobación al solicitante
-        NotificacionService._enviar_email_aprobacion_receptor(solicitud, receptor, comentario_respuesta)
 
     @staticmethod
     def crear_notificacion_rechazo_supervisor(solicitud, supervisor, comentario_respuesta=None):
         """
         Crea notificación cuando el supervisor rechaza una solicitud
         """
-        # Notificación para el solicitante
-        titulo = f"Solicitud Rechazada por Supervisor - {solicitud.tipo_cambio.nombre}"
-        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido rechazada por tu supervisor {supervisor.nombre} {supervisor.apellido}."
-        if comentario_respuesta:
-            mensaje += f"\n\nMotivo del rechazo: {comentario_respuesta}"
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_solicitante,
-            tipo='rechazo',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
-        )
-        
-        # Notificación para el receptor
-        titulo_receptor = f"Solicitud Rechazada por Supervisor - {solicitud.tipo_cambio.nombre}"
-        mensaje_receptor = f"La solicitud de {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido rechazada por el supervisor."
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_receptor,
-            tipo='rechazo',
-            titulo=titulo_receptor,
-            mensaje=mensaje_receptor,
-            solicitud=solicitud
+        return NotificacionService.notificar(
+            'rechazo_supervisor', solicitud, actor=supervisor, comentario_respuesta=comentario_respuesta
         )
-        
-        # Enviar email de rechazo
-        NotificacionService._enviar_email_rechazo_supervisor(solicitud, supervisor, comentario_respuesta)
 
     @staticmethod
     def crear_notificacion_rechazo_receptor(solicitud, receptor, comentario_respuesta=None):
         """
         Crea notificación cuando el receptor rechaza una solicitud
         """
-        # Notificación para el solicitante
-        titulo = f"Solicitud Rechazada por Compañero - {solicitud.tipo_cambio.nombre}"
-        mensaje = f"Tu solicitud de {solicitud.tipo_cambio.nombre} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido rechazada por tu compañero {receptor.nombre} {receptor.apellido}."
-        if comentario_respuesta:
-            mensaje += f"\n\nMotivo del rechazo: {comentario_respuesta}"
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_solicitante,
-            tipo='rechazo',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
+        return NotificacionService.notificar(
+            'rechazo_receptor', solicitud, actor=receptor, comentario_respuesta=comentario_respuesta
         )
-        
-        # Notificación para el supervisor
-        if solicitud.explorador_solicitante.supervisor:
-            titulo_supervisor = f"Solicitud Rechazada por Compañero - {solicitud.tipo_cambio.nombre}"
-            mensaje_supervisor = f"La solicitud de {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} para el {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')} ha sido rechazada por el compañero."
-            
-            Notificacion.objects.create(
-                destinatario=solicitud.explorador_solicitante.supervisor,
-                tipo='rechazo',
-                titulo=titulo_supervisor,
-                mensaje=mensaje_supervisor,
-                solicitud=solicitud
-            )
-        
-        # Enviar email de rechazo
-        NotificacionService._enviar_email_rechazo_receptor(solicitud, receptor, comentario_respuesta) 
 
     @staticmethod
-    def _enviar_email_aprobacion_supervisor(solicitud, supervisor, comentario_respuesta=None):
-        """Envía email cuando el supervisor aprueba una solicitud"""
-        subject = f"Solicitud Aprobada por Supervisor - {solicitud.tipo_cambio.nombre}"
-        
-        # Generar enlaces de aprobación
-        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud)
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/aprobacion_supervisor.html', {
-            'solicitud': solicitud,
-            'supervisor': supervisor,
-            'comentario_respuesta': comentario_respuesta,
-            'enlaces': enlaces
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=supervisor.email,
-                recipient_list=[solicitud.explorador_solicitante.email],
-                html_message=html_message,
-            )
-        except Exception as e:
-            print(f"Error enviando email de aprobación del supervisor: {e}")
+    def crear_notificacion_cancelacion(solicitud):
+        """Crea notificación de cancelación para el receptor"""
+        return NotificacionService.notificar('cancelacion', solicitud)
 
     @staticmethod
-    def _enviar_email_aprobacion_receptor(solicitud, receptor, comentario_respuesta=None):
-        """Envía email cuando el receptor aprueba una solicitud"""
-        subject = f"Solicitud Aprobada por Compañero - {solicitud.tipo_cambio.nombre}"
-        
-        # Generar enlaces de aprobación
-        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud)
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/aprobacion_receptor.html', {
-            'solicitud': solicitud,
-            'receptor': receptor,
-            'comentario_respuesta': comentario_respuesta,
-            'enlaces': enlaces
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=receptor.email,
-                recipient_list=[solicitud.explorador_solicitante.email],
-                html_message=html_message,
+    def marcar_como_leida(notificacion_id, empleado):
+        """
+        Marca una notificación como leída
+        """
+        # Solo la petición que la cambia de no leída a leída descuenta el contador
+        with transaction.atomic():
+            marcadas = Notificacion.objects.filter(id=notificacion_id, destinatario=empleado, leida=False).update(
+                leida=True, fecha_lectura=timezone.now()
             )
-        except Exception as e:
-            print(f"Error enviando email de aprobación del receptor: {e}")
+            ContadorNotificaciones.ajustar_empleado(empleado, -marcadas)
+        if marcadas:
+            return True
+        # Ya estaba leída (True) o no es del empleado (False)
+        return Notificacion.objects.filter(id=notificacion_id, destinatario=empleado).exists()
 
     @staticmethod
-    def _enviar_email_rechazo_supervisor(solicitud, supervisor, comentario_respuesta=None):
-        """Envía email cuando el supervisor rechaza una solicitud"""
-        subject = f"Solicitud Rechazada por Supervisor - {solicitud.tipo_cambio.nombre}"
-        
-        # Generar enlaces de aprobación
-        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud)
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/rechazo_supervisor.html', {
-            'solicitud': solicitud,
-            'supervisor': supervisor,
-            'comentario_respuesta': comentario_respuesta,
-            'enlaces': enlaces
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=supervisor.email,
-                recipient_list=[solicitud.explorador_solicitante.email],
-                html_message=html_message,
+    def marcar_todas_como_leidas(empleado):
+        """
+        Marca como leídas todas las notificaciones pendientes de un empleado
+
+        Returns:
+            Número de notificaciones marcadas
+        """
+        with transaction.atomic():
+            marcadas = Notificacion.objects.filter(destinatario=empleado, leida=False).update(
+                leida=True, fecha_lectura=timezone.now()
             )
-        except Exception as e:
-            print(f"Error enviando email de rechazo del supervisor: {e}")
+            ContadorNotificaciones.ajustar_empleado(empleado, -marcadas)
+        return marcadas
 
     @staticmethod
-    def _enviar_email_rechazo_receptor(solicitud, receptor, comentario_respuesta=None):
-        """Envía email cuando el receptor rechaza una solicitud"""
-        subject = f"Solicitud Rechazada por Compañero - {solicitud.tipo_cambio.nombre}"
-        
-        # Generar enlaces de aprobación
-        enlaces = NotificacionService._generar_enlaces_aprobacion(solicitud)
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/rechazo_receptor.html', {
-            'solicitud': solicitud,
-            'receptor': receptor,
-            'comentario_respuesta': comentario_respuesta,
-            'enlaces': enlaces
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=receptor.email,
-                recipient_list=[solicitud.explorador_solicitante.email],
-                html_message=html_message,
-            )
-        except Exception as e:
-            print(f"Error enviando email de rechazo del receptor: {e}") 
+    def obtener_notificaciones_no_leidas(empleado):
+        """
+        Obtiene las notificaciones no leídas de un empleado
+        """
+        return Notificacion.objects.filter(destinatario=empleado, leida=False).order_by('-fecha_creacion')
+
+    @staticmethod
+    def obtener_notificaciones(empleado):
+        """
+        Obtiene todas las notificaciones de un empleado
+        """
+        return Notificacion.objects.filter(destinatario=empleado).order_by('-fecha_creacion')
 
     @staticmethod
     def _verificar_token(solicitud, token, tipo):
@@ -857,56 +632,3 @@ class NotificacionService:
         ).hexdigest()
         
         return hmac.compare_digest(token, expected_token)
-    
-    @staticmethod
-    def crear_notificacion_cancelacion(solicitud):
-        """Crea notificación de cancelación para el receptor"""
-        titulo = f"Solicitud de cambio de turno cancelada"
-        mensaje = f"""
-        {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido} 
-        ha cancelado la solicitud de cambio de turno para el día {NotificacionService._convertir_fecha(solicitud.fecha_cambio_turno).strftime('%d/%m/%Y')}.
-        
-        Tipo de solicitud: {solicitud.tipo_cambio.nombre}
-        Estado: Cancelada
-        
-        Ya no necesitas aprobar o rechazar esta solicitud.
-        """
-        
-        print(f"DEBUG: Creando notificación de cancelación para receptor {solicitud.explorador_receptor.nombre}")
-        
-        Notificacion.objects.create(
-            destinatario=solicitud.explorador_receptor,
-            tipo='solicitud_cambio',
-            titulo=titulo,
-            mensaje=mensaje,
-            solicitud=solicitud
-        )
-        
-        print(f"DEBUG: Notificación de cancelación creada para receptor {solicitud.explorador_receptor.nombre}")
-        
-        # Enviar email de cancelación
-        NotificacionService._enviar_email_cancelacion(solicitud)
-    
-    @staticmethod
-    def _enviar_email_cancelacion(solicitud):
-        """Envía email de cancelación al receptor"""
-        subject = f"Solicitud de cambio de turno cancelada - {solicitud.explorador_solicitante.nombre} {solicitud.explorador_solicitante.apellido}"
-        
-        # Renderizar template HTML
-        html_message = render_to_string('solicitudes/emails/cancelacion_solicitud.html', {
-            'solicitud': solicitud
-        })
-        
-        # Versión texto plano
-        plain_message = strip_tags(html_message)
-        
-        try:
-            NotificacionService._enviar_email_desde_usuario(
-                subject=subject,
-                message=plain_message,
-                from_email=solicitud.explorador_solicitante.email,
-                recipient_list=[solicitud.explorador_receptor.email],
-                html_message=html_message
-            )
-        except Exception as e:
-            print(f"Error enviando email de cancelación: {e}") 
\ No newline at end of file
@@ -7,6 +7,7 @@ makes it easy to add new solicitud types.
 """
 
 from typing import Optional, Dict, Any
+from django.db import transaction
 from solicitudes.models import TipoSolicitudCambio
 from .strategies.base_strategy import SolicitudStrategy
 
@@ -128,7 +129,12 @@ class SolicitudFactory:
             return False, f"No se encontró estrategia para el tipo: {solicitud.tipo_cambio.nombre}"
         
         try:
-            return strategy.aplicar_cambios(solicitud)
+            # Savepoint: si la estrategia falla a mitad de camino no quedan turnos a medias
+            with transaction.atomic():
+                success, message = strategy.aplicar_cambios(solicitud)
+                if not success:
+                    transaction.set_rollback(True)
+                return success, message
         except Exception as e:
             return False, f"Error aplicando cambios: {str(e)}"
     
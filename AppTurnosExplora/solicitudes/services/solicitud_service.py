@@ -1,7 +1,10 @@
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Case, CharField, Q, Value, When
 # type: ignore
 from empleados.models import Empleado, CompetenciaEmpleado
-from turnos.models import Turno, AsignarJornadaExplorador, AsignarSalaExplorador
+from turnos.services.jornada_cache import JornadaCache
+from turnos.services.roster_service import RosterService
+from turnos.services.schedule_resolver import ScheduleResolver
 from solicitudes.models import TipoSolicitudCambio, SolicitudCambio
 from datetime import datetime
 from django.utils import timezone
@@ -77,13 +80,14 @@ class SolicitudService:
             jornada_contraria = 'AM'
         else:
             # Si no es AM ni PM, no hay jornada contraria definida
-            print(f"DEBUG: Jornada no reconocida: {jornada_usuario.nombre}")
+            logger.debug("Jornada no reconocida", extra={'jornada': jornada_usuario.nombre})
             return Empleado.objects.none()
         
         logger.debug("jornada_contraria", extra={'jornada_contraria': jornada_contraria})
         
-        # Buscar empleados que tengan la jornada contraria asignada
-        empleados_contrarios = []
+        # Resolver la jornada de todos los candidatos en una sola pasada
+        # (antes: get_jornada_explorador_fecha por empleado, ~3 consultas cada uno)
+        fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
         empleados_activos = (
             Empleado.objects
             .filter(activo=True)
@@ -91,12 +95,18 @@ class SolicitudService:
             .select_related('supervisor')
         )
         
-        logger.debug("empleados_activos_count", extra={'count': empleados_activos.count()})
-        
-        for empleado in empleados_activos:
-            jornada_empleado = SolicitudService.get_jornada_explorador_fecha(empleado.id, fecha)
-            if jornada_empleado and jornada_empleado.nombre == jornada_contraria:
-                empleados_contrarios.append(empleado)
+        if RosterService.cubre(fecha_obj):
+            empleados_contrarios = list(empleados_activos.filter(
+                roster_dias__fecha=fecha_obj,
+                roster_dias__jornada__nombre=jornada_contraria
+            ))
+        else:
+            resolver = ScheduleResolver(empleados_activos, fecha_obj)
+            empleados_contrarios = []
+            for empleado in empleados_activos:
+                jornada_empleado = resolver.get_jornada(empleado.id, fecha_obj)
+                if jornada_empleado and jornada_empleado.nombre == jornada_contraria:
+                    empleados_contrarios.append(empleado)
         
         logger.debug("empleados_contrarios_count", extra={'count': len(empleados_contrarios)})
         return empleados_contrarios
@@ -109,30 +119,22 @@ class SolicitudService:
         """
         try:
             fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
-            explorador = Empleado.objects.get(id=explorador_id)
-            
-            # 1. Buscar si hay un turno específico para esa fecha (cambio aprobado)
-            turno_especifico = Turno.objects.filter(
-                explorador=explorador, 
-                fecha=fecha_obj
-            ).first()
-            
-            if turno_especifico:
-                return turno_especifico.jornada  # Jornada del cambio
-            
-            # 2. Si no hay turno específico, usar la jornada fija del explorador
-            jornada_fija = AsignarJornadaExplorador.objects.filter(
-                explorador=explorador,
-                fecha_inicio__lte=fecha_obj
-            ).filter(
-                Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=fecha_obj)
-            ).order_by('-fecha_inicio').first()
-            
-            
-            return jornada_fija.jornada if jornada_fija else None
-            
-        except (ValueError, Empleado.DoesNotExist):
+            explorador_id = int(explorador_id)
+        except (TypeError, ValueError):
             return None
+        
+        return JornadaCache.obtener(
+            'jornada', explorador_id, fecha_obj,
+            lambda: SolicitudService._resolver_jornada(explorador_id, fecha_obj)
+        )
+
+    @staticmethod
+    def _resolver_jornada(explorador_id, fecha_obj):
+        if RosterService.cubre(fecha_obj):
+            return RosterService.get_jornada(explorador_id, fecha_obj)
+        
+        # El Turno del día (cambio aprobado) tiene prioridad sobre la jornada fija
+        return ScheduleResolver([explorador_id], fecha_obj).get_jornada(explorador_id, fecha_obj)
 
     @staticmethod
     def get_turno_explorador(explorador_id, fecha):
@@ -141,67 +143,63 @@ class SolicitudService:
         """
         try:
             fecha_obj = datetime.strptime(fecha, '%Y-%m-%d').date()
-            explorador = Empleado.objects.get(id=explorador_id)
-            # 1. Buscar turno específico para esa fecha
-            turno = Turno.objects.select_related('jornada', 'sala').filter(
-                explorador_id=explorador_id,
-                fecha=fecha_obj
-            ).first()
-            if turno:
-                return {
-                    'id': turno.id,
-                    'jornada': turno.jornada.nombre,
-                    'sala': turno.sala.nombre,
-                    'sala_id': turno.sala.id,
-                    'hora_inicio': turno.jornada.hora_inicio.strftime('%H:%M'),
-                    'hora_fin': turno.jornada.hora_fin.strftime('%H:%M'),
-                    'es_turno_virtual': False,
-                    'tipo_sala': 'turno'
-                }
-            # 2. Si no hay turno, buscar jornada predeterminada
-            asignacion_jornada = AsignarJornadaExplorador.objects.select_related('jornada').filter(
-                explorador=explorador,
-                fecha_inicio__lte=fecha_obj
-            ).filter(
-                Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=fecha_obj)
-            ).order_by('-fecha_inicio').first()
-            jornada = asignacion_jornada.jornada if asignacion_jornada else None
-            # 3. Buscar sala asignada especial para ese día
-            asignacion_sala = AsignarSalaExplorador.objects.select_related('sala').filter(
-                explorador=explorador,
-                fecha_inicio__lte=fecha_obj
-            ).filter(
-                Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=fecha_obj)
-            ).order_by('-fecha_inicio').first()
-            if asignacion_sala:
-                return {
-                    'id': None,
-                    'jornada': jornada.nombre if jornada else None,
-                    'sala': asignacion_sala.sala.nombre,
-                    'sala_id': asignacion_sala.sala.id,
-                    'hora_inicio': jornada.hora_inicio.strftime('%H:%M') if jornada else None,
-                    'hora_fin': jornada.hora_fin.strftime('%H:%M') if jornada else None,
-                    'es_turno_virtual': True,
-                    'tipo_sala': 'asignacion_especial'
-                }
-            # 4. Si no hay asignación especial, usar todas las salas de competencia
-            competencias = CompetenciaEmpleado.objects.filter(empleado=explorador).select_related('sala')
-            salas_competencia = [
-                {'id': c.sala.id, 'nombre': c.sala.nombre} for c in competencias
-            ]
+            explorador_id = int(explorador_id)
+        except (TypeError, ValueError):
+            return None
+
+        return JornadaCache.obtener(
+            'turno', explorador_id, fecha_obj,
+            lambda: SolicitudService._resolver_turno(explorador_id, fecha_obj)
+        )
+
+    @staticmethod
+    def _resolver_turno(explorador_id, fecha_obj):
+        resolver = ScheduleResolver([explorador_id], fecha_obj)
+        # 1. Buscar turno específico para esa fecha
+        turno = resolver.get_turno(explorador_id, fecha_obj)
+        if turno:
+            return {
+                'id': turno.id,
+                'jornada': turno.jornada.nombre,
+                'sala': turno.sala.nombre,
+                'sala_id': turno.sala.id,
+                'hora_inicio': turno.jornada.hora_inicio.strftime('%H:%M'),
+                'hora_fin': turno.jornada.hora_fin.strftime('%H:%M'),
+                'es_turno_virtual': False,
+                'tipo_sala': 'turno'
+            }
+        # 2. Si no hay turno, buscar jornada predeterminada
+        asignacion_jornada = resolver.get_asignacion_jornada(explorador_id, fecha_obj)
+        jornada = asignacion_jornada.jornada if asignacion_jornada else None
+        # 3. Buscar sala asignada especial para ese día
+        asignacion_sala = resolver.get_asignacion_sala(explorador_id, fecha_obj)
+        if asignacion_sala:
             return {
                 'id': None,
                 'jornada': jornada.nombre if jornada else None,
-                'sala': None,
-                'sala_id': None,
+                'sala': asignacion_sala.sala.nombre,
+                'sala_id': asignacion_sala.sala.id,
                 'hora_inicio': jornada.hora_inicio.strftime('%H:%M') if jornada else None,
                 'hora_fin': jornada.hora_fin.strftime('%H:%M') if jornada else None,
                 'es_turno_virtual': True,
-                'tipo_sala': 'competencia',
-                'salas_competencia': salas_competencia
+                'tipo_sala': 'asignacion_especial'
             }
-        except ValueError:
-            return None
+        # 4. Si no hay asignación especial, usar todas las salas de competencia
+        competencias = CompetenciaEmpleado.objects.filter(empleado_id=explorador_id).select_related('sala')
+        salas_competencia = [
+            {'id': c.sala.id, 'nombre': c.sala.nombre} for c in competencias
+        ]
+        return {
+            'id': None,
+            'jornada': jornada.nombre if jornada else None,
+            'sala': None,
+            'sala_id': None,
+            'hora_inicio': jornada.hora_inicio.strftime('%H:%M') if jornada else None,
+            'hora_fin': jornada.hora_fin.strftime('%H:%M') if jornada else None,
+            'es_turno_virtual': True,
+            'tipo_sala': 'competencia',
+            'salas_competencia': salas_competencia
+        }
 
     @staticmethod
     def get_salas_explorador(explorador_id):
@@ -339,57 +337,158 @@ class SolicitudService:
             .order_by('-fecha_solicitud')
         )
 
+    # ===== Aprobación y rechazo =====
+    # Cada paso es un UPDATE condicional (compare-and-set) sobre la fila: "marcar aprobado
+    # por el receptor si sigue pendiente y no lo estaba", "pasar a aprobada si sigue pendiente
+    # y tiene las dos aprobaciones". El UPDATE bloquea la fila hasta el fin de la transacción,
+    # así que con dos aprobaciones simultáneas (web y enlace de email, doble clic, dos
+    # workers) solo una cambia cada paso, y solo quien deja la solicitud en 'aprobada'
+    # aplica los cambios: nunca se crean turnos duplicados.
+
+    # rol -> (campo de aprobación, campo de fecha)
+    CAMPOS_ROL = {
+        'receptor': ('aprobado_receptor', 'fecha_aprobacion_receptor'),
+        'supervisor': ('aprobado_supervisor', 'fecha_aprobacion_supervisor'),
+    }
+    CAMPOS_ESTADO = [
+        'estado', 'fecha_resolucion', 'aprobado_receptor', 'fecha_aprobacion_receptor',
+        'aprobado_supervisor', 'fecha_aprobacion_supervisor',
+    ]
+
     @staticmethod
-    def aprobar_solicitud_supervisor(solicitud_id, supervisor, comentario_respuesta=None):
+    def _cargar_para_transicion(solicitud_id):
+        return (
+            SolicitudCambio.objects
+            .select_related('explorador_solicitante', 'explorador_receptor', 'tipo_cambio')
+            .get(id=solicitud_id)
+        )
+
+    @staticmethod
+    def _tiene_rol(solicitud, empleado, rol):
+        if rol == 'receptor':
+            return solicitud.explorador_receptor_id == empleado.id
+        return solicitud.explorador_solicitante.supervisor_id == empleado.id
+
+    @staticmethod
+    def _transicion(solicitud, condicion, cambios):
         """
-        Aprueba una solicitud por parte del supervisor
+        UPDATE de `cambios` solo si la fila sigue cumpliendo `condicion`. True si esta
+        llamada hizo el cambio (y entonces la instancia queda con los valores nuevos).
         """
-        try:
-            solicitud = (
-                SolicitudCambio.objects
-                .select_related('explorador_solicitante__supervisor', 'explorador_receptor', 'tipo_cambio')
-                .get(id=solicitud_id)
+        actualizadas = SolicitudCambio.objects.filter(id=solicitud.id, **condicion).update(**cambios)
+        if actualizadas:
+            for campo, valor in cambios.items():
+                setattr(solicitud, campo, valor)
+        return bool(actualizadas)
+
+    @staticmethod
+    def _registrar_historial(solicitudes):
+        """
+        Fila de historial ('~') de las solicitudes ya actualizadas con _transicion: el
+        UPDATE no pasa por save(), y repetirlo solo para el historial sería una escritura más
+        """
+        SolicitudCambio.historial.bulk_history_create(solicitudes, update=True)
+
+    @staticmethod
+    def _motivo_sin_transicion(solicitud, accion):
+        """Mensaje para quien perdió la transición, según el estado actual de la fila"""
+        solicitud.refresh_from_db(fields=SolicitudService.CAMPOS_ESTADO)
+        if solicitud.estado == 'cancelada':
+            return f"Esta solicitud fue cancelada y ya no puede ser {accion}"
+        elif solicitud.estado == 'aprobada':
+            return "Esta solicitud ya fue aprobada"
+        elif solicitud.estado == 'rechazada':
+            return "Esta solicitud ya fue rechazada"
+        elif solicitud.estado == 'pendiente':
+            return "Ya aprobaste esta solicitud"
+        return "La solicitud no está pendiente de aprobación"
+
+    @staticmethod
+    def _aprobar(solicitud_id, empleado, roles, comentario_respuesta):
+        """
+        Registra la aprobación de `empleado` en `roles` y, si con eso la solicitud tiene las
+        dos aprobaciones, la pasa a 'aprobada' y aplica los cambios una sola vez.
+        Devuelve (success, message).
+        """
+        solicitud = SolicitudService._cargar_para_transicion(solicitud_id)
+        if not all(SolicitudService._tiene_rol(solicitud, empleado, rol) for rol in roles):
+            return False, "No tienes permisos para aprobar esta solicitud"
+
+        ahora = timezone.now()
+        condicion = {'estado': 'pendiente'}
+        cambios = {}
+        for rol in roles:
+            aprobado, fecha = SolicitudService.CAMPOS_ROL[rol]
+            if len(roles) == 1:
+                condicion[aprobado] = False
+            if len(roles) == 1 or not getattr(solicitud, aprobado):
+                cambios.update({aprobado: True, fecha: ahora})
+
+        with transaction.atomic():
+            if cambios and not SolicitudService._transicion(solicitud, condicion, cambios):
+                return False, SolicitudService._motivo_sin_transicion(solicitud, 'aprobada')
+
+            aprobada = SolicitudService._transicion(
+                solicitud,
+                {'estado': 'pendiente', 'aprobado_receptor': True, 'aprobado_supervisor': True},
+                {'estado': 'aprobada', 'fecha_resolucion': ahora},
             )
-            
-            # Verificar que el aprobador sea el supervisor del solicitante
-            # Permitir auto-supervisión para desarrollo
-            if solicitud.explorador_solicitante.supervisor != supervisor:
-                return False, "No tienes permisos para aprobar esta solicitud"
-            
-            # Verificar que la solicitud esté pendiente
-            if solicitud.estado != 'pendiente':
-                if solicitud.estado == 'cancelada':
-                    return False, "Esta solicitud fue cancelada y ya no puede ser aprobada"
-                elif solicitud.estado == 'aprobada':
-                    return False, "Esta solicitud ya fue aprobada"
-                elif solicitud.estado == 'rechazada':
-                    return False, "Esta solicitud ya fue rechazada"
-                else:
-                    return False, "La solicitud no está pendiente de aprobación"
-            
-            # Marcar como aprobada por supervisor
-            solicitud.aprobado_supervisor = True
-            solicitud.fecha_aprobacion_supervisor = timezone.now()
-            
-            # Si ya fue aprobada por el receptor, cambiar estado a aprobada
-            if solicitud.aprobado_receptor:
-                solicitud.estado = 'aprobada'
-                solicitud.fecha_resolucion = timezone.now()
-                
-                # Aplicar los cambios usando el Factory
+            if not cambios and not aprobada:
+                return False, SolicitudService._motivo_sin_transicion(solicitud, 'aprobada')
+            if aprobada:
+                # La otra aprobación pudo llegar entre la carga y el UPDATE: se relee la fila
+                # (ya bloqueada) antes de aplicar los cambios
+                solicitud.refresh_from_db(fields=SolicitudService.CAMPOS_ESTADO)
                 from .solicitud_factory import SolicitudFactory
                 success, message = SolicitudFactory.aplicar_cambios(solicitud)
                 if not success:
-                    logger.error(f"Error aplicando cambios: {message}")
-            
-            solicitud.save()
-            
-            # Crear notificación de aprobación del supervisor
+                    # Sin los cambios aplicados la aprobación no se confirma: todo sigue como estaba
+                    logger.error("Error aplicando cambios", extra={'solicitud_id': solicitud.id, 'detalle': message})
+                    transaction.set_rollback(True)
+                    return False, f"No se pudieron aplicar los cambios: {message}"
+            SolicitudService._registrar_historial([solicitud])
+
             from .notificacion_service import NotificacionService
-            NotificacionService.crear_notificacion_aprobacion_supervisor(solicitud, supervisor, comentario_respuesta)
-            
-            return True, "Solicitud aprobada por supervisor correctamente"
-            
+            for rol in roles:
+                if SolicitudService.CAMPOS_ROL[rol][0] in cambios:
+                    NotificacionService.notificar(
+                        f'aprobacion_{rol}', solicitud, actor=empleado, comentario_respuesta=comentario_respuesta
+                    )
+        return True, None
+
+    @staticmethod
+    def _rechazar(solicitud_id, empleado, rol, comentario_respuesta):
+        """Pasa la solicitud de 'pendiente' a 'rechazada' por `rol`. Devuelve (success, message)"""
+        solicitud = SolicitudService._cargar_para_transicion(solicitud_id)
+        if not SolicitudService._tiene_rol(solicitud, empleado, rol):
+            return False, "No tienes permisos para rechazar esta solicitud"
+
+        ahora = timezone.now()
+        aprobado, fecha = SolicitudService.CAMPOS_ROL[rol]
+        with transaction.atomic():
+            rechazada = SolicitudService._transicion(
+                solicitud,
+                {'estado': 'pendiente'},
+                {'estado': 'rechazada', aprobado: False, fecha: ahora, 'fecha_resolucion': ahora},
+            )
+            if not rechazada:
+                return False, SolicitudService._motivo_sin_transicion(solicitud, 'rechazada')
+            SolicitudService._registrar_historial([solicitud])
+
+            from .notificacion_service import NotificacionService
+            NotificacionService.notificar(
+                f'rechazo_{rol}', solicitud, actor=empleado, comentario_respuesta=comentario_respuesta
+            )
+        return True, None
+
+    @staticmethod
+    def aprobar_solicitud_supervisor(solicitud_id, supervisor, comentario_respuesta=None):
+        """
+        Aprueba una solicitud por parte del supervisor
+        """
+        try:
+            success, message = SolicitudService._aprobar(solicitud_id, supervisor, ['supervisor'], comentario_respuesta)
+            return success, message or "Solicitud aprobada por supervisor correctamente"
         except SolicitudCambio.DoesNotExist:
             return False, "Solicitud no encontrada"
         except Exception as e:
@@ -402,96 +501,38 @@ class SolicitudService:
         Aprueba una solicitud por parte del compañero receptor
         """
         try:
-            solicitud = (
-                SolicitudCambio.objects
-                .select_related('explorador_solicitante__supervisor', 'explorador_receptor', 'tipo_cambio')
-                .get(id=solicitud_id)
-            )
-            
-            # Verificar que el aprobador sea el receptor de la solicitud
-            if solicitud.explorador_receptor != receptor:
-                return False, "No tienes permisos para aprobar esta solicitud"
-            
-            # Verificar que la solicitud esté pendiente
-            if solicitud.estado != 'pendiente':
-                if solicitud.estado == 'cancelada':
-                    return False, "Esta solicitud fue cancelada y ya no puede ser aprobada"
-                elif solicitud.estado == 'aprobada':
-                    return False, "Esta solicitud ya fue aprobada"
-                elif solicitud.estado == 'rechazada':
-                    return False, "Esta solicitud ya fue rechazada"
-                else:
-                    return False, "La solicitud no está pendiente de aprobación"
-            
-            # Marcar como aprobada por receptor
-            solicitud.aprobado_receptor = True
-            solicitud.fecha_aprobacion_receptor = timezone.now()
-            
-            # Si ya fue aprobada por el supervisor, cambiar estado a aprobada
-            if solicitud.aprobado_supervisor:
-                solicitud.estado = 'aprobada'
-                solicitud.fecha_resolucion = timezone.now()
-                
-                # Aplicar los cambios usando el Factory
-                from .solicitud_factory import SolicitudFactory
-                success, message = SolicitudFactory.aplicar_cambios(solicitud)
-                if not success:
-                    logger.error(f"Error aplicando cambios: {message}")
-            
-            solicitud.save()
-            
-            # Crear notificación de aprobación del receptor
-            from .notificacion_service import NotificacionService
-            NotificacionService.crear_notificacion_aprobacion_receptor(solicitud, receptor, comentario_respuesta)
-            
-            return True, "Solicitud aprobada por compañero correctamente"
-            
+            success, message = SolicitudService._aprobar(solicitud_id, receptor, ['receptor'], comentario_respuesta)
+            return success, message or "Solicitud aprobada por compañero correctamente"
         except SolicitudCambio.DoesNotExist:
             return False, "Solicitud no encontrada"
         except Exception as e:
             logger.exception("Error al aprobar solicitud receptor")
             return False, f"Error al aprobar la solicitud: {str(e)}"
 
+    @staticmethod
+    def aprobar_solicitud_ambos(solicitud_id, empleado, comentario_respuesta=None):
+        """
+        Aprueba como receptor y como supervisor en un solo paso (cuando el empleado es ambos)
+        """
+        try:
+            success, message = SolicitudService._aprobar(
+                solicitud_id, empleado, ['receptor', 'supervisor'], comentario_respuesta
+            )
+            return success, message or "Solicitud aprobada en ambos roles correctamente"
+        except SolicitudCambio.DoesNotExist:
+            return False, "Solicitud no encontrada"
+        except Exception as e:
+            logger.exception("Error al aprobar solicitud en ambos roles")
+            return False, f"Error al aprobar la solicitud: {str(e)}"
+
     @staticmethod
     def rechazar_solicitud_supervisor(solicitud_id, supervisor, comentario_respuesta=None):
         """
         Rechaza una solicitud por parte del supervisor
         """
         try:
-            solicitud = (
-                SolicitudCambio.objects
-                .select_related('explorador_solicitante__supervisor', 'explorador_receptor', 'tipo_cambio')
-                .get(id=solicitud_id)
-            )
-            
-            # Verificar que el rechazador sea el supervisor del solicitante
-            if solicitud.explorador_solicitante.supervisor != supervisor:
-                return False, "No tienes permisos para rechazar esta solicitud"
-            
-            # Verificar que la solicitud esté pendiente
-            if solicitud.estado != 'pendiente':
-                if solicitud.estado == 'cancelada':
-                    return False, "Esta solicitud fue cancelada y ya no puede ser rechazada"
-                elif solicitud.estado == 'aprobada':
-                    return False, "Esta solicitud ya fue aprobada"
-                elif solicitud.estado == 'rechazada':
-                    return False, "Esta solicitud ya fue rechazada"
-                else:
-                    return False, "La solicitud no está pendiente de aprobación"
-            
-            # Rechazar la solicitud
-            solicitud.estado = 'rechazada'
-            solicitud.aprobado_supervisor = False
-            solicitud.fecha_aprobacion_supervisor = timezone.now()
-            solicitud.fecha_resolucion = timezone.now()
-            solicitud.save()
-            
-            # Crear notificación de rechazo
-            from .notificacion_service import NotificacionService
-            NotificacionService.crear_notificacion_rechazo_supervisor(solicitud, supervisor, comentario_respuesta)
-            
-            return True, "Solicitud rechazada por supervisor correctamente"
-            
+            success, message = SolicitudService._rechazar(solicitud_id, supervisor, 'supervisor', comentario_respuesta)
+            return success, message or "Solicitud rechazada por supervisor correctamente"
         except SolicitudCambio.DoesNotExist:
             return False, "Solicitud no encontrada"
         except Exception as e:
@@ -504,46 +545,142 @@ class SolicitudService:
         Rechaza una solicitud por parte del compañero receptor
         """
         try:
-            solicitud = (
-                SolicitudCambio.objects
-                .select_related('explorador_solicitante__supervisor', 'explorador_receptor', 'tipo_cambio')
-                .get(id=solicitud_id)
-            )
-            
-            # Verificar que el rechazador sea el receptor de la solicitud
-            if solicitud.explorador_receptor != receptor:
-                return False, "No tienes permisos para rechazar esta solicitud"
-            
-            # Verificar que la solicitud esté pendiente
-            if solicitud.estado != 'pendiente':
-                if solicitud.estado == 'cancelada':
-                    return False, "Esta solicitud fue cancelada y ya no puede ser rechazada"
-                elif solicitud.estado == 'aprobada':
-                    return False, "Esta solicitud ya fue aprobada"
-                elif solicitud.estado == 'rechazada':
-                    return False, "Esta solicitud ya fue rechazada"
-                else:
-                    return False, "La solicitud no está pendiente de aprobación"
-            
-            # Rechazar la solicitud
-            solicitud.estado = 'rechazada'
-            solicitud.aprobado_receptor = False
-            solicitud.fecha_aprobacion_receptor = timezone.now()
-            solicitud.fecha_resolucion = timezone.now()
-            solicitud.save()
-            
-            # Crear notificación de rechazo
-            from .notificacion_service import NotificacionService
-            NotificacionService.crear_notificacion_rechazo_receptor(solicitud, receptor, comentario_respuesta)
-            
-            return True, "Solicitud rechazada por compañero correctamente"
-            
+            success, message = SolicitudService._rechazar(solicitud_id, receptor, 'receptor', comentario_respuesta)
+            return success, message or "Solicitud rechazada por compañero correctamente"
         except SolicitudCambio.DoesNotExist:
             return False, "Solicitud no encontrada"
         except Exception as e:
             logger.exception("Error al rechazar solicitud receptor")
             return False, f"Error al rechazar la solicitud: {str(e)}"
 
+    @staticmethod
+    def cancelar_solicitud(solicitud, comentario):
+        """
+        Pasa la solicitud de 'pendiente' a 'cancelada'. False si ya no estaba pendiente (por
+        ejemplo, si se aprobó mientras el solicitante cancelaba).
+        """
+        with transaction.atomic():
+            cancelada = SolicitudService._transicion(
+                solicitud,
+                {'estado': 'pendiente'},
+                {'estado': 'cancelada', 'fecha_resolucion': timezone.now(), 'comentario': comentario},
+            )
+            if cancelada:
+                SolicitudService._registrar_historial([solicitud])
+                from .notificacion_service import NotificacionService
+                NotificacionService.crear_notificacion_cancelacion(solicitud)
+        return cancelada
+
+    MAXIMO_LOTE = 200
+
+    @staticmethod
+    def resolver_lote_supervisor(solicitud_ids, supervisor, accion, comentario_respuesta=None):
+        """
+        Aprueba o rechaza (accion 'aprobar' o 'rechazar') como supervisor varias solicitudes
+        en una transacción.
+
+        Los permisos se validan con una consulta, las filas pendientes se bloquean con otra y
+        cada transición es un solo UPDATE para todo el lote (con la misma condición que
+        _aprobar/_rechazar). Las que quedan 'aprobada' aplican sus cambios una por una, y las
+        notificaciones de todo el lote salen con NotificacionService.notificar_lote.
+
+        Returns:
+            {'procesadas': [ids], 'aprobadas': [ids que pasaron a 'aprobada'],
+             'omitidas': [{'id', 'motivo'}]}
+        """
+        if accion not in ('aprobar', 'rechazar'):
+            raise ValueError(f"Acción desconocida: {accion}")
+        solicitud_ids = sorted(set(solicitud_ids))
+
+        estados = {
+            solicitud_id: (estado, aprobado_supervisor)
+            for solicitud_id, estado, aprobado_supervisor in SolicitudCambio.objects.filter(
+                id__in=solicitud_ids, explorador_solicitante__supervisor=supervisor
+            ).values_list('id', 'estado', 'aprobado_supervisor')
+        }
+        ahora = timezone.now()
+        aprobado, fecha = SolicitudService.CAMPOS_ROL['supervisor']
+        condicion = {'estado': 'pendiente'}
+        if accion == 'aprobar':
+            condicion[aprobado] = False
+
+        with transaction.atomic():
+            # Bloquea las filas hasta el fin de la transacción: una aprobación individual
+            # simultánea espera y después no encuentra la condición de su UPDATE
+            bloqueadas = dict(
+                SolicitudCambio.objects.select_for_update()
+                .filter(id__in=list(estados), **condicion)
+                .values_list('id', 'aprobado_receptor')
+            )
+            procesadas = sorted(bloqueadas)
+            if accion == 'aprobar':
+                # Las que ya tenían la aprobación del receptor quedan resueltas
+                a_aprobar = [solicitud_id for solicitud_id in procesadas if bloqueadas[solicitud_id]]
+                SolicitudCambio.objects.filter(id__in=procesadas, **condicion).update(**{aprobado: True, fecha: ahora})
+                SolicitudCambio.objects.filter(
+                    id__in=a_aprobar, estado='pendiente', aprobado_receptor=True, aprobado_supervisor=True
+                ).update(estado='aprobada', fecha_resolucion=ahora)
+            else:
+                SolicitudCambio.objects.filter(id__in=procesadas, **condicion).update(
+                    estado='rechazada', **{aprobado: False, fecha: ahora}, fecha_resolucion=ahora
+                )
+
+            solicitudes = list(
+                SolicitudCambio.objects
+                .select_related('explorador_solicitante', 'explorador_receptor', 'tipo_cambio')
+                .filter(id__in=procesadas)
+                .order_by('id')
+            )
+            aprobadas = [solicitud for solicitud in solicitudes if solicitud.estado == 'aprobada']
+            fallidas = {}
+            if aprobadas:
+                from .solicitud_factory import SolicitudFactory
+                for solicitud in aprobadas:
+                    success, message = SolicitudFactory.aplicar_cambios(solicitud)
+                    if not success:
+                        # Sin los cambios aplicados la aprobación no se confirma: la solicitud
+                        # vuelve a como estaba y el resto del lote sigue
+                        logger.error("Error aplicando cambios", extra={'solicitud_id': solicitud.id, 'detalle': message})
+                        SolicitudCambio.objects.filter(id=solicitud.id).update(
+                            estado='pendiente', fecha_resolucion=None, **{aprobado: False, fecha: None}
+                        )
+                        fallidas[solicitud.id] = f"No se pudieron aplicar los cambios: {message}"
+                if fallidas:
+                    solicitudes = [solicitud for solicitud in solicitudes if solicitud.id not in fallidas]
+                    aprobadas = [solicitud for solicitud in aprobadas if solicitud.id not in fallidas]
+                    procesadas = [solicitud_id for solicitud_id in procesadas if solicitud_id not in fallidas]
+            if solicitudes:
+                SolicitudService._registrar_historial(solicitudes)
+                from .notificacion_service import NotificacionService
+                NotificacionService.notificar_lote(
+                    'aprobacion_supervisor' if accion == 'aprobar' else 'rechazo_supervisor',
+                    solicitudes, actor=supervisor, comentario_respuesta=comentario_respuesta
+                )
+
+        omitidas = []
+        for solicitud_id in solicitud_ids:
+            if solicitud_id in fallidas:
+                motivo = fallidas[solicitud_id]
+            elif solicitud_id in bloqueadas:
+                continue
+            elif solicitud_id not in estados:
+                motivo = "No tienes permisos para resolver esta solicitud"
+            elif estados[solicitud_id] == ('pendiente', True):
+                motivo = "Ya aprobaste esta solicitud"
+            else:
+                motivo = "La solicitud no está pendiente de aprobación"
+            omitidas.append({'id': solicitud_id, 'motivo': motivo})
+
+        logger.info("Solicitudes resueltas en lote", extra={
+            'accion': accion, 'supervisor_id': supervisor.id,
+            'procesadas': len(procesadas), 'aprobadas': len(aprobadas), 'omitidas': len(omitidas)
+        })
+        return {
+            'procesadas': procesadas,
+            'aprobadas': [solicitud.id for solicitud in aprobadas],
+            'omitidas': omitidas,
+        }
+
     @staticmethod
     def get_solicitudes_por_receptor(receptor):
         """
@@ -576,6 +713,29 @@ class SolicitudService:
             .order_by('-fecha_solicitud')
         )
 
+    @staticmethod
+    def get_bandeja_pendientes(empleado):
+        """
+        Solicitudes pendientes que `empleado` debe aprobar como receptor y/o supervisor, en una
+        sola consulta: `mi_rol` ('receptor', 'supervisor' o 'ambos') se calcula en SQL con
+        Case/When y se traen las relaciones que muestra la bandeja. El supervisor se une por
+        una FK hacia adelante, así que no hay filas repetidas ni hace falta DISTINCT.
+        """
+        como_receptor = Q(explorador_receptor=empleado, aprobado_receptor=False)
+        como_supervisor = Q(explorador_solicitante__supervisor=empleado, aprobado_supervisor=False)
+        return (
+            SolicitudCambio.objects
+            .filter(como_receptor | como_supervisor, estado='pendiente')
+            .annotate(mi_rol=Case(
+                When(como_receptor & como_supervisor, then=Value('ambos')),
+                When(como_receptor, then=Value('receptor')),
+                default=Value('supervisor'),
+                output_field=CharField(),
+            ))
+            .select_related('explorador_solicitante', 'explorador_receptor', 'tipo_cambio')
+            .order_by('-fecha_solicitud', '-id')
+        )
+
     @staticmethod
     def get_estado_aprobacion_solicitud(solicitud):
         """
@@ -83,9 +83,10 @@ class SolicitudValidator:
         """
         from .solicitud_service import SolicitudService
         
-        # Obtener jornadas de ambos empleados
-        jornada_solicitante = SolicitudService.get_jornada_explorador_fecha(solicitante.id, fecha)
-        jornada_receptor = SolicitudService.get_jornada_explorador_fecha(receptor.id, fecha)
+        # Cacheado: normalmente ya se resolvió en validar_jornada_en_fecha
+        fecha_str = SolicitudValidator._to_date(fecha).strftime('%Y-%m-%d')
+        jornada_solicitante = SolicitudService.get_jornada_explorador_fecha(solicitante.id, fecha_str)
+        jornada_receptor = SolicitudService.get_jornada_explorador_fecha(receptor.id, fecha_str)
         
         if not jornada_solicitante or not jornada_receptor:
             raise ValidationError('Ambos empleados deben tener jornada asignada para esa fecha')
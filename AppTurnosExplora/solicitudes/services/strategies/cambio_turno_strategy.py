@@ -104,20 +104,17 @@ class CambioTurnoStrategy(SolicitudStrategy):
         """
         try:
             from turnos.models import Turno
-            from datetime import datetime
             from ..solicitud_service import SolicitudService
             
-            # Convertir fecha a objeto date
             fecha_cambio = solicitud.fecha_cambio_turno
+            fecha_str = fecha_cambio.strftime('%Y-%m-%d')
             
-            # 1. Obtener jornadas actuales de ambos empleados para esa fecha
+            # 1. Obtener jornadas actuales de ambos empleados para esa fecha (cacheadas desde la validación)
             jornada_solicitante = SolicitudService.get_jornada_explorador_fecha(
-                solicitud.explorador_solicitante.id, 
-                fecha_cambio.strftime('%Y-%m-%d')
+                solicitud.explorador_solicitante_id, fecha_str
             )
             jornada_receptor = SolicitudService.get_jornada_explorador_fecha(
-                solicitud.explorador_receptor.id, 
-                fecha_cambio.strftime('%Y-%m-%d')
+                solicitud.explorador_receptor_id, fecha_str
             )
             
             if not jornada_solicitante or not jornada_receptor:
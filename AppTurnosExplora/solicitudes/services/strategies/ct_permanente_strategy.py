@@ -19,6 +19,9 @@ class CTPermanenteStrategy(SolicitudStrategy):
     including validation, creation, and application of changes.
     """
     
+    # Filas por INSERT al aplicar un cambio permanente
+    BATCH_SIZE = 500
+    
     def __init__(self):
         super().__init__("CT PERMANENTE")
     
@@ -138,6 +141,9 @@ class CTPermanenteStrategy(SolicitudStrategy):
         """
         Apply permanent change when solicitud is approved.
         
+        Los días especiales del periodo se cargan en una sola consulta y los Turno
+        se insertan con bulk_create (con historial) dentro de una única transacción.
+        
         Args:
             solicitud: The approved solicitud instance
             
@@ -145,132 +151,113 @@ class CTPermanenteStrategy(SolicitudStrategy):
             Tuple of (success, message)
         """
         try:
-            from datetime import datetime, date, timedelta
-            from turnos.models import AsignarJornadaExplorador, Turno
+            from datetime import date, timedelta
+            from django.db import transaction
             from django.utils import timezone
+            from simple_history.utils import bulk_create_with_history
+            from empleados.models import Jornada
+            from turnos.models import AsignarJornadaExplorador, AsignarSalaExplorador, Turno
+            from turnos.services.jornada_cache import JornadaCache
+            from turnos.services.roster_service import RosterService
             
             # Obtener el detalle del cambio permanente
             detalle = solicitud.cambio_permanente
             if not detalle:
                 return False, "No se encontró el detalle del cambio permanente"
             
-            # Obtener las jornadas actuales de ambos empleados
-            jornada_solicitante = AsignarJornadaExplorador.objects.filter(
-                explorador=solicitud.explorador_solicitante,
-                fecha_inicio__lte=detalle.fecha_inicio,
-                fecha_fin__gte=detalle.fecha_inicio
-            ).first()
-            
-            jornada_receptor = AsignarJornadaExplorador.objects.filter(
-                explorador=solicitud.explorador_receptor,
-                fecha_inicio__lte=detalle.fecha_inicio,
-                fecha_fin__gte=detalle.fecha_inicio
-            ).first()
-            
-            if not jornada_solicitante or not jornada_receptor:
-                return False, "No se encontraron las jornadas de los empleados"
-            
-            # Obtener las jornadas actuales
-            jornada_solicitante_actual = jornada_solicitante.jornada
-            jornada_receptor_actual = jornada_receptor.jornada
-            
-            # Buscar la jornada contraria para cada uno
-            from empleados.models import Jornada
-            jornada_contraria_solicitante = Jornada.objects.exclude(id=jornada_solicitante_actual.id).first()
-            jornada_contraria_receptor = Jornada.objects.exclude(id=jornada_receptor_actual.id).first()
-            
-            if not jornada_contraria_solicitante or not jornada_contraria_receptor:
-                return False, "No se encontraron jornadas contrarias"
-            
             # Calcular fecha fin del cambio permanente
             fecha_fin_cambio = detalle.fecha_fin
             if not fecha_fin_cambio:
                 # Si no hay fecha fin, usar fin de año
                 fecha_fin_cambio = date(detalle.fecha_inicio.year, 12, 31)
             
-            # 1. Finalizar las jornadas actuales antes de la fecha de inicio
-            if jornada_solicitante.fecha_fin >= detalle.fecha_inicio:
-                jornada_solicitante.fecha_fin = detalle.fecha_inicio - timedelta(days=1)
-                jornada_solicitante.save()
-            
-            if jornada_receptor.fecha_fin >= detalle.fecha_inicio:
-                jornada_receptor.fecha_fin = detalle.fecha_inicio - timedelta(days=1)
-                jornada_receptor.save()
-            
-            # 2. Crear registros en Turno para el período de cambio permanente
-            from turnos.models import Turno
-            
-            # Crear registros diarios en Turno para el período
-            fecha_actual = detalle.fecha_inicio
-            turnos_creados = []
-            dias_omitidos = []
-            dias_procesados = 0
-            
-            # Obtener las salas de cada empleado
-            from turnos.models import AsignarSalaExplorador
-            sala_solicitante = AsignarSalaExplorador.objects.filter(
-                explorador=solicitud.explorador_solicitante,
-                fecha_inicio__lte=detalle.fecha_inicio,
-                fecha_fin__gte=detalle.fecha_inicio
-            ).first()
-            
-            sala_receptor = AsignarSalaExplorador.objects.filter(
-                explorador=solicitud.explorador_receptor,
-                fecha_inicio__lte=detalle.fecha_inicio,
-                fecha_fin__gte=detalle.fecha_inicio
-            ).first()
-            
-            if not sala_solicitante or not sala_receptor:
-                return False, "No se encontraron las salas de los empleados"
-            
-            while fecha_actual <= fecha_fin_cambio:
-                # Verificar si es día válido (no domingo, no festivo, no mantenimiento)
-                if (fecha_actual.weekday() != 6 and 
-                    not self._es_festivo(fecha_actual) and 
-                    not self._es_mantenimiento(fecha_actual)):
-                    
-                    # Crear turnos solo para días válidos
-                    turno_solicitante = Turno.objects.create(
-                        explorador=solicitud.explorador_solicitante,
-                        fecha=fecha_actual,
-                        jornada=jornada_contraria_solicitante,
-                        sala=sala_solicitante.sala,
-                        tipo_cambio='CT PERMANENTE'
-                    )
-                    
-                    turno_receptor = Turno.objects.create(
-                        explorador=solicitud.explorador_receptor,
-                        fecha=fecha_actual,
-                        jornada=jornada_contraria_receptor,
-                        sala=sala_receptor.sala,
-                        tipo_cambio='CT PERMANENTE'
-                    )
-                    
-                    turnos_creados.append((turno_solicitante, turno_receptor))
-                    dias_procesados += 1
-                else:
-                    # Registrar día omitido
-                    razon = self._obtener_razon_dia_invalido(fecha_actual)
-                    dias_omitidos.append(f"{fecha_actual.strftime('%d/%m/%Y')} ({razon})")
+            explorador_ids = [solicitud.explorador_solicitante_id, solicitud.explorador_receptor_id]
+            
+            with transaction.atomic():
+                # Obtener las jornadas y salas actuales de ambos empleados
+                vigentes = dict(
+                    fecha_inicio__lte=detalle.fecha_inicio,
+                    fecha_fin_efectiva__gte=detalle.fecha_inicio
+                )
+                jornada_solicitante = AsignarJornadaExplorador.objects.select_related('jornada').filter(
+                    explorador_id=solicitud.explorador_solicitante_id, **vigentes
+                ).first()
+                jornada_receptor = AsignarJornadaExplorador.objects.select_related('jornada').filter(
+                    explorador_id=solicitud.explorador_receptor_id, **vigentes
+                ).first()
+                
+                if not jornada_solicitante or not jornada_receptor:
+                    return False, "No se encontraron las jornadas de los empleados"
+                
+                # Buscar la jornada contraria para cada uno
+                jornada_contraria_solicitante = Jornada.objects.exclude(id=jornada_solicitante.jornada_id).first()
+                jornada_contraria_receptor = Jornada.objects.exclude(id=jornada_receptor.jornada_id).first()
                 
-                fecha_actual += timedelta(days=1)
-            
-            # 3. Actualizar la solicitud con las referencias a los turnos creados
-            # Para CT PERMANENTE, usamos el primer turno creado como referencia
-            if turnos_creados:
-                primer_turno_solicitante, primer_turno_receptor = turnos_creados[0]
-                solicitud.turno_origen = primer_turno_solicitante
-                solicitud.turno_destino = primer_turno_receptor
+                if not jornada_contraria_solicitante or not jornada_contraria_receptor:
+                    return False, "No se encontraron jornadas contrarias"
+                
+                sala_solicitante = AsignarSalaExplorador.objects.filter(
+                    explorador_id=solicitud.explorador_solicitante_id, **vigentes
+                ).first()
+                sala_receptor = AsignarSalaExplorador.objects.filter(
+                    explorador_id=solicitud.explorador_receptor_id, **vigentes
+                ).first()
+                
+                if not sala_solicitante or not sala_receptor:
+                    return False, "No se encontraron las salas de los empleados"
+                
+                # 1. Finalizar las jornadas actuales antes de la fecha de inicio
+                for asignacion in (jornada_solicitante, jornada_receptor):
+                    if asignacion.fecha_fin_efectiva >= detalle.fecha_inicio:
+                        asignacion.fecha_fin = detalle.fecha_inicio - timedelta(days=1)
+                        asignacion.save()
+                
+                # 2. Generar en memoria los Turno del periodo (domingos y días especiales se omiten)
+                dias_especiales = self._cargar_dias_especiales(detalle.fecha_inicio, fecha_fin_cambio)
+                turnos = []
+                dias_omitidos = []
+                fecha_actual = detalle.fecha_inicio
+                while fecha_actual <= fecha_fin_cambio:
+                    razon = self._razon_dia_invalido(fecha_actual, dias_especiales)
+                    if razon:
+                        dias_omitidos.append(f"{fecha_actual.strftime('%d/%m/%Y')} ({razon})")
+                    else:
+                        turnos.append(Turno(
+                            explorador_id=solicitud.explorador_solicitante_id,
+                            fecha=fecha_actual,
+                            jornada=jornada_contraria_solicitante,
+                            sala_id=sala_solicitante.sala_id,
+                            tipo_cambio='CT PERMANENTE'
+                        ))
+                        turnos.append(Turno(
+                            explorador_id=solicitud.explorador_receptor_id,
+                            fecha=fecha_actual,
+                            jornada=jornada_contraria_receptor,
+                            sala_id=sala_receptor.sala_id,
+                            tipo_cambio='CT PERMANENTE'
+                        ))
+                    fecha_actual += timedelta(days=1)
+                dias_procesados = len(turnos) // 2
+                
+                # 3. Insertar en lotes, registrando también el historial
+                turnos = bulk_create_with_history(turnos, Turno, batch_size=self.BATCH_SIZE)
+                
+                # bulk_create no dispara señales: sincronizar caché y RosterDia explícitamente
+                for explorador_id in explorador_ids:
+                    JornadaCache.invalidar_explorador(explorador_id)
+                    if RosterService.activo():
+                        RosterService.actualizar_explorador(explorador_id, detalle.fecha_inicio, fecha_fin_cambio)
+                RosterService.marcar_cambio()
+                
+                # 4. Referencias a los turnos creados (el primer día) y estado de la solicitud.
+                # No se necesitan jornadas de retorno: después de fecha_fin_cambio se usa la
+                # jornada predeterminada cuando no hay registros en Turno
+                if turnos:
+                    solicitud.turno_origen, solicitud.turno_destino = turnos[0], turnos[1]
+                solicitud.estado = 'aprobada'
+                solicitud.fecha_resolucion = timezone.now()
                 solicitud.save()
             
-            # 3. No necesitamos jornadas de retorno - la jornada predeterminada se usará automáticamente
-            # después de la fecha_fin_cambio cuando no haya registros en Turno
-            
-            # 4. Actualizar el estado de la solicitud
-            solicitud.estado = 'aprobada'
-            solicitud.fecha_resolucion = timezone.now()
-            solicitud.save()
-            
             # Construir mensaje informativo
             mensaje = f"Cambio permanente aplicado para {dias_procesados} días"
             if dias_omitidos:
@@ -335,29 +322,24 @@ class CTPermanenteStrategy(SolicitudStrategy):
         except Exception:
             return {}
     
-    def _es_festivo(self, fecha):
-        """Verificar si es festivo"""
-        try:
-            from turnos.models import DiaEspecial
-            return DiaEspecial.objects.filter(fecha=fecha, tipo='festivo').exists()
-        except:
-            return False
-
-    def _es_mantenimiento(self, fecha):
-        """Verificar si es día de mantenimiento"""
-        try:
-            from turnos.models import DiaEspecial
-            return DiaEspecial.objects.filter(fecha=fecha, tipo='mantenimiento').exists()
-        except:
-            return False
+    def _cargar_dias_especiales(self, fecha_inicio, fecha_fin):
+        """Tipos de DiaEspecial por fecha para todo el periodo, en una sola consulta"""
+        from collections import defaultdict
+        from turnos.models import DiaEspecial
+        dias = defaultdict(set)
+        for fecha, tipo in DiaEspecial.objects.filter(
+            fecha__gte=fecha_inicio, fecha__lte=fecha_fin, tipo__in=['festivo', 'mantenimiento']
+        ).values_list('fecha', 'tipo'):
+            dias[fecha].add(tipo)
+        return dias
     
-    def _obtener_razon_dia_invalido(self, fecha):
-        """Obtener la razón por la cual un día es inválido"""
+    def _razon_dia_invalido(self, fecha, dias_especiales):
+        """Razón por la cual un día no recibe turno (None si es válido)"""
         if fecha.weekday() == 6:
             return "domingo"
-        elif self._es_festivo(fecha):
+        tipos = dias_especiales.get(fecha, ())
+        if 'festivo' in tipos:
             return "festivo"
-        elif self._es_mantenimiento(fecha):
+        if 'mantenimiento' in tipos:
             return "mantenimiento"
-        else:
-            return "no válido"
+        return None
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class TransporteCorreo:
+    """
+    Conexión de correo compartida por el proceso (una por worker de enviar_correos).
+
+    La sesión autenticada se mantiene abierta entre lotes mientras no supere
+    CORREO_CONEXION_MAX_INACTIVA segundos sin uso; antes de reutilizarla se comprueba con NOOP
+    (solo backends SMTP). Lleva métricas de cuántas sesiones de envío reutilizaron la conexión.
+    """
+
+    _lock = threading.Lock()
+    _conexion = None
+    _ultimo_uso = 0.0
+    _metricas = {'aperturas': 0, 'sesiones': 0, 'reutilizadas': 0, 'mensajes': 0, 'errores': 0}
+
+    @classmethod
+    def _viva(cls):
+        if cls._conexion is None:
+            return False
+        inactiva = time.monotonic() - cls._ultimo_uso
+        if inactiva > getattr(settings, 'CORREO_CONEXION_MAX_INACTIVA', 60):
+            return False
+        smtp = getattr(cls._conexion, 'connection', None)
+        if smtp is None:
+            # Backends sin socket (locmem, consola, archivo)
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    @classmethod
+    def _obtener(cls):
+        """Conexión abierta, reutilizando la anterior si sigue viva"""
+        cls._metricas['sesiones'] += 1
+        if cls._viva():
+            cls._metricas['reutilizadas'] += 1
+            return cls._conexion
+        cls._cerrar()
+        conexion = get_connection(fail_silently=False)
+        conexion.open()
+        cls._conexion = conexion
+        cls._metricas['aperturas'] += 1
+        return conexion
+
+    @classmethod
+    def _cerrar(cls):
+        if cls._conexion is not None:
+            try:
+                cls._conexion.close()
+            except Exception:
+                pass
+            cls._conexion = None
+
+    @classmethod
+    def enviar(cls, mensajes):
+        """
+        Envía los mensajes de un evento en una sesión de la conexión compartida, de a uno, para
+        saber exactamente cuáles salieron. El primer error corta el envío y descarta la conexión
+        para que el siguiente envío abra una nueva.
+
+        Returns:
+            (enviados, error): cuántos mensajes salieron, en orden, y la excepción o None
+        """
+        with cls._lock:
+            enviados = 0
+            try:
+                conexion = cls._obtener()
+                for mensaje in mensajes:
+                    conexion.send_messages([mensaje])
+                    enviados += 1
+            except Exception as e:
+                cls._metricas['errores'] += 1
+                cls._metricas['mensajes'] += enviados
+                cls._cerrar()
+                return enviados, e
+            cls._ultimo_uso = time.monotonic()
+            cls._metricas['mensajes'] += enviados
+            return enviados, None
+
+    @classmethod
+    def cerrar(cls):
+        with cls._lock:
+            cls._cerrar()
+
+    @classmethod
+    def metricas(cls):
+        """Contadores del proceso y tasa de reutilización (sesiones que no abrieron conexión)"""
+        with cls._lock:
+            datos = dict(cls._metricas)
+        datos['tasa_reutilizacion'] = round(datos['reutilizadas'] / datos['sesiones'], 3) if datos['sesiones'] else 0.0
+        return datos
+
+    @classmethod
+    def reiniciar_metricas(cls):
+        with cls._lock:
+            for clave in cls._metricas:
+                cls._metricas[clave] = 0
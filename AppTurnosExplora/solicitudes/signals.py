@@ -0,0 +1,28 @@
+"""
+Señales que mantienen el contador cacheado de notificaciones no leídas.
+
+NotificacionService ajusta el contador directamente (bulk_create y update no emiten
+señales); estas cubren las escrituras por otras vías (admin, shell, scripts). Crear o
+borrar una no leída lo ajusta con incr/decr; otras modificaciones lo descartan para que se
+recalcule. Solo usan destinatario_id: no cargan el destinatario.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from solicitudes.models import Notificacion
+from solicitudes.services.contador_notificaciones import ContadorNotificaciones
+
+
+@receiver(post_save, sender=Notificacion)
+def notificacion_guardada(sender, instance, created, **kwargs):
+    if not created:
+        ContadorNotificaciones.invalidar(instance.destinatario_id)
+    elif not instance.leida:
+        ContadorNotificaciones.ajustar({instance.destinatario_id: 1})
+
+
+@receiver(post_delete, sender=Notificacion)
+def notificacion_borrada(sender, instance, **kwargs):
+    if not instance.leida:
+        ContadorNotificaciones.ajustar({instance.destinatario_id: -1})
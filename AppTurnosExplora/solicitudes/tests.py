@@ -1,3 +1,685 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time as time_module
+from datetime import date, time, timedelta
+from io import StringIO
+from unittest.mock import patch
 
-# Create your tests here.
+from smtplib import SMTPException
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends import locmem
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from empleados.models import CompetenciaEmpleado, Empleado, Jornada, Sala
+from solicitudes.models import (
+    CambioPermanenteDetalle, CorreoPendiente, Notificacion, SolicitudCambio, TipoSolicitudCambio
+)
+from solicitudes.context_processors import notificaciones
+from solicitudes.services.canal_notificaciones import CanalNotificaciones
+from solicitudes.services.contador_notificaciones import ContadorNotificaciones
+from solicitudes.services.correo_service import CorreoService
+from solicitudes.services.notificacion_service import NotificacionService
+from solicitudes.services.transporte_correo import TransporteCorreo
+from solicitudes.services.strategies.ct_permanente_strategy import CTPermanenteStrategy
+from solicitudes.services.solicitud_service import SolicitudService
+from solicitudes.services.solicitud_factory import SolicitudFactory
+from solicitudes.views import SolicitudesPendientesListView
+from turnos.models import AsignarJornadaExplorador, AsignarSalaExplorador, DiaEspecial, Turno
+from turnos.services.roster_service import RosterService
+
+
+class EmpleadosJornadaContrariaTest(TestCase):
+    """El desplegable de compañeros disponibles cuesta un número fijo de consultas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        cls.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        cls.sala = Sala.objects.create(nombre='Acuario')
+        cls.usuario = cls._crear_empleado('solicitante', cls.am)
+
+    @classmethod
+    def _crear_empleado(cls, username, jornada, fecha_inicio=date(2025, 1, 1)):
+        user = User.objects.create(username=username)
+        empleado = Empleado.objects.create(
+            user=user, nombre=username, apellido='Prueba', cedula=username, email=f'{username}@test.com'
+        )
+        AsignarJornadaExplorador.objects.create(explorador=empleado, jornada=jornada, fecha_inicio=fecha_inicio)
+        return empleado
+
+    def _crear_companeros(self, cantidad, fecha_inicio=date(2025, 1, 1)):
+        inicio = Empleado.objects.count()
+        return [
+            self._crear_empleado(f'companero{inicio + i}', self.pm if i % 2 else self.am, fecha_inicio)
+            for i in range(cantidad)
+        ]
+
+    def _contar_consultas(self, fecha):
+        with CaptureQueriesContext(connection) as ctx:
+            SolicitudService.get_empleados_jornada_contraria(fecha, self.usuario)
+        return len(ctx.captured_queries)
+
+    def test_presupuesto_de_consultas_fijo(self):
+        self._crear_companeros(4)
+        base = self._contar_consultas('2025-03-10')
+        self.assertLessEqual(base, 5)
+
+        self._crear_companeros(40)
+        self.assertEqual(self._contar_consultas('2025-03-10'), base)
+
+    def test_devuelve_jornada_contraria_con_cambios_del_dia(self):
+        companeros = self._crear_companeros(6)
+        # Un compañero AM con cambio aprobado a PM ese día también es candidato
+        Turno.objects.create(explorador=companeros[0], fecha=date(2025, 3, 10), jornada=self.pm, sala=self.sala)
+        resultado = SolicitudService.get_empleados_jornada_contraria('2025-03-10', self.usuario)
+        self.assertCountEqual(resultado, companeros[1::2] + [companeros[0]])
+
+    def test_lectura_desde_roster(self):
+        hoy = timezone.now().date()
+        companeros = self._crear_companeros(6, fecha_inicio=hoy - timedelta(days=10))
+        AsignarJornadaExplorador.objects.filter(explorador=self.usuario).update(fecha_inicio=hoy - timedelta(days=10))
+        fecha = str(hoy + timedelta(days=1))
+        with override_settings(TURNOS_ROSTER_ACTIVO=True):
+            RosterService.reconstruir_horizonte()
+            resultado = SolicitudService.get_empleados_jornada_contraria(fecha, self.usuario)
+        self.assertCountEqual(resultado, companeros[1::2])
+
+
+class CTPermanenteAplicarCambiosTest(TestCase):
+    """Aprobar un CT PERMANENTE inserta los Turno en lote, con historial y en una transacción"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        cls.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        cls.sala = Sala.objects.create(nombre='Acuario')
+        cls.tipo = TipoSolicitudCambio.objects.create(nombre='CT PERMANENTE')
+        cls.exploradores = []
+        for i, jornada in enumerate((cls.am, cls.pm)):
+            user = User.objects.create(username=f'permanente{i}')
+            empleado = Empleado.objects.create(
+                user=user, nombre=f'Permanente{i}', apellido='Prueba', cedula=str(5000 + i), email=f'p{i}@test.com'
+            )
+            AsignarJornadaExplorador.objects.create(explorador=empleado, jornada=jornada, fecha_inicio=date(2024, 1, 1))
+            AsignarSalaExplorador.objects.create(explorador=empleado, sala=cls.sala, fecha_inicio=date(2024, 1, 1))
+            cls.exploradores.append(empleado)
+        DiaEspecial.objects.create(fecha=date(2025, 1, 7), tipo='festivo')
+        DiaEspecial.objects.create(fecha=date(2025, 2, 4), tipo='mantenimiento')
+
+    def _aplicar(self):
+        solicitud = SolicitudCambio.objects.create(
+            explorador_solicitante=self.exploradores[0], explorador_receptor=self.exploradores[1],
+            tipo_cambio=self.tipo, fecha_cambio_turno=date(2025, 1, 6)
+        )
+        CambioPermanenteDetalle.objects.create(solicitud=solicitud, fecha_inicio=date(2025, 1, 6))
+        with CaptureQueriesContext(connection) as ctx:
+            exito, mensaje = CTPermanenteStrategy().aplicar_cambios(solicitud)
+        self.assertTrue(exito, mensaje)
+        return solicitud, len(ctx.captured_queries)
+
+    def test_periodo_anual_con_consultas_acotadas(self):
+        solicitud, consultas = self._aplicar()
+        # 360 días hasta fin de año: 51 domingos, un festivo y un día de mantenimiento
+        self.assertEqual(Turno.objects.count(), 2 * (360 - 51 - 2))
+        # Antes: cinco consultas por día del periodo (más de 1500). Ahora solo crece con los lotes del INSERT
+        self.assertLess(consultas, 60)
+        self.assertFalse(Turno.objects.filter(fecha__in=[date(2025, 1, 7), date(2025, 2, 4), date(2025, 1, 12)]).exists())
+        self.assertEqual(Turno.historial.count(), Turno.objects.count())
+
+        solicitud.refresh_from_db()
+        self.assertEqual(solicitud.estado, 'aprobada')
+        self.assertEqual((solicitud.turno_origen.fecha, solicitud.turno_origen.explorador), (date(2025, 1, 6), self.exploradores[0]))
+        self.assertEqual(
+            AsignarJornadaExplorador.objects.get(explorador=self.exploradores[0]).fecha_fin, date(2025, 1, 5)
+        )
+        # La caché de jornadas ve los Turno insertados en lote
+        self.assertEqual(SolicitudService.get_jornada_explorador_fecha(self.exploradores[0].id, '2025-03-10'), self.pm)
+
+
+class BackendQueFalla(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise SMTPException('servidor no disponible')
+
+
+class BackendQueRechaza(locmem.EmailBackend):
+    """Entrega como locmem salvo a rechazado@test.com"""
+
+    def send_messages(self, email_messages):
+        if any('rechazado@test.com' in mensaje.to for mensaje in email_messages):
+            raise SMTPException('destinatario rechazado')
+        return super().send_messages(email_messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class CorreoPendienteTest(TestCase):
+    """Las notificaciones solo encolan; el comando enviar_correos envía y reintenta"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleados = []
+        for i in range(3):
+            user = User.objects.create(username=f'correo{i}')
+            cls.empleados.append(Empleado.objects.create(
+                user=user, nombre=f'Correo{i}', apellido='Prueba', cedula=str(6000 + i), email=f'correo{i}@test.com'
+            ))
+        cls.solicitud = SolicitudCambio.objects.create(
+            explorador_solicitante=cls.empleados[0], explorador_receptor=cls.empleados[1],
+            tipo_cambio=TipoSolicitudCambio.objects.create(nombre='CAMBIO TURNO'), fecha_cambio_turno=date(2025, 3, 10)
+        )
+
+    def setUp(self):
+        # El transporte es por proceso: que cada test abra la conexión de su EMAIL_BACKEND
+        TransporteCorreo.cerrar()
+        TransporteCorreo.reiniciar_metricas()
+
+    def test_notificacion_encola_y_comando_envia(self):
+        NotificacionService.crear_notificacion_cancelacion(self.solicitud)
+        self.assertEqual(len(mail.outbox), 0)
+        correo = CorreoPendiente.objects.get()
+        self.assertEqual(correo.destinatarios, ['correo1@test.com'])
+
+        call_command('enviar_correos', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), ('enviado', 1))
+
+    @override_settings(
+        EMAIL_BACKEND='solicitudes.tests.BackendQueFalla', CORREO_MAX_INTENTOS=2, CORREO_BACKOFF_SEGUNDOS=60
+    )
+    def test_reintento_con_backoff_y_descarte(self):
+        correo = CorreoService.encolar('Asunto', 'Mensaje', ['correo1@test.com'])
+        self.assertEqual(CorreoService.procesar_pendientes(), (0, 1))
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), ('pendiente', 1))
+        self.assertGreater(correo.proximo_intento, timezone.now() + timedelta(seconds=50))
+        # Aún no vence: el lote siguiente no lo toma
+        self.assertEqual(CorreoService.procesar_pendientes(), (0, 0))
+
+        CorreoPendiente.objects.update(proximo_intento=timezone.now())
+        CorreoService.procesar_pendientes()
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), ('fallido', 2))
+        self.assertIn('servidor no disponible', correo.ultimo_error)
+
+    @override_settings(EMAIL_BACKEND='solicitudes.tests.BackendQueRechaza')
+    def test_fallo_a_mitad_de_evento_no_reenvia_los_que_salieron(self):
+        enviado, rechazado, siguiente = CorreoService.encolar_varios([
+            {'asunto': 'Aviso', 'mensaje': 'm', 'destinatarios': [email]}
+            for email in ('correo0@test.com', 'rechazado@test.com', 'correo2@test.com')
+        ], evento='aprobacion:1')
+        self.assertEqual(CorreoService.procesar_pendientes(), (1, 1))
+        for correo in (enviado, rechazado, siguiente):
+            correo.refresh_from_db()
+        self.assertEqual([(c.estado, c.intentos) for c in (enviado, rechazado, siguiente)], [
+            ('enviado', 1), ('pendiente', 1), ('pendiente', 0),
+        ])
+
+        # El siguiente lote solo toma el que no se intentó; el rechazado espera su backoff
+        self.assertEqual(CorreoService.procesar_pendientes(), (1, 0))
+        self.assertEqual([m.to for m in mail.outbox], [['correo0@test.com'], ['correo2@test.com']])
+
+    def test_evento_se_envia_en_una_sesion_y_reutiliza_conexion(self):
+        self.empleados[0].supervisor = self.empleados[2]
+        self.empleados[0].save()
+        solicitud = SolicitudCambio.objects.select_related('explorador_solicitante__supervisor').get(id=self.solicitud.id)
+        NotificacionService.crear_notificacion_solicitud(solicitud)
+        # Supervisor, receptor y solicitante: un solo evento
+        self.assertEqual(CorreoPendiente.objects.values('evento').distinct().count(), 1)
+        self.assertEqual(CorreoService.procesar_pendientes(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+        NotificacionService.crear_notificacion_cancelacion(solicitud)
+        CorreoService.procesar_pendientes()
+        metricas = TransporteCorreo.metricas()
+        self.assertEqual((metricas['aperturas'], metricas['sesiones'], metricas['mensajes']), (1, 2, 4))
+        self.assertEqual(metricas['tasa_reutilizacion'], 0.5)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class NotificarTest(TestCase):
+    """Cada evento carga la solicitud una vez e inserta notificaciones y correos en lote"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.empleados = []
+        for i in range(3):
+            user = User.objects.create(username=f'notificar{i}')
+            cls.empleados.append(Empleado.objects.create(
+                user=user, nombre=f'Notificar{i}', apellido='Prueba', cedula=str(7000 + i), email=f'notificar{i}@test.com'
+            ))
+        cls.solicitante, cls.receptor, cls.supervisor = cls.empleados
+        cls.solicitante.supervisor = cls.supervisor
+        cls.solicitante.save()
+        cls.solicitud = SolicitudCambio.objects.create(
+            explorador_solicitante=cls.solicitante, explorador_receptor=cls.receptor,
+            tipo_cambio=TipoSolicitudCambio.objects.create(nombre='CAMBIO TURNO'), fecha_cambio_turno=date(2025, 3, 10)
+        )
+
+    def test_solicitud_creada_en_consultas_fijas(self):
+        # Carga de la solicitud, un INSERT de notificaciones y uno de correos (más el savepoint)
+        with self.assertNumQueries(5):
+            NotificacionService.notificar('solicitud_creada', self.solicitud)
+        self.assertCountEqual(
+            Notificacion.objects.values_list('destinatario_id', flat=True),
+            [e.id for e in self.empleados]
+        )
+        self.assertCountEqual(
+            [c.destinatarios[0] for c in CorreoPendiente.objects.all()],
+            [e.email for e in self.empleados]
+        )
+
+    def test_filtra_destinatarios_por_rol(self):
+        avisos = NotificacionService.notificar(
+            'aprobacion_receptor', self.solicitud, destinatarios=['supervisor'], actor=self.receptor
+        )
+        self.assertEqual([a.destinatario for a in avisos], [self.supervisor])
+        self.assertEqual(Notificacion.objects.get().destinatario, self.supervisor)
+
+    def test_email_que_no_renderiza_no_impide_notificaciones(self):
+        with self.assertLogs('solicitudes.services.notificacion_service', level='ERROR'):
+            NotificacionService.crear_notificacion_rechazo_receptor(self.solicitud, self.receptor, 'No puedo')
+        self.assertCountEqual(
+            Notificacion.objects.values_list('destinatario_id', flat=True), [self.solicitante.id, self.supervisor.id]
+        )
+        self.assertFalse(CorreoPendiente.objects.exists())
+
+    def test_evento_desconocido(self):
+        with self.assertRaises(ValueError):
+            NotificacionService.notificar('inexistente', self.solicitud)
+
+
+class ContadorNotificacionesTest(TransactionTestCase):
+    """El badge de no leídas sale de un contador cacheado que se mantiene al crear y leer"""
+
+    def setUp(self):
+        cache.clear()
+        empleados = []
+        for i in range(2):
+            user = User.objects.create(username=f'contador{i}')
+            empleados.append(Empleado.objects.create(
+                user=user, nombre=f'Contador{i}', apellido='Prueba', cedula=str(8000 + i), email=f'contador{i}@test.com'
+            ))
+        self.solicitante, self.receptor = empleados
+        self.solicitud = SolicitudCambio.objects.create(
+            explorador_solicitante=self.solicitante, explorador_receptor=self.receptor,
+            tipo_cambio=TipoSolicitudCambio.objects.create(nombre='CAMBIO TURNO'), fecha_cambio_turno=date(2025, 3, 10)
+        )
+
+    def _contador(self, empleado):
+        # El contador cacheado siempre coincide con el COUNT real
+        valor = ContadorNotificaciones.obtener(empleado.id)
+        self.assertEqual(valor, Notificacion.objects.filter(destinatario=empleado, leida=False).count())
+        return valor
+
+    def test_context_processor_sin_consultas_con_contador_en_cache(self):
+        request = RequestFactory().get('/')
+        request.user = self.receptor.user
+        contexto = notificaciones(request)
+        self.assertEqual(contexto['notificaciones_no_leidas_count'](), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(contexto['notificaciones_no_leidas_count'](), 0)
+
+    def test_se_mantiene_al_crear_y_leer(self):
+        self.assertEqual(self._contador(self.receptor), 0)
+        NotificacionService.crear_notificacion_solicitud(self.solicitud)
+        NotificacionService.crear_notificacion_cancelacion(self.solicitud)
+        with self.assertNumQueries(0):
+            self.assertEqual(ContadorNotificaciones.obtener(self.receptor.id), 2)
+        self.assertEqual(self._contador(self.solicitante), 1)
+
+        notificacion = Notificacion.objects.filter(destinatario=self.receptor).first()
+        for _ in range(2):
+            # Marcarla dos veces solo descuenta una
+            self.assertTrue(NotificacionService.marcar_como_leida(notificacion.id, self.receptor))
+        self.assertEqual(self._contador(self.receptor), 1)
+        self.assertFalse(NotificacionService.marcar_como_leida(notificacion.id, self.solicitante))
+
+        self.assertEqual(NotificacionService.marcar_todas_como_leidas(self.receptor), 1)
+        self.assertEqual(self._contador(self.receptor), 0)
+        self.assertEqual(self._contador(self.solicitante), 1)
+
+    def test_escrituras_fuera_del_servicio_ajustan(self):
+        self.assertEqual(self._contador(self.receptor), 0)
+        # Sin cargar el destinatario ni volver a contar: solo el INSERT y el incr
+        with self.assertNumQueries(1):
+            notificacion = Notificacion.objects.create(
+                destinatario_id=self.receptor.id, tipo='aprobacion', titulo='t', mensaje='m'
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(ContadorNotificaciones.obtener(self.receptor.id), 1)
+        notificacion.delete()
+        self.assertEqual(self._contador(self.receptor), 0)
+
+        notificacion = Notificacion.objects.create(destinatario=self.receptor, tipo='aprobacion', titulo='t', mensaje='m')
+        notificacion.leida = True
+        notificacion.save()
+        self.assertEqual(self._contador(self.receptor), 0)
+
+
+@override_settings(NOTIFICACIONES_SSE_ACTIVO=True)
+class NotificacionesStreamTest(TransactionTestCase):
+    """El stream SSE empuja el contador y las notificaciones nuevas a la conexión abierta"""
+
+    def setUp(self):
+        cache.clear()
+        empleados = []
+        for i in range(2):
+            user = User.objects.create(username=f'stream{i}')
+            empleados.append(Empleado.objects.create(
+                user=user, nombre=f'Stream{i}', apellido='Prueba', cedula=str(9000 + i), email=f'stream{i}@test.com'
+            ))
+        self.solicitante, self.receptor = empleados
+        self.solicitud = SolicitudCambio.objects.create(
+            explorador_solicitante=self.solicitante, explorador_receptor=self.receptor,
+            tipo_cambio=TipoSolicitudCambio.objects.create(nombre='CAMBIO TURNO'), fecha_cambio_turno=date(2025, 3, 10)
+        )
+
+    @staticmethod
+    def _leer(bloque):
+        """(event, data) de un bloque SSE"""
+        campos = dict(linea.split(': ', 1) for linea in bloque.decode().strip().splitlines() if ': ' in linea)
+        return campos['event'], json.loads(campos['data'])
+
+    async def test_requiere_autenticacion(self):
+        response = await self.async_client.get(reverse('solicitudes:notificaciones_stream'))
+        self.assertEqual(response.status_code, 401)
+
+    @override_settings(NOTIFICACIONES_SSE_ACTIVO=False)
+    async def test_desactivado_sin_stream_ni_script(self):
+        await self.async_client.aforce_login(self.receptor.user)
+        response = await self.async_client.get(reverse('solicitudes:notificaciones_stream'))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(reverse('solicitudes:notificaciones_list'))
+        self.assertNotContains(response, 'EventSource')
+
+    async def test_empuja_contador_y_notificaciones(self):
+        await self.async_client.aforce_login(self.receptor.user)
+        response = await self.async_client.get(reverse('solicitudes:notificaciones_stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        bloques = asyncio.Queue()
+
+        async def consumir():
+            async for bloque in response.streaming_content:
+                await bloques.put(bloque)
+
+        async def siguiente():
+            return await asyncio.wait_for(bloques.get(), timeout=2)
+
+        conexion = asyncio.create_task(consumir())
+
+        self.assertEqual(self._leer(await siguiente()), ('contador', {'tipo': 'contador', 'delta': 0, 'no_leidas': 0}))
+
+        await sync_to_async(NotificacionService.crear_notificacion_cancelacion)(self.solicitud)
+        evento, contador = self._leer(await siguiente())
+        self.assertEqual((evento, contador['delta'], contador['no_leidas']), ('contador', 1, 1))
+        evento, notificacion = self._leer(await siguiente())
+        self.assertEqual(evento, 'notificacion')
+        self.assertEqual(notificacion['titulo'], 'Solicitud de cambio de turno cancelada')
+
+        # Al desconectarse el cliente, el servidor ASGI cancela la tarea y se libera la suscripción
+        conexion.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await conexion
+        self.assertEqual(CanalNotificaciones.conectados(self.receptor.user_id), 0)
+
+    @override_settings(NOTIFICACIONES_SSE_KEEPALIVE=0.05, NOTIFICACIONES_SSE_DURACION_MAXIMA=0.3)
+    async def test_keepalive_y_cierre(self):
+        await self.async_client.aforce_login(self.receptor.user)
+        response = await self.async_client.get(reverse('solicitudes:notificaciones_stream'))
+        bloques = [bloque async for bloque in response.streaming_content]
+        self.assertIn(b': keepalive\n\n', bloques)
+        self.assertEqual(CanalNotificaciones.conectados(self.receptor.user_id), 0)
+
+
+class AprobacionConcurrenteTest(TransactionTestCase):
+    """Las transiciones de aprobación son compare-and-set: los cambios se aplican una sola vez"""
+
+    def setUp(self):
+        cache.clear()
+        am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        sala = Sala.objects.create(nombre='Acuario')
+        self.tipo = TipoSolicitudCambio.objects.create(nombre='Cambio Turno')
+
+        def empleado(nombre, jornada, supervisor=None):
+            empleado = Empleado.objects.create(
+                user=User.objects.create(username=nombre), nombre=nombre, apellido='Prueba',
+                cedula=nombre, email=f'{nombre}@test.com', supervisor=supervisor,
+            )
+            AsignarJornadaExplorador.objects.create(explorador=empleado, jornada=jornada, fecha_inicio=date(2025, 1, 1))
+            CompetenciaEmpleado.objects.create(empleado=empleado, sala=sala)
+            return empleado
+
+        self.supervisor = empleado('jefe', am)
+        self.solicitante = empleado('solicitante', am, self.supervisor)
+        self.receptor = empleado('receptor', pm, self.supervisor)
+
+    def _solicitud(self, receptor=None):
+        return SolicitudCambio.objects.create(
+            explorador_solicitante=self.solicitante, explorador_receptor=receptor or self.receptor,
+            tipo_cambio=self.tipo, fecha_cambio_turno=date(2025, 3, 10),
+        )
+
+    def test_doble_aprobacion_y_cancelacion_tardia(self):
+        solicitud = self._solicitud()
+        self.assertTrue(SolicitudService.aprobar_solicitud_receptor(solicitud.id, self.receptor)[0])
+        self.assertEqual(
+            SolicitudService.aprobar_solicitud_receptor(solicitud.id, self.receptor),
+            (False, "Ya aprobaste esta solicitud"),
+        )
+        self.assertTrue(SolicitudService.aprobar_solicitud_supervisor(solicitud.id, self.supervisor)[0])
+        self.assertEqual(
+            SolicitudService.aprobar_solicitud_supervisor(solicitud.id, self.supervisor),
+            (False, "Esta solicitud ya fue aprobada"),
+        )
+        self.assertEqual(Turno.objects.filter(fecha=date(2025, 3, 10)).count(), 2)
+
+        # Una instancia leída antes de la aprobación no puede pisar el estado
+        self.assertFalse(SolicitudService.cancelar_solicitud(SolicitudCambio(id=solicitud.id), 'tarde'))
+        solicitud.refresh_from_db()
+        self.assertEqual(solicitud.estado, 'aprobada')
+        self.assertEqual(solicitud.historial.first().estado, 'aprobada')
+
+    def test_aprobar_en_ambos_roles_aplica_una_vez(self):
+        solicitud = self._solicitud(receptor=self.supervisor)
+        self.client.force_login(self.supervisor.user)
+        response = self.client.post(reverse('solicitudes:aprobar_solicitud_ambos', args=[solicitud.id]))
+        self.assertEqual(response.status_code, 200)
+        solicitud.refresh_from_db()
+        self.assertEqual(solicitud.estado, 'aprobada')
+        self.assertEqual(Turno.objects.count(), 2)
+
+    def test_aprobaciones_en_paralelo(self):
+        """Receptor y supervisor, por la web y por el enlace del email, todos a la vez"""
+        for _ in range(3):
+            solicitud = self._solicitud()
+            llamadas = [
+                (SolicitudService.aprobar_solicitud_receptor, self.receptor),
+                (SolicitudService.aprobar_solicitud_supervisor, self.supervisor),
+            ] * 4
+            barrera = threading.Barrier(len(llamadas))
+            resultados = []
+
+            def aprobar(funcion, empleado):
+                try:
+                    barrera.wait()
+                    # SQLite en memoria bloquea la tabla entera y falla en vez de esperar: se
+                    # reintenta como lo haría el usuario. MySQL espera el bloqueo de la fila.
+                    for _ in range(200):
+                        exito, mensaje = funcion(solicitud.id, empleado)
+                        if 'locked' not in mensaje:
+                            break
+                        time_module.sleep(0.005)
+                    resultados.append((exito, mensaje))
+                finally:
+                    connection.close()
+
+            hilos = [threading.Thread(target=aprobar, args=llamada) for llamada in llamadas]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+            solicitud.refresh_from_db()
+            self.assertEqual(solicitud.estado, 'aprobada')
+            # Una aprobación por rol; las demás ven la transición ya hecha
+            self.assertEqual(sorted(m for exito, m in resultados if exito), [
+                'Solicitud aprobada por compañero correctamente', 'Solicitud aprobada por supervisor correctamente',
+            ])
+            self.assertTrue({m for exito, m in resultados if not exito} <= {
+                'Ya aprobaste esta solicitud', 'Esta solicitud ya fue aprobada',
+            })
+            # Los cambios se aplicaron una sola vez
+            self.assertEqual(Turno.objects.filter(fecha=date(2025, 3, 10)).count(), 2)
+            Turno.objects.all().delete()
+
+    def test_fallo_al_aplicar_no_aprueba(self):
+        solicitud = self._solicitud()
+        SolicitudService.aprobar_solicitud_receptor(solicitud.id, self.receptor)
+        notificaciones = Notificacion.objects.count()
+
+        with patch('solicitudes.services.solicitud_factory.SolicitudFactory.aplicar_cambios',
+                   return_value=(False, 'sin jornada')):
+            self.assertEqual(
+                SolicitudService.aprobar_solicitud_supervisor(solicitud.id, self.supervisor),
+                (False, 'No se pudieron aplicar los cambios: sin jornada'),
+            )
+        solicitud.refresh_from_db()
+        self.assertEqual((solicitud.estado, solicitud.aprobado_supervisor), ('pendiente', False))
+        self.assertEqual(Notificacion.objects.count(), notificaciones)
+        # Se puede volver a aprobar
+        self.assertTrue(SolicitudService.aprobar_solicitud_supervisor(solicitud.id, self.supervisor)[0])
+
+    def test_fallo_al_aplicar_en_lote_omite_solo_esa(self):
+        fallida, aprobada = self._solicitud(), self._solicitud()
+        for solicitud in (fallida, aprobada):
+            SolicitudService.aprobar_solicitud_receptor(solicitud.id, self.receptor)
+
+        original = SolicitudFactory.aplicar_cambios
+
+        def aplicar(solicitud):
+            return (False, 'sin jornada') if solicitud.id == fallida.id else original(solicitud)
+
+        with patch('solicitudes.services.solicitud_factory.SolicitudFactory.aplicar_cambios', side_effect=aplicar):
+            resultado = SolicitudService.resolver_lote_supervisor([fallida.id, aprobada.id], self.supervisor, 'aprobar')
+        self.assertEqual(resultado['procesadas'], [aprobada.id])
+        self.assertEqual(resultado['omitidas'], [{'id': fallida.id, 'motivo': 'No se pudieron aplicar los cambios: sin jornada'}])
+        fallida.refresh_from_db()
+        aprobada.refresh_from_db()
+        self.assertEqual((fallida.estado, fallida.aprobado_supervisor), ('pendiente', False))
+        self.assertEqual(aprobada.estado, 'aprobada')
+        Turno.objects.all().delete()
+
+    def test_resolucion_en_lote(self):
+        lista = self._solicitud()
+        SolicitudService.aprobar_solicitud_receptor(lista.id, self.receptor)
+        pendiente = self._solicitud()
+        cancelada = self._solicitud()
+        SolicitudService.cancelar_solicitud(cancelada, 'ya no')
+        ajena = SolicitudCambio.objects.create(
+            explorador_solicitante=self.supervisor, explorador_receptor=self.receptor,
+            tipo_cambio=self.tipo, fecha_cambio_turno=date(2025, 3, 11),
+        )
+        CorreoPendiente.objects.all().delete()
+
+        self.client.force_login(self.supervisor.user)
+        url = reverse('solicitudes:resolver_solicitudes_lote')
+        data = self.client.post(url, {
+            'accion': 'aprobar', 'ids': [lista.id, pendiente.id, cancelada.id, ajena.id, lista.id],
+        }).json()
+        self.assertEqual(data['procesadas'], [lista.id, pendiente.id])
+        self.assertEqual(data['aprobadas'], [lista.id])
+        self.assertEqual(data['omitidas'], [
+            {'id': cancelada.id, 'motivo': 'La solicitud no está pendiente de aprobación'},
+            {'id': ajena.id, 'motivo': 'No tienes permisos para resolver esta solicitud'},
+        ])
+        self.assertEqual(Turno.objects.filter(fecha=date(2025, 3, 10)).count(), 2)
+        self.assertEqual(SolicitudCambio.objects.get(id=pendiente.id).estado, 'pendiente')
+        # Todos los correos del lote forman un solo evento de envío
+        self.assertEqual(len(set(CorreoPendiente.objects.values_list('evento', flat=True))), 1)
+
+        data = self.client.post(url, {'accion': 'rechazar', 'ids': [lista.id, pendiente.id]}).json()
+        self.assertEqual(data['procesadas'], [pendiente.id])
+        self.assertEqual(data['omitidas'], [{'id': lista.id, 'motivo': 'La solicitud no está pendiente de aprobación'}])
+        pendiente.refresh_from_db()
+        self.assertEqual(pendiente.estado, 'rechazada')
+        self.assertEqual(pendiente.historial.first().estado, 'rechazada')
+
+        self.assertEqual(self.client.post(url, {'accion': 'borrar', 'ids': [pendiente.id]}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'accion': 'aprobar', 'ids': ['x']}).status_code, 400)
+
+        # Sin token CSRF no se resuelve nada
+        cliente = Client(enforce_csrf_checks=True)
+        cliente.force_login(self.supervisor.user)
+        self.assertEqual(cliente.post(url, {'accion': 'aprobar', 'ids': [pendiente.id]}).status_code, 403)
+
+class BandejaPendientesTest(TestCase):
+    """La bandeja de aprobaciones calcula el rol en SQL y pagina por cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        def empleado(nombre, supervisor=None):
+            return Empleado.objects.create(
+                user=User.objects.create(username=nombre), nombre=nombre, apellido='Prueba',
+                cedula=nombre, email=f'{nombre}@test.com', supervisor=supervisor,
+            )
+
+        cls.tipo = TipoSolicitudCambio.objects.create(nombre='Cambio Turno')
+        cls.supervisor = empleado('supervisor')
+        cls.ana = empleado('ana', cls.supervisor)
+        cls.beto = empleado('beto', cls.supervisor)
+        cls.externo = empleado('externo')
+
+    def _solicitud(self, solicitante, receptor, **campos):
+        return SolicitudCambio.objects.create(
+            explorador_solicitante=solicitante, explorador_receptor=receptor, tipo_cambio=self.tipo,
+            fecha_cambio_turno=date(2025, 3, 10), estado=campos.pop('estado', 'pendiente'), **campos
+        )
+
+    def test_rol_calculado_en_sql(self):
+        supervisa = self._solicitud(self.ana, self.beto)
+        recibe = self._solicitud(self.externo, self.supervisor)
+        ambos = self._solicitud(self.ana, self.supervisor)
+        self._solicitud(self.beto, self.ana, aprobado_supervisor=True)
+        self._solicitud(self.ana, self.beto, estado='aprobada')
+
+        with self.assertNumQueries(1):
+            roles = {s.id: (s.mi_rol, s.explorador_solicitante.nombre, s.tipo_cambio.nombre)
+                     for s in SolicitudService.get_bandeja_pendientes(self.supervisor)}
+        self.assertEqual(roles, {
+            supervisa.id: ('supervisor', 'ana', 'Cambio Turno'),
+            recibe.id: ('receptor', 'externo', 'Cambio Turno'),
+            ambos.id: ('ambos', 'ana', 'Cambio Turno'),
+        })
+
+    def test_paginas_por_cursor_con_consultas_constantes(self):
+        solicitudes = [self._solicitud(self.ana, self.beto) for _ in range(5)]
+        self.client.force_login(self.supervisor.user)
+        url = reverse('solicitudes:solicitudes_pendientes_list')
+
+        with patch.object(SolicitudesPendientesListView, 'TAMANO_PAGINA', 2):
+            response = self.client.get(url)
+            with CaptureQueriesContext(connection) as primera:
+                self.client.get(url)
+            vistas = [s.id for s in response.context['solicitudes']]
+            while response.context['url_siguiente']:
+                with CaptureQueriesContext(connection) as siguiente:
+                    response = self.client.get(url + response.context['url_siguiente'])
+                self.assertEqual(len(siguiente), len(primera))
+                vistas += [s.id for s in response.context['solicitudes']]
+
+        # Más recientes primero, sin repetir ni saltar ninguna
+        self.assertEqual(vistas, [s.id for s in reversed(solicitudes)])
@@ -4,10 +4,10 @@ from .views import (
     TipoSolicitudCambioUpdateView, TipoSolicitudCambioDeleteView,
     # PermisoDetalleListView, PermisoDetalleCreateView, PermisoDetalleUpdateView, PermisoDetalleDeleteView,  # COMENTADO TEMPORALMENTE
     CambioTurnoInicioView, SolicitarCambioTurnoView, ObtenerEmpleadosDisponiblesView, ObtenerTurnoExploradorView,
-    ProcesarSolicitudView, NotificacionesListView, MarcarNotificacionLeidaView,
+    ProcesarSolicitudView, NotificacionesListView, MarcarNotificacionLeidaView, MarcarTodasNotificacionesLeidasView, NotificacionesStreamView,
     MisSolicitudesListView, SolicitudesPendientesListView, AprobarSolicitudView, RechazarSolicitudView,
     AprobarSolicitudReceptorView, RechazarSolicitudReceptorView, CancelarSolicitudView, NotificacionesSolicitudesView, AprobarSolicitudAmbosView,
-    AprobarSolicitudEmailView, RechazarSolicitudEmailView, AprobarSolicitudReceptorEmailView, RechazarSolicitudReceptorEmailView
+    ResolverSolicitudesLoteView, AprobarSolicitudEmailView, RechazarSolicitudEmailView, AprobarSolicitudReceptorEmailView, RechazarSolicitudReceptorEmailView
 )
 
 app_name = 'solicitudes'
@@ -21,6 +21,8 @@ urlpatterns = [
     # NOTIFICACIONES
     path('notificaciones/', NotificacionesListView.as_view(), name='notificaciones_list'),
     path('notificaciones/<int:notificacion_id>/marcar-leida/', MarcarNotificacionLeidaView.as_view(), name='marcar_notificacion_leida'),
+    path('notificaciones/marcar-todas-leidas/', MarcarTodasNotificacionesLeidasView.as_view(), name='marcar_todas_notificaciones_leidas'),
+    path('notificaciones/stream/', NotificacionesStreamView.as_view(), name='notificaciones_stream'),
     
     # MIS SOLICITUDES
     path('mis-solicitudes/', MisSolicitudesListView.as_view(), name='mis_solicitudes_list'),
@@ -35,6 +37,7 @@ urlpatterns = [
     path('rechazar-solicitud-receptor/<int:solicitud_id>/', RechazarSolicitudReceptorView.as_view(), name='rechazar_solicitud_receptor'),
     path('aprobar-solicitud-ambos/<int:solicitud_id>/', AprobarSolicitudAmbosView.as_view(), name='aprobar_solicitud_ambos'),
     path('cancelar-solicitud/<int:solicitud_id>/', CancelarSolicitudView.as_view(), name='cancelar_solicitud'),
+    path('resolver-solicitudes-lote/', ResolverSolicitudesLoteView.as_view(), name='resolver_solicitudes_lote'),
     
     # CAMBIO DE TURNO
     path('cambio-turno/', CambioTurnoInicioView.as_view(), name='cambio_turno_inicio'),
@@ -2,21 +2,29 @@ from django.shortcuts import render, get_object_or_404
 from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView
 from django.views import View
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.urls import reverse_lazy
 from empleados.views import AdminRequiredMixin
 from empleados.models import Empleado
+from empleados.services.paginacion import PaginacionKeyset
 from .models import TipoSolicitudCambio, Notificacion, SolicitudCambio
 from .services.solicitud_service import SolicitudService
 from .services.solicitud_factory import SolicitudFactory
 from .services.permiso_service import PermisoService
 from .services.notificacion_service import NotificacionService
+from .services.canal_notificaciones import CanalNotificaciones
+from .services.contador_notificaciones import ContadorNotificaciones
 from django.utils import timezone
+from django.conf import settings
+from asgiref.sync import sync_to_async
+import asyncio
 import hashlib
 import hmac
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -49,37 +57,16 @@ class SolicitudesView(LoginRequiredMixin, TemplateView):
             
             # Contar solicitudes pendientes que el usuario puede aprobar
             # Solo receptor y supervisor (NO solicitante)
-            from django.db.models import Q
-            solicitudes_pendientes_count = SolicitudCambio.objects.filter(
-                Q(estado='pendiente', explorador_receptor=self.request.user.empleado, aprobado_receptor=False) |
-                Q(estado='pendiente', explorador_solicitante__supervisor=self.request.user.empleado, aprobado_supervisor=False)
-            ).distinct().count()
-            
-            # Debug: Imprimir información para entender el conteo
-            print(f"DEBUG CONTADOR - Usuario: {self.request.user.empleado.nombre}")
-            print(f"DEBUG CONTADOR - Total pendientes (con distinct): {solicitudes_pendientes_count}")
-            
-            # Debug detallado: Mostrar las solicitudes específicas
-            solicitudes_combined = SolicitudCambio.objects.filter(
-                Q(estado='pendiente', explorador_receptor=self.request.user.empleado, aprobado_receptor=False) |
-                Q(estado='pendiente', explorador_solicitante__supervisor=self.request.user.empleado, aprobado_supervisor=False)
-            ).distinct()
-            
-            print(f"DEBUG DETALLADO - Solicitudes combinadas:")
-            for s in solicitudes_combined:
-                es_receptor = s.explorador_receptor == self.request.user.empleado and not s.aprobado_receptor
-                es_supervisor = s.explorador_solicitante.supervisor == self.request.user.empleado and not s.aprobado_supervisor
-                
-                if es_receptor and es_supervisor:
-                    rol = "AMBOS"
-                elif es_receptor:
-                    rol = "RECEPTOR"
-                elif es_supervisor:
-                    rol = "SUPERVISOR"
-                else:
-                    rol = "DESCONOCIDO"
-                    
-                print(f"  - ID: {s.id}, Solicitante: {s.explorador_solicitante.nombre}, Receptor: {s.explorador_receptor.nombre}, Rol: {rol}, Fecha: {s.fecha_solicitud}")
+            bandeja = SolicitudService.get_bandeja_pendientes(self.request.user.empleado)
+            solicitudes_pendientes_count = bandeja.count()
+            
+            # Diagnóstico del conteo: rol por solicitud, solo con DEBUG habilitado
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Conteo de solicitudes pendientes", extra={
+                    'empleado_id': self.request.user.empleado.id,
+                    'pendientes': solicitudes_pendientes_count,
+                    'roles': dict(bandeja.values_list('id', 'mi_rol')),
+                })
             
             context['mis_solicitudes_count'] = mis_solicitudes_count
             context['solicitudes_pendientes_count'] = solicitudes_pendientes_count
@@ -161,7 +148,7 @@ class SolicitarCambioTurnoView(LoginRequiredMixin, View):
         
         # Si no hay jornadas para mañana, usar una fecha futura
         from turnos.models import AsignarJornadaExplorador
-        if not AsignarJornadaExplorador.objects.filter(fecha_inicio__lte=fecha_por_defecto, fecha_fin__gte=fecha_por_defecto).exists():
+        if not AsignarJornadaExplorador.objects.filter(fecha_inicio__lte=fecha_por_defecto, fecha_fin_efectiva__gte=fecha_por_defecto).exists():
             fecha_por_defecto = timezone.datetime(2025, 8, 25).date()
         
         context = {
@@ -192,7 +179,10 @@ class ObtenerEmpleadosDisponiblesView(LoginRequiredMixin, View):
         fecha = request.GET.get('fecha')
         tipo_solicitud_id = request.GET.get('tipo_solicitud_id')
         
-        print(f"DEBUG: fecha={fecha}, tipo_solicitud_id={tipo_solicitud_id}")
+        logger.debug("Empleados disponibles solicitados", extra={
+            'fecha': fecha,
+            'tipo_id': tipo_solicitud_id
+        })
         
         if not fecha:
             return json_ok({'empleados': []})
@@ -278,11 +268,12 @@ class ProcesarSolicitudView(LoginRequiredMixin, View):
             fecha_solicitud = request.POST.get('fecha_solicitud')
             comentario = request.POST.get('comentarios', '')
             
-            print(f"DEBUG POST: tipo_solicitud_id={tipo_solicitud_id}")
-            print(f"DEBUG POST: empleado_receptor_id={empleado_receptor_id}")
-            print(f"DEBUG POST: fecha_solicitud={fecha_solicitud}")
-            print(f"DEBUG POST: comentario={comentario}")
-            print(f"DEBUG POST: request.POST completo={dict(request.POST)}")
+            logger.debug("Procesando solicitud", extra={
+                'tipo_id': tipo_solicitud_id,
+                'receptor_id': empleado_receptor_id,
+                'fecha_solicitud': fecha_solicitud,
+                'campos': sorted(k for k in request.POST if k != 'csrfmiddlewaretoken'),
+            })
             
             # Validar datos requeridos según el tipo de solicitud
             if tipo_solicitud_id and empleado_receptor_id:
@@ -378,10 +369,8 @@ class ProcesarSolicitudView(LoginRequiredMixin, View):
                 'solicitud_id': solicitud.id
             }, status=201)
             
-        except Exception as e:
-            print(f"ERROR VISTA GENERAL: {e}")
-            import traceback
-            print(f"ERROR VISTA GENERAL: Traceback: {traceback.format_exc()}")
+        except Exception:
+            logger.exception("Error al procesar la solicitud")
             return json_error('Error al procesar la solicitud', status=500, code='internal_error')
 
 class NotificacionesListView(LoginRequiredMixin, ListView):
@@ -401,6 +390,60 @@ class MarcarNotificacionLeidaView(LoginRequiredMixin, View):
             return json_ok({'success': success})
         return json_error('No autorizado', status=403, code='forbidden')
 
+class MarcarTodasNotificacionesLeidasView(LoginRequiredMixin, View):
+    def post(self, request):
+        if hasattr(request.user, 'empleado'):
+            marcadas = NotificacionService.marcar_todas_como_leidas(request.user.empleado)
+            return json_ok({'marcadas': marcadas})
+        return json_error('No autorizado', status=403, code='forbidden')
+
+class NotificacionesStreamView(View):
+    """
+    Server-Sent Events con las notificaciones nuevas y los cambios del contador de no leídas.
+
+    Reemplaza recargar la página para enterarse de notificaciones: el navegador mantiene una
+    conexión (EventSource) que queda ociosa hasta que CanalNotificaciones publica algo para
+    el usuario. Al conectar se envía el contador actual. Cada NOTIFICACIONES_SSE_KEEPALIVE
+    segundos se manda un comentario para que los proxies no corten la conexión, y tras
+    NOTIFICACIONES_SSE_DURACION_MAXIMA se cierra; EventSource reconecta solo.
+
+    Requiere servir la app con ASGI (config/asgi.py): bajo WSGI cada conexión ocuparía un hilo.
+    Por eso solo responde con NOTIFICACIONES_SSE_ACTIVO.
+    """
+
+    async def get(self, request):
+        if not getattr(settings, 'NOTIFICACIONES_SSE_ACTIVO', False):
+            return json_error('Stream de notificaciones desactivado', status=404, code='not_found')
+        user = await request.auser()
+        if not user.is_authenticated:
+            return json_error('No autorizado', status=401, code='unauthorized')
+
+        response = StreamingHttpResponse(self._eventos(user.id), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Sin buffer en nginx
+        return response
+
+    @staticmethod
+    def _formatear(evento):
+        return f"event: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+
+    async def _eventos(self, user_id):
+        keepalive = getattr(settings, 'NOTIFICACIONES_SSE_KEEPALIVE', 25)
+        fin = time.monotonic() + getattr(settings, 'NOTIFICACIONES_SSE_DURACION_MAXIMA', 5 * 60)
+
+        async with CanalNotificaciones.suscripcion(user_id) as cola:
+            # Suscritos antes de leer el contador: ningún cambio posterior se pierde
+            no_leidas = await sync_to_async(ContadorNotificaciones.obtener_de_usuario)(user_id)
+            yield f"retry: 3000\n{self._formatear({'tipo': 'contador', 'delta': 0, 'no_leidas': no_leidas})}"
+
+            while (restante := fin - time.monotonic()) > 0:
+                try:
+                    evento = await asyncio.wait_for(cola.get(), timeout=min(keepalive, restante))
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield self._formatear(evento)
+
 class MisSolicitudesListView(LoginRequiredMixin, ListView):
     """
     Vista para que los empleados vean sus propias solicitudes
@@ -416,61 +459,33 @@ class MisSolicitudesListView(LoginRequiredMixin, ListView):
 
 class SolicitudesPendientesListView(LoginRequiredMixin, ListView):
     """
-    Vista para que los supervisores vean las solicitudes pendientes de sus empleados
+    Bandeja de solicitudes pendientes que el usuario debe aprobar como receptor y/o supervisor.
+    Una consulta por página (rol calculado en SQL) con paginación por cursor.
     """
     model = SolicitudCambio
     template_name = 'solicitudes/solicitudes_pendientes_list.html'
     context_object_name = 'solicitudes'
+    # Orden total para la paginación por cursor (el id desempata)
+    ORDEN = ['-fecha_solicitud', '-id']
+    TAMANO_PAGINA = 50
     
     def get_queryset(self):
         if hasattr(self.request.user, 'empleado'):
-            print(f"DEBUG SOLICITUDES PENDIENTES - Usuario: {self.request.user.empleado.nombre}")
-            
-            # Obtener solicitudes como receptor
-            solicitudes_receptor = SolicitudService.get_solicitudes_por_receptor(self.request.user.empleado)
-            print(f"DEBUG SOLICITUDES PENDIENTES - Solicitudes como receptor: {solicitudes_receptor.count()}")
-            
-            # Obtener solicitudes como supervisor
-            solicitudes_supervisor = SolicitudService.get_solicitudes_por_supervisor(self.request.user.empleado)
-            print(f"DEBUG SOLICITUDES PENDIENTES - Solicitudes como supervisor: {solicitudes_supervisor.count()}")
-            
-            # Combinar ambas querysets (evitar duplicados) respetando flags de aprobación
-            # Solo receptor y supervisor (NO solicitante)
-            from django.db.models import Q
-            solicitudes_combined = SolicitudCambio.objects.filter(
-                (
-                    Q(estado='pendiente', explorador_receptor=self.request.user.empleado, aprobado_receptor=False)
-                ) |
-                (
-                    Q(estado='pendiente', explorador_solicitante__supervisor=self.request.user.empleado, aprobado_supervisor=False)
-                )
-            ).distinct().order_by('-fecha_solicitud')
-            
-            print(f"DEBUG SOLICITUDES PENDIENTES - Total combinado: {solicitudes_combined.count()}")
-            
-            # Debug detallado: Mostrar las solicitudes específicas
-            print(f"DEBUG SOLICITUDES PENDIENTES - Solicitudes como receptor:")
-            for s in solicitudes_receptor:
-                print(f"  - ID: {s.id}, Solicitante: {s.explorador_solicitante.nombre}, Receptor: {s.explorador_receptor.nombre}, Fecha: {s.fecha_solicitud}")
-            
-            print(f"DEBUG SOLICITUDES PENDIENTES - Solicitudes como supervisor:")
-            for s in solicitudes_supervisor:
-                print(f"  - ID: {s.id}, Solicitante: {s.explorador_solicitante.nombre}, Receptor: {s.explorador_receptor.nombre}, Fecha: {s.fecha_solicitud}")
-            
-            # Agregar información del rol a cada solicitud
-            for solicitud in solicitudes_combined:
-                es_receptor = solicitud.explorador_receptor == self.request.user.empleado and not solicitud.aprobado_receptor
-                es_supervisor = solicitud.explorador_solicitante.supervisor == self.request.user.empleado and not solicitud.aprobado_supervisor
-                
-                if es_receptor and es_supervisor:
-                    solicitud.mi_rol = 'ambos'
-                elif es_receptor:
-                    solicitud.mi_rol = 'receptor'
-                elif es_supervisor:
-                    solicitud.mi_rol = 'supervisor'
-            
-            return solicitudes_combined
+            return SolicitudService.get_bandeja_pendientes(self.request.user.empleado)
         return SolicitudCambio.objects.none()
+    
+    def get_context_data(self, **kwargs):
+        pagina = PaginacionKeyset.paginar(
+            self.object_list,
+            self.ORDEN,
+            self.TAMANO_PAGINA,
+            despues=self.request.GET.get('despues'),
+            antes=self.request.GET.get('antes'),
+        )
+        context = super().get_context_data(object_list=pagina.elementos, **kwargs)
+        context['url_siguiente'] = PaginacionKeyset.url(self.request, 'despues', pagina.siguiente)
+        context['url_anterior'] = PaginacionKeyset.url(self.request, 'antes', pagina.anterior)
+        return context
 
 @method_decorator(csrf_exempt, name='dispatch')
 class AprobarSolicitudView(LoginRequiredMixin, View):
@@ -560,15 +575,10 @@ class CancelarSolicitudView(LoginRequiredMixin, View):
             if solicitud.estado != 'pendiente':
                 return json_error('Solo se pueden cancelar solicitudes pendientes', status=400, code='invalid_state')
             
-            # Cancelar la solicitud
-            solicitud.estado = 'cancelada'
-            solicitud.fecha_resolucion = timezone.now()
-            solicitud.comentario = f"{solicitud.comentario or ''}\n\nCancelada por el solicitante"
-            solicitud.save()
-            
-            # Crear notificación de cancelación
-            from .services.notificacion_service import NotificacionService
-            NotificacionService.crear_notificacion_cancelacion(solicitud)
+            # Cancelar la solicitud (y notificar) solo si nadie la resolvió mientras tanto
+            comentario = f"{solicitud.comentario or ''}\n\nCancelada por el solicitante"
+            if not SolicitudService.cancelar_solicitud(solicitud, comentario):
+                return json_error('Solo se pueden cancelar solicitudes pendientes', status=400, code='invalid_state')
             
             return json_ok({'message': 'Solicitud cancelada correctamente'})
             
@@ -603,25 +613,52 @@ class AprobarSolicitudAmbosView(LoginRequiredMixin, View):
             if solicitud.estado != 'pendiente':
                 return json_error('La solicitud no está pendiente', status=400, code='invalid_state')
 
-            # Aprobar primero como receptor si falta
-            if not solicitud.aprobado_receptor:
-                SolicitudService.aprobar_solicitud_receptor(solicitud_id, empleado, 'Aprobado como receptor (acción combinada)')
-
-            # Aprobar como supervisor si falta
-            if not solicitud.aprobado_supervisor:
-                SolicitudService.aprobar_solicitud_supervisor(solicitud_id, empleado, 'Aprobado como supervisor (acción combinada)')
-
-            # Aplicar los cambios usando el Factory (ya que ambos roles están aprobados)
-            from .services.solicitud_factory import SolicitudFactory
-            success, message = SolicitudFactory.aplicar_cambios(solicitud)
+            # Marca las dos aprobaciones y aplica los cambios una sola vez
+            success, message = SolicitudService.aprobar_solicitud_ambos(
+                solicitud_id, empleado, 'Aprobado como receptor y supervisor (acción combinada)'
+            )
             if not success:
-                logger.error(f"Error aplicando cambios en ambos roles: {message}")
+                return json_error(message, status=400, code='invalid_state')
 
             return json_ok({'message': 'Solicitud aprobada en ambos roles correctamente'})
         except Exception:
             logger.exception('Error en AprobarSolicitudAmbosView')
             return json_error('Error al aprobar en ambos roles', status=500, code='internal_error')
 
+class ResolverSolicitudesLoteView(LoginRequiredMixin, View):
+    """
+    Aprueba o rechaza como supervisor varias solicitudes en una sola petición
+    (POST: ids repetido, accion 'aprobar' o 'rechazar', comentario_respuesta opcional).
+    Con protección CSRF: el cliente envía el token en la cabecera X-CSRFToken.
+    """
+    def post(self, request):
+        if not hasattr(request.user, 'empleado'):
+            return json_error('Usuario no tiene empleado asociado', status=403, code='forbidden')
+
+        accion = request.POST.get('accion')
+        if accion not in ('aprobar', 'rechazar'):
+            return json_error('Acción no válida', status=400, code='invalid_action')
+        try:
+            solicitud_ids = [int(solicitud_id) for solicitud_id in request.POST.getlist('ids')]
+        except ValueError:
+            return json_error('Identificadores de solicitud no válidos', status=400, code='invalid_ids')
+        if not solicitud_ids:
+            return json_error('Faltan parámetros requeridos', status=400, code='missing_params')
+        if len(solicitud_ids) > SolicitudService.MAXIMO_LOTE:
+            return json_error(
+                f'Se pueden resolver hasta {SolicitudService.MAXIMO_LOTE} solicitudes por vez',
+                status=400, code='too_many'
+            )
+
+        try:
+            resultado = SolicitudService.resolver_lote_supervisor(
+                solicitud_ids, request.user.empleado, accion, request.POST.get('comentario_respuesta', '')
+            )
+        except Exception:
+            logger.exception('Error en ResolverSolicitudesLoteView')
+            return json_error('Error al resolver las solicitudes', status=500, code='internal_error')
+        return json_ok(resultado)
+
 class NotificacionesSolicitudesView(LoginRequiredMixin, TemplateView):
     """
     Vista inteligente para mostrar notificaciones y solicitudes
@@ -49,20 +49,12 @@ def test_email_from_user():
         # 4. Probar envío de emails
         print(f"\n📧 Probando envío de emails desde {luisa.email}...")
         
-        # Email al receptor
-        print("   - Enviando email al receptor...")
-        NotificacionService._enviar_email_receptor(solicitud)
-        
-        # Email al supervisor (si existe)
-        if luisa.supervisor:
-            print("   - Enviando email al supervisor...")
-            NotificacionService._enviar_email_supervisor(solicitud)
-        else:
-            print("   - No hay supervisor asignado")
-        
-        # Email de confirmación al solicitante
-        print("   - Enviando email de confirmación al solicitante...")
-        NotificacionService._enviar_email_solicitante(solicitud)
+        # Emails al receptor, al supervisor (si existe) y confirmación al solicitante
+        print("   - Encolando emails de la solicitud...")
+        avisos = NotificacionService.notificar('solicitud_creada', solicitud)
+        for aviso in avisos:
+            print(f"   - {aviso.rol}: {aviso.destinatario.email}")
+        print("   - Ejecuta 'python manage.py enviar_correos' para enviarlos")
         
         print(f"\n✅ Prueba completada. Verifica los emails recibidos.")
         print(f"   Los emails deberían aparecer como enviados desde: {luisa.email}")
@@ -0,0 +1,49 @@
+from datetime import datetime
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from turnos.models import AsignarJornadaExplorador, AsignarSalaExplorador
+
+
+class Command(BaseCommand):
+    help = ('Compara el plan (EXPLAIN) y el tiempo de "asignación vigente en una fecha" con el filtro '
+            'fecha_fin IS NULL OR fecha_fin >= X frente a la columna fecha_fin_efectiva')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', help='Fecha a consultar YYYY-MM-DD (por defecto hoy)')
+        parser.add_argument('--repeticiones', type=int, default=200, help='Ejecuciones por consulta')
+
+    def handle(self, *args, **options):
+        fecha = timezone.now().date()
+        if options['fecha']:
+            try:
+                fecha = datetime.strptime(options['fecha'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('La fecha debe tener formato YYYY-MM-DD')
+
+        for modelo in (AsignarJornadaExplorador, AsignarSalaExplorador):
+            explorador_id = modelo.objects.values_list('explorador_id', flat=True).first()
+            if explorador_id is None:
+                self.stdout.write(f'{modelo.__name__}: sin datos (sembrar antes la base de datos)')
+                continue
+
+            base = modelo.objects.filter(explorador_id=explorador_id, fecha_inicio__lte=fecha)
+            consultas = {
+                'fecha_fin IS NULL OR >=': base.filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=fecha)),
+                'fecha_fin_efectiva >=': base.filter(fecha_fin_efectiva__gte=fecha),
+            }
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{modelo.__name__} ({modelo.objects.count()} filas), explorador {explorador_id}, {fecha}'
+            ))
+            for nombre, queryset in consultas.items():
+                queryset = queryset.order_by('-fecha_inicio')
+                inicio = perf_counter()
+                for _ in range(options['repeticiones']):
+                    queryset.first()
+                promedio_ms = (perf_counter() - inicio) * 1000 / options['repeticiones']
+                self.stdout.write(f'  {nombre}: {promedio_ms:.3f} ms/consulta')
+                for linea in queryset[:1].explain().splitlines():
+                    self.stdout.write(f'    {linea}')
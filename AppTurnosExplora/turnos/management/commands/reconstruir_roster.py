@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from turnos.services.roster_service import RosterService
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye la tabla RosterDia para un rango de fechas (por defecto, el horizonte móvil)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Fecha inicial YYYY-MM-DD')
+        parser.add_argument('--hasta', help='Fecha final YYYY-MM-DD')
+        parser.add_argument('--explorador', type=int, action='append', dest='exploradores',
+                            help='Id de explorador a reconstruir (se puede repetir)')
+
+    def handle(self, *args, **options):
+        desde, hasta = RosterService.get_horizonte()
+        try:
+            if options['desde']:
+                desde = datetime.strptime(options['desde'], '%Y-%m-%d').date()
+            if options['hasta']:
+                hasta = datetime.strptime(options['hasta'], '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError('Las fechas deben tener formato YYYY-MM-DD')
+        if hasta < desde:
+            raise CommandError('--hasta debe ser posterior a --desde')
+
+        if not (options['desde'] or options['hasta'] or options['exploradores']):
+            # El horizonte completo también queda registrado para las lecturas
+            filas = RosterService.reconstruir_horizonte()
+        else:
+            filas = RosterService.reconstruir(desde, hasta, options['exploradores'])
+        self.stdout.write(self.style.SUCCESS(f'RosterDia reconstruido del {desde} al {hasta}: {filas} filas'))
@@ -0,0 +1,361 @@
+import bisect
+import random
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from empleados.models import CompetenciaEmpleado, Empleado, EmpleadoRole, Jornada, Role, Sala, TerminoBusquedaEmpleado
+from empleados.services.busqueda_empleados import BusquedaEmpleados
+from permisos.models import PDH
+from solicitudes.models import (
+    CambioPermanenteDetalle, DobladaDetalle, Notificacion, SolicitudCambio, TipoSolicitudCambio
+)
+from turnos.models import AsignarJornadaExplorador, AsignarSalaExplorador, DiaEspecial, RosterDia, Turno
+from turnos.services.roster_service import RosterService
+
+# Todo lo sembrado se reconoce por este prefijo (usuarios) o marca (días especiales) para --limpiar
+PREFIJO = 'carga_'
+MARCA_DIA_ESPECIAL = '[carga]'
+
+NOMBRES = ['José', 'María', 'Ángela', 'Andrés', 'Sofía', 'Martín', 'Lucía', 'Tomás', 'Inés', 'Ramón',
+           'Begoña', 'Joaquín', 'Noemí', 'Raúl', 'Verónica', 'Iñaki', 'Mónica', 'Héctor', 'Valentina', 'Óscar']
+APELLIDOS = ['Gómez', 'Pérez', 'Núñez', 'Ibáñez', 'Muñoz', 'Rodríguez', 'Martínez', 'Sánchez', 'López',
+             'Fernández', 'Peña', 'Álvarez', 'Díaz', 'Jiménez', 'Castañeda', 'Quiñones', 'Ordóñez', 'Beltrán']
+SALAS = ['Acuario', 'Planetario', 'Ciencia', 'Dinosaurios', 'Cuerpo Humano', 'Energía', 'Robótica', 'Ecosistemas']
+TIPOS_SOLICITUD = ['Cambio Turno', 'DOBLADA', 'D FDS']
+FERIADOS = [(1, 1), (5, 1), (5, 24), (8, 10), (11, 2), (11, 3), (12, 25)]
+# Reparto de estados de las solicitudes; las pendientes se concentran en el último mes
+ESTADOS = {'pendiente': 15, 'aprobada': 50, 'rechazada': 20, 'cancelada': 10, 'pagada': 5}
+
+
+class Command(BaseCommand):
+    help = ('Genera datos sintéticos a escala (exploradores, asignaciones, turnos, días especiales, '
+            'solicitudes y notificaciones) con inserciones masivas, para medir rendimiento')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exploradores', type=int, default=500)
+        parser.add_argument('--supervisores', type=int, help='Por defecto uno cada 20 exploradores')
+        parser.add_argument('--anios', type=int, default=2, help='Años de historia de asignaciones y turnos')
+        parser.add_argument('--densidad-turnos', type=float, default=0.1,
+                            help='Fracción de días de cada explorador con un Turno (cambio) registrado')
+        parser.add_argument('--solicitudes', type=int, default=20000)
+        parser.add_argument('--hasta', help='Último día de la historia YYYY-MM-DD (por defecto hoy)')
+        parser.add_argument('--semilla', type=int, default=42, help='Misma semilla y --hasta, mismos datos')
+        parser.add_argument('--lote', type=int, default=2000, help='Filas por INSERT')
+        parser.add_argument('--limpiar', action='store_true', help='Borra los datos sembrados antes de generar')
+        parser.add_argument('--solo-limpiar', action='store_true', help='Borra los datos sembrados y termina')
+        parser.add_argument('--sin-roster', action='store_true', help='No reconstruir RosterDia al terminar')
+
+    def handle(self, *args, **options):
+        try:
+            hasta = (datetime.strptime(options['hasta'], '%Y-%m-%d').date()
+                     if options['hasta'] else timezone.now().date())
+        except ValueError:
+            raise CommandError('La fecha debe tener formato YYYY-MM-DD')
+        if options['exploradores'] < 2:
+            raise CommandError('Se necesitan al menos 2 exploradores')
+
+        self.lote = options['lote']
+        if options['limpiar'] or options['solo_limpiar']:
+            self._etapa('Datos anteriores borrados', self._limpiar)
+            if options['solo_limpiar']:
+                return
+        elif User.objects.filter(username__startswith=PREFIJO).exists():
+            raise CommandError('Ya hay datos sembrados; usar --limpiar para regenerarlos')
+
+        self.azar = random.Random(options['semilla'])
+        self.hasta = hasta
+        self.desde = hasta - timedelta(days=365 * options['anios'])
+
+        with transaction.atomic():
+            self._etapa('Catálogos', self._catalogos)
+            self._etapa('Empleados', self._empleados, options['exploradores'],
+                        options['supervisores'] or max(1, options['exploradores'] // 20))
+            self._etapa('Asignaciones de jornada y sala', self._asignaciones)
+            self._etapa('Turnos', self._turnos, options['densidad_turnos'])
+            self._etapa('Días especiales', self._dias_especiales)
+            self._etapa('Solicitudes', self._solicitudes, options['solicitudes'])
+            self._etapa('Notificaciones', self._notificaciones)
+            self._etapa('Índice de búsqueda', BusquedaEmpleados.indexar,
+                        Empleado.objects.filter(id__in=self.empleado_ids).only('id', 'nombre', 'apellido', 'cedula'))
+            if not options['sin_roster']:
+                self._etapa('RosterDia', RosterService.reconstruir_horizonte)
+            # bulk_create no dispara señales: los calendarios deben dejar de responder 304
+            RosterService.marcar_cambio()
+
+    def _etapa(self, nombre, funcion, *args):
+        inicio = perf_counter()
+        resultado = funcion(*args)
+        detalle = f' ({resultado} filas)' if isinstance(resultado, int) else ''
+        self.stdout.write(f'{nombre}{detalle}: {perf_counter() - inicio:.1f} s')
+        return resultado
+
+    def _insertar(self, modelo, filas):
+        modelo.objects.bulk_create(filas, batch_size=self.lote)
+        return len(filas)
+
+    def _fechar(self, modelo, campo, ids, valores):
+        """
+        Asigna `valores` a un campo auto_now_add (que bulk_create pisa con la hora actual).
+        bulk_update arma un CASE por lote, cuyo costo crece con el cuadrado del lote: se usan lotes chicos.
+        """
+        modelo.objects.bulk_update(
+            [modelo(**{'id': id_, campo: valor}) for id_, valor in zip(ids, valores)], [campo],
+            batch_size=min(self.lote, 250),
+        )
+
+    def _lotes(self, ids):
+        for inicio in range(0, len(ids), self.lote):
+            yield ids[inicio:inicio + self.lote]
+
+    def _borrar(self, modelo, ids):
+        """
+        DELETE directo por lotes de ids, sin señales ni cascada: el orden de _limpiar ya deja
+        sin referencias cada tabla antes de borrarla
+        """
+        tabla = connection.ops.quote_name(modelo._meta.db_table)
+        columna = connection.ops.quote_name(modelo._meta.pk.column)
+        borradas = 0
+        with connection.cursor() as cursor:
+            for lote in self._lotes(ids):
+                cursor.execute(f'DELETE FROM {tabla} WHERE {columna} IN ({", ".join(["%s"] * len(lote))})', lote)
+                borradas += cursor.rowcount
+        return borradas
+
+    def _limpiar(self):
+        """
+        Borra lo sembrado. Las tablas grandes se borran con un DELETE por tabla: en cascada,
+        cada fila pasaría por sus señales (RosterDia se recalcularía turno por turno, y el
+        historial escribiría una fila por solicitud). Lo demás sigue la cascada normal.
+
+        Los ids se leen antes de escribir: MySQL no acepta un UPDATE o DELETE con una subconsulta
+        sobre la misma tabla (error 1093).
+        """
+        empleados = Empleado.objects.filter(user__username__startswith=PREFIJO).values('id')
+        turno_ids = list(Turno.objects.filter(explorador__in=empleados).values_list('id', flat=True))
+        solicitud_ids = list(SolicitudCambio.objects.filter(
+            Q(explorador_solicitante__in=empleados) | Q(explorador_receptor__in=empleados)
+        ).values_list('id', flat=True))
+
+        notificacion_ids = set(Notificacion.objects.filter(destinatario__in=empleados).values_list('id', flat=True))
+        for lote in self._lotes(solicitud_ids):
+            for modelo in (PDH, CambioPermanenteDetalle, DobladaDetalle):
+                modelo.objects.filter(solicitud__in=lote).delete()
+            SolicitudCambio.objects.filter(solicitud_origen__in=lote).update(solicitud_origen=None)
+            notificacion_ids.update(Notificacion.objects.filter(solicitud__in=lote).values_list('id', flat=True))
+        for lote in self._lotes(turno_ids):
+            SolicitudCambio.objects.filter(turno_origen__in=lote).update(turno_origen=None)
+            SolicitudCambio.objects.filter(turno_destino__in=lote).update(turno_destino=None)
+
+        borradas = self._borrar(Notificacion, sorted(notificacion_ids))
+        borradas += self._borrar(SolicitudCambio, solicitud_ids)
+        for modelo, campo in (
+            (RosterDia, 'explorador'),
+            (TerminoBusquedaEmpleado, 'empleado'),
+            (Turno, 'explorador'),
+            (AsignarJornadaExplorador, 'explorador'),
+            (AsignarSalaExplorador, 'explorador'),
+        ):
+            ids = list(modelo.objects.filter(**{f'{campo}__in': empleados}).values_list('id', flat=True))
+            borradas += self._borrar(modelo, ids)
+        DiaEspecial.objects.filter(descripcion__startswith=MARCA_DIA_ESPECIAL).delete()
+        return borradas + User.objects.filter(username__startswith=PREFIJO).delete()[0]
+
+    def _catalogos(self):
+        self.jornadas = [
+            Jornada.objects.get_or_create(nombre='AM', defaults={'hora_inicio': time(8, 0), 'hora_fin': time(14, 0)})[0],
+            Jornada.objects.get_or_create(nombre='PM', defaults={'hora_inicio': time(14, 0), 'hora_fin': time(20, 0)})[0],
+        ]
+        self.sala_ids = [Sala.objects.get_or_create(nombre=nombre)[0].id for nombre in SALAS]
+        self.rol_explorador = Role.objects.get_or_create(nombre='Explorador')[0]
+        self.rol_supervisor = Role.objects.get_or_create(nombre='Supervisor')[0]
+        self.tipo_ids = [TipoSolicitudCambio.objects.get_or_create(nombre=nombre)[0].id for nombre in TIPOS_SOLICITUD]
+
+    def _empleados(self, cantidad, supervisores):
+        total = supervisores + cantidad
+        self._insertar(User, [User(username=f'{PREFIJO}{i:05d}', password='!') for i in range(total)])
+        # bulk_create no devuelve ids en MySQL: se releen por clave natural
+        user_ids = dict(User.objects.filter(username__startswith=PREFIJO).values_list('username', 'id'))
+
+        def empleado(i, supervisor_id=None):
+            return Empleado(
+                user_id=user_ids[f'{PREFIJO}{i:05d}'],
+                nombre=self.azar.choice(NOMBRES),
+                apellido=f'{self.azar.choice(APELLIDOS)} {self.azar.choice(APELLIDOS)}',
+                cedula=f'L{i:09d}',
+                email=f'{PREFIJO}{i:05d}@example.com',
+                supervisor_id=supervisor_id,
+            )
+
+        self._insertar(Empleado, [empleado(i) for i in range(supervisores)])
+        ids = self._releer_empleados()
+        self.supervisor_ids = list(ids.values())
+        self._insertar(Empleado, [
+            empleado(i, self.supervisor_ids[i % supervisores]) for i in range(supervisores, total)
+        ])
+        ids = self._releer_empleados()
+        self.empleado_ids = list(ids.values())
+        supervisores_set = set(self.supervisor_ids)
+        self.explorador_ids = [id_ for id_ in self.empleado_ids if id_ not in supervisores_set]
+        self.supervisor_de = dict(
+            Empleado.objects.filter(id__in=self.explorador_ids).values_list('id', 'supervisor_id')
+        )
+
+        self._insertar(EmpleadoRole, [
+            EmpleadoRole(empleado_id=id_, role=self.rol_supervisor if id_ in supervisores_set else self.rol_explorador)
+            for id_ in self.empleado_ids
+        ])
+        self._insertar(CompetenciaEmpleado, [
+            CompetenciaEmpleado(empleado_id=id_, sala_id=sala_id)
+            for id_ in self.empleado_ids
+            for sala_id in self.azar.sample(self.sala_ids, 2)
+        ])
+        return total
+
+    def _releer_empleados(self):
+        return dict(Empleado.objects.filter(user__username__startswith=PREFIJO)
+                    .order_by('cedula').values_list('cedula', 'id'))
+
+    def _intervalos(self, dias_min, dias_max):
+        """Intervalos consecutivos [inicio, fin] que cubren la historia; el último queda abierto"""
+        intervalos = []
+        inicio = self.desde
+        while True:
+            fin = inicio + timedelta(days=self.azar.randint(dias_min, dias_max))
+            if fin >= self.hasta:
+                intervalos.append((inicio, None))
+                return intervalos
+            intervalos.append((inicio, fin))
+            inicio = fin + timedelta(days=1)
+
+    def _asignaciones(self):
+        jornadas, salas = [], []
+        # {explorador: ([inicios], [jornada])} para resolver la jornada oficial de un día en _turnos
+        self.jornada_oficial = {}
+        for id_ in self.empleado_ids:
+            actual = self.azar.randrange(2)
+            inicios, nombres = [], []
+            for inicio, fin in self._intervalos(60, 240):
+                actual = 1 - actual
+                jornadas.append(AsignarJornadaExplorador(
+                    explorador_id=id_, jornada=self.jornadas[actual], fecha_inicio=inicio, fecha_fin=fin
+                ))
+                inicios.append(inicio)
+                nombres.append(actual)
+            self.jornada_oficial[id_] = (inicios, nombres)
+            for inicio, fin in self._intervalos(90, 365):
+                salas.append(AsignarSalaExplorador(
+                    explorador_id=id_, sala_id=self.azar.choice(self.sala_ids), fecha_inicio=inicio, fecha_fin=fin
+                ))
+        return self._insertar(AsignarJornadaExplorador, jornadas) + self._insertar(AsignarSalaExplorador, salas)
+
+    def _turnos(self, densidad):
+        """Cambios puntuales: el explorador trabaja ese día en la jornada contraria a la oficial"""
+        dias = (self.hasta - self.desde).days + 1
+        por_explorador = min(dias, round(dias * densidad))
+        turnos = []
+        for id_ in self.explorador_ids:
+            inicios, nombres = self.jornada_oficial[id_]
+            for desplazamiento in sorted(self.azar.sample(range(dias), por_explorador)):
+                fecha = self.desde + timedelta(days=desplazamiento)
+                oficial = nombres[bisect.bisect_right(inicios, fecha) - 1]
+                turnos.append(Turno(
+                    explorador_id=id_, fecha=fecha, jornada=self.jornadas[1 - oficial],
+                    sala_id=self.azar.choice(self.sala_ids), tipo_cambio='Cambio Turno',
+                ))
+        return self._insertar(Turno, turnos)
+
+    def _dias_especiales(self):
+        dias = []
+        for anio in range(self.desde.year, self.hasta.year + 1):
+            for mes, dia in FERIADOS:
+                dias.append(DiaEspecial(
+                    fecha=date(anio, mes, dia), tipo='Feriado',
+                    descripcion=f'{MARCA_DIA_ESPECIAL} Feriado', recurrente=True,
+                ))
+            for _ in range(6):
+                dias.append(DiaEspecial(
+                    fecha=date(anio, self.azar.randint(1, 12), self.azar.randint(1, 28)),
+                    tipo=self.azar.choice(['Evento', 'Mantenimiento', 'Cierre']),
+                    descripcion=f'{MARCA_DIA_ESPECIAL} Día especial',
+                ))
+        return self._insertar(DiaEspecial, dias)
+
+    def _momento(self, desde, hasta):
+        """Fecha y hora aleatoria entre dos fechas, en horario laboral"""
+        dia = desde + timedelta(days=self.azar.randint(0, max(0, (hasta - desde).days)))
+        return timezone.make_aware(datetime.combine(dia, time(self.azar.randint(8, 19), self.azar.randint(0, 59))))
+
+    def _solicitudes(self, cantidad):
+        estados = self.azar.choices(list(ESTADOS), weights=list(ESTADOS.values()), k=cantidad)
+        solicitudes, fechas = [], []
+        reciente = max(self.desde, self.hasta - timedelta(days=30))
+        limite = timezone.make_aware(datetime.combine(self.hasta, time(23, 59)))
+        for estado in estados:
+            solicitante, receptor = self.azar.sample(self.explorador_ids, 2)
+            creada = self._momento(reciente if estado == 'pendiente' else self.desde, self.hasta)
+            resuelta = min(creada + timedelta(hours=self.azar.randint(1, 72)), limite)
+            aprobada = estado in ('aprobada', 'pagada')
+            receptor_aprobo = aprobada or (estado != 'cancelada' and self.azar.random() < 0.4)
+            solicitudes.append(SolicitudCambio(
+                explorador_solicitante_id=solicitante,
+                explorador_receptor_id=receptor,
+                tipo_cambio_id=self.azar.choice(self.tipo_ids),
+                estado=estado,
+                fecha_cambio_turno=creada.date() + timedelta(days=self.azar.randint(1, 30)),
+                fecha_resolucion=None if estado == 'pendiente' else resuelta,
+                comentario='Solicitud generada por seed_load',
+                aprobado_receptor=receptor_aprobo,
+                fecha_aprobacion_receptor=resuelta if receptor_aprobo else None,
+                aprobado_supervisor=aprobada,
+                fecha_aprobacion_supervisor=resuelta if aprobada else None,
+            ))
+            fechas.append(creada)
+        self._insertar(SolicitudCambio, solicitudes)
+        ids = list(SolicitudCambio.objects.filter(explorador_solicitante_id__in=self.explorador_ids)
+                   .order_by('id').values_list('id', flat=True))
+        self._fechar(SolicitudCambio, 'fecha_solicitud', ids, fechas)
+        return len(ids)
+
+    def _notificaciones(self):
+        """Aviso al receptor y al supervisor por solicitud, y la respuesta al solicitante si se resolvió"""
+        notificaciones = []
+
+        def avisar(destinatario, tipo, titulo, solicitud, fecha, leida):
+            notificaciones.append(Notificacion(
+                destinatario_id=destinatario, tipo=tipo, titulo=titulo, solicitud_id=solicitud['id'],
+                mensaje=f"{titulo} para el {solicitud['fecha_cambio_turno']}",
+                leida=leida, fecha_lectura=fecha + timedelta(hours=2) if leida else None,
+            ))
+
+        solicitudes = (
+            SolicitudCambio.objects.filter(explorador_solicitante_id__in=self.explorador_ids).order_by('id')
+            .values('id', 'explorador_solicitante_id', 'explorador_receptor_id', 'estado',
+                    'fecha_solicitud', 'fecha_resolucion', 'fecha_cambio_turno')
+        )
+        for solicitud in solicitudes.iterator(chunk_size=self.lote):
+            pendiente = solicitud['estado'] == 'pendiente'
+            creada = solicitud['fecha_solicitud']
+            avisar(solicitud['explorador_receptor_id'], 'solicitud_cambio', 'Nueva solicitud de cambio de turno',
+                   solicitud, creada, not pendiente or self.azar.random() < 0.3)
+            avisar(self.supervisor_de[solicitud['explorador_solicitante_id']], 'solicitud_cambio',
+                   'Solicitud pendiente de aprobación', solicitud, creada, not pendiente or self.azar.random() < 0.3)
+            if solicitud['estado'] in ('aprobada', 'pagada', 'rechazada'):
+                aprobada = solicitud['estado'] != 'rechazada'
+                avisar(solicitud['explorador_solicitante_id'], 'aprobacion' if aprobada else 'rechazo',
+                       'Solicitud aprobada' if aprobada else 'Solicitud rechazada',
+                       solicitud, solicitud['fecha_resolucion'], self.azar.random() < 0.8)
+
+        self._insertar(Notificacion, notificaciones)
+        # fecha_creacion (auto_now_add) se toma de la solicitud con dos UPDATE en la base
+        sembradas = Notificacion.objects.filter(destinatario_id__in=self.empleado_ids)
+        for tipos, campo in ((['solicitud_cambio'], 'fecha_solicitud'), (['aprobacion', 'rechazo'], 'fecha_resolucion')):
+            sembradas.filter(tipo__in=tipos).update(fecha_creacion=Subquery(
+                SolicitudCambio.objects.filter(id=OuterRef('solicitud_id')).values(campo)[:1]
+            ))
+        return len(notificaciones)
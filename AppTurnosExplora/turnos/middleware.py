@@ -0,0 +1,12 @@
+from turnos.services.jornada_cache import JornadaCache
+
+
+class JornadaCacheMiddleware:
+    """Habilita el memo de JornadaCache durante cada petición"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with JornadaCache.alcance_peticion():
+            return self.get_response(request)
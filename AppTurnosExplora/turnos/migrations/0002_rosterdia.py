@@ -0,0 +1,32 @@
+# Generated by Django 5.2.2 on 2026-10-18 07:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empleados', '0001_initial'),
+        ('turnos', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterDia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('origen', models.CharField(choices=[('cambio', 'Cambio'), ('oficial', 'Oficial')], max_length=20)),
+                ('tipo_dia', models.CharField(blank=True, help_text='Tipos de DiaEspecial de la fecha', max_length=100, null=True)),
+                ('actualizado_en', models.DateTimeField(auto_now=True)),
+                ('explorador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_dias', to='empleados.empleado')),
+                ('jornada', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='empleados.jornada')),
+                ('sala', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='empleados.sala')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['fecha', 'jornada'], name='roster_fecha_jornada_idx')],
+                'constraints': [models.UniqueConstraint(fields=('explorador', 'fecha'), name='roster_explorador_fecha_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.2 on 2026-10-18 08:02
+
+import datetime
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empleados', '0001_initial'),
+        ('turnos', '0002_rosterdia'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asignarjornadaexplorador',
+            name='fecha_fin_efectiva',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce('fecha_fin', models.Value(datetime.date(9999, 12, 31))), output_field=models.DateField()),
+        ),
+        migrations.AddField(
+            model_name='asignarsalaexplorador',
+            name='fecha_fin_efectiva',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce('fecha_fin', models.Value(datetime.date(9999, 12, 31))), output_field=models.DateField()),
+        ),
+        migrations.AddIndex(
+            model_name='asignarjornadaexplorador',
+            index=models.Index(fields=['explorador', 'fecha_inicio', 'fecha_fin_efectiva'], name='asig_jornada_vigencia_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='asignarsalaexplorador',
+            index=models.Index(fields=['explorador', 'fecha_inicio', 'fecha_fin_efectiva'], name='asig_sala_vigencia_idx'),
+        ),
+    ]
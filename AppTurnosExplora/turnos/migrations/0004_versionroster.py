@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def crear_fila(apps, schema_editor):
+    VersionRoster = apps.get_model('turnos', 'VersionRoster')
+    VersionRoster.objects.get_or_create(pk=1, defaults={'version': 0, 'modificado': timezone.now()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turnos', '0003_vigencia_asignaciones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionRoster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('modificado', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(crear_fila, migrations.RunPython.noop),
+    ]
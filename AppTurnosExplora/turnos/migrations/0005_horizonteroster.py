@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('turnos', '0004_versionroster'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HorizonteRoster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('desde', models.DateField()),
+                ('hasta', models.DateField()),
+                ('construido', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -1,14 +1,38 @@
+from datetime import date
+
 from django.db import models
+from django.db.models.functions import Coalesce
 from empleados.models import Empleado, Jornada, Sala, CompetenciaEmpleado, RestriccionEmpleado, SancionEmpleado
 from simple_history.models import HistoricalRecords
 
+# Centinela de intervalos abiertos (fecha_fin NULL). Con la columna generada fecha_fin_efectiva
+# "asignación vigente en X" es fecha_inicio <= X AND fecha_fin_efectiva >= X, sin OR ni IS NULL,
+# y se resuelve con un solo rango sobre el índice (explorador, fecha_inicio, fecha_fin_efectiva).
+FECHA_FIN_ABIERTA = date(9999, 12, 31)
+
+
+def _fecha_fin_efectiva():
+    return models.GeneratedField(
+        expression=Coalesce('fecha_fin', models.Value(FECHA_FIN_ABIERTA)),
+        output_field=models.DateField(),
+        db_persist=True,
+    )
+
 
 class AsignarJornadaExplorador(models.Model):
     explorador = models.ForeignKey(Empleado, on_delete=models.CASCADE)
     jornada = models.ForeignKey(Jornada, on_delete=models.CASCADE)
     fecha_inicio = models.DateField()
     fecha_fin = models.DateField(null=True, blank=True)
-    historial = HistoricalRecords()
+    fecha_fin_efectiva = _fecha_fin_efectiva()
+    historial = HistoricalRecords(excluded_fields=['fecha_fin_efectiva'])
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['explorador', 'fecha_inicio', 'fecha_fin_efectiva'], name='asig_jornada_vigencia_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.explorador.user.username} - {self.jornada.nombre}" #type:ignore
@@ -18,8 +42,15 @@ class AsignarSalaExplorador(models.Model):
     sala = models.ForeignKey(Sala, on_delete=models.CASCADE)
     fecha_inicio = models.DateField()
     fecha_fin = models.DateField(null=True, blank=True)
-    historial = HistoricalRecords()
-    
+    fecha_fin_efectiva = _fecha_fin_efectiva()
+    historial = HistoricalRecords(excluded_fields=['fecha_fin_efectiva'])
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['explorador', 'fecha_inicio', 'fecha_fin_efectiva'], name='asig_sala_vigencia_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.explorador.user.username} - {self.sala.nombre}" #type:ignore
@@ -47,6 +78,50 @@ class DiaEspecial(models.Model):
     
     def __str__(self):
         return f"{self.fecha}" #type:ignore
+
+
+class RosterDia(models.Model):
+    """
+    Turno efectivo precalculado por explorador y día (Turno sobre AsignarJornadaExplorador).
+    Lo mantienen las señales de turnos/signals.py y el comando reconstruir_roster.
+    """
+    ORIGEN_CHOICES = [
+        ('cambio', 'Cambio'),
+        ('oficial', 'Oficial'),
+    ]
+
+    explorador = models.ForeignKey(Empleado, on_delete=models.CASCADE, related_name='roster_dias')
+    fecha = models.DateField()
+    jornada = models.ForeignKey(Jornada, on_delete=models.CASCADE)
+    sala = models.ForeignKey(Sala, on_delete=models.SET_NULL, null=True, blank=True)
+    origen = models.CharField(max_length=20, choices=ORIGEN_CHOICES)
+    tipo_dia = models.CharField(max_length=100, null=True, blank=True, help_text='Tipos de DiaEspecial de la fecha')
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['explorador', 'fecha'], name='roster_explorador_fecha_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['fecha', 'jornada'], name='roster_fecha_jornada_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.explorador_id} - {self.fecha} - {self.jornada_id}" #type:ignore
+
+
+class HorizonteRoster(models.Model):
+    """
+    Rango que cubrió el último RosterService.reconstruir_horizonte (una sola fila). Las
+    lecturas solo usan RosterDia dentro de este rango: si el comando diario se atrasa, los
+    días nuevos del horizonte se resuelven en vivo en lugar de verse vacíos.
+    """
+    desde = models.DateField()
+    hasta = models.DateField()
+    construido = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.desde} - {self.hasta} ({self.construido})"
     
 
 
@@ -55,3 +130,16 @@ class DiaEspecial(models.Model):
 
 
 # Create your models here.
+
+
+class VersionRoster(models.Model):
+    """
+    Contador de cambios del roster: una sola fila que las señales de turnos/signals.py
+    incrementan con cada cambio de turnos, asignaciones, días especiales o catálogos.
+    Las APIs del calendario la usan como ETag/Last-Modified (RosterService.get_version).
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    modificado = models.DateTimeField()
+
+    def __str__(self):
+        return f"v{self.version} ({self.modificado})"
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+
+class CalendarioCache:
+    """
+    Caché de lo que muestran los calendarios: el JSON de turnos-por-mes (compartido entre
+    usuarios, por rango) y los fragmentos de mis_turnos.html (por empleado).
+
+    La versión del roster (RosterService.get_version) forma parte de cada clave. Aprobar una
+    solicitud, el CRUD de Turno o un cambio de asignaciones la incrementan vía señales, así
+    que las entradas viejas dejan de leerse solas, sin borrar nada.
+
+    Igual que JornadaCache, no escribe dentro de una transacción abierta.
+    """
+
+    PREFIJO = 'turnos:calendario'
+
+    @staticmethod
+    def alias():
+        return getattr(settings, 'TURNOS_CACHE_ALIAS', 'default')
+
+    @staticmethod
+    def timeout():
+        """Timeout de escritura; 0 (no guardar) dentro de una transacción"""
+        if connection.in_atomic_block:
+            return 0
+        return getattr(settings, 'TURNOS_CACHE_TIMEOUT', 60 * 60)
+
+    @staticmethod
+    def obtener_rango(version, fecha_inicio, fecha_fin, calcular):
+        """Payload de [fecha_inicio, fecha_fin] para la versión dada, o `calcular()`"""
+        cache = caches[CalendarioCache.alias()]
+        clave = f'{CalendarioCache.PREFIJO}:rango:{version}:{fecha_inicio}:{fecha_fin}'
+        valor = cache.get(clave)
+        if valor is None:
+            valor = calcular()
+            timeout = CalendarioCache.timeout()
+            if timeout:
+                cache.set(clave, valor, timeout)
+        return valor
+
+    @staticmethod
+    def contexto_fragmentos(version):
+        """Variables para los {% cache %} de las plantillas"""
+        return {
+            'version_roster': version,
+            'fragmentos_timeout': CalendarioCache.timeout(),
+            'fragmentos_alias': CalendarioCache.alias(),
+        }
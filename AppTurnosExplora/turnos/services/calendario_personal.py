@@ -0,0 +1,145 @@
+import json
+from datetime import date, timedelta
+
+from django.utils.functional import cached_property
+
+from turnos.models import AsignarJornadaExplorador
+from turnos.services.schedule_resolver import ScheduleResolver
+
+
+class CalendarioPersonal:
+    """
+    Calendario de un explorador ("Mis Turnos") para cualquier rango de fechas.
+
+    Carga el rango con un número fijo de consultas (Turno con jornada y sala, asignaciones de
+    jornada y de sala, vía ScheduleResolver) y arma cada día en memoria:
+    - Si hay Turno ese día (asignado o cambio aprobado), manda el Turno.
+    - Si no, la jornada asignada vigente ese día o, si ya terminó, la última que empezó
+      antes (así se comporta un CT PERMANENTE vencido), con su día de descanso: los AM
+      descansan el sábado y los PM el domingo. Sin ninguna asignación se asume PM.
+    """
+
+    DESCANSO = 'Descanso'
+    SIN_SALA = 'Por asignar'
+    JORNADA_POR_DEFECTO = 'PM'
+    # weekday() del día de descanso por jornada
+    DIA_DESCANSO = {'AM': 5, 'PM': 6}
+    MAXIMO_ADYACENTES = 6
+
+    @staticmethod
+    def _sumar_meses(anio, mes, meses):
+        indice = anio * 12 + (mes - 1) + meses
+        return indice // 12, indice % 12 + 1
+
+    @staticmethod
+    def rango_meses(anio, mes, adyacentes=0):
+        """(primer día, último día) de los meses [mes - adyacentes, mes + adyacentes]"""
+        date(anio, mes, 1)  # ValueError si el mes no existe
+        anio_inicio, mes_inicio = CalendarioPersonal._sumar_meses(anio, mes, -adyacentes)
+        anio_fin, mes_fin = CalendarioPersonal._sumar_meses(anio, mes, adyacentes + 1)
+        return date(anio_inicio, mes_inicio, 1), date(anio_fin, mes_fin, 1) - timedelta(days=1)
+
+    @staticmethod
+    def jornada_del_dia(jornada_base, fecha):
+        """Nombre de la jornada de `fecha` aplicando el día de descanso de la jornada base"""
+        if CalendarioPersonal.DIA_DESCANSO.get(jornada_base) == fecha.weekday():
+            return CalendarioPersonal.DESCANSO
+        return jornada_base
+
+    @staticmethod
+    def _ultima_asignacion(asignaciones, fecha):
+        """La última asignación que empezó antes de `fecha` o, si ninguna, la más reciente"""
+        anteriores = [a for a in asignaciones if a.fecha_inicio <= fecha]
+        return (anteriores or asignaciones)[-1] if asignaciones else None
+
+    @staticmethod
+    def construir(empleado, fecha_inicio, fecha_fin):
+        """
+        Días del rango: {date: {'turno', 'jornada', 'sala', 'tipo', 'es_cambio'}}, con
+        tipo 'asignado' (hay Turno) o 'predeterminado' (jornada asignada)
+        """
+        resolver = ScheduleResolver([empleado.id], fecha_inicio, fecha_fin)
+        todas_las_asignaciones = None
+        dias = {}
+        for fecha in resolver.fechas():
+            turno = resolver.get_turno(empleado.id, fecha)
+            if turno:
+                dias[fecha] = {
+                    'turno': turno,
+                    'jornada': turno.jornada.nombre,
+                    'sala': turno.sala.nombre,
+                    'tipo': 'asignado',
+                    'es_cambio': turno.tipo_cambio is not None,
+                }
+                continue
+
+            asignacion = resolver.get_asignacion_jornada(empleado.id, fecha)
+            if asignacion is None:
+                # Solo si algún día queda fuera de toda asignación vigente
+                if todas_las_asignaciones is None:
+                    todas_las_asignaciones = list(
+                        AsignarJornadaExplorador.objects.select_related('jornada')
+                        .filter(explorador_id=empleado.id).order_by('fecha_inicio', 'id')
+                    )
+                asignacion = CalendarioPersonal._ultima_asignacion(todas_las_asignaciones, fecha)
+            jornada_base = asignacion.jornada.nombre if asignacion else CalendarioPersonal.JORNADA_POR_DEFECTO
+            asignacion_sala = resolver.get_asignacion_sala(empleado.id, fecha)
+            dias[fecha] = {
+                'turno': None,
+                'jornada': CalendarioPersonal.jornada_del_dia(jornada_base, fecha),
+                'sala': asignacion_sala.sala.nombre if asignacion_sala else CalendarioPersonal.SIN_SALA,
+                'tipo': 'predeterminado',
+                'es_cambio': False,
+            }
+        return dias
+
+    @staticmethod
+    def a_json(dias):
+        """{'YYYY-MM-DD': {'jornada', 'sala', 'tipo', 'es_cambio'}} para el calendario del navegador"""
+        return {
+            fecha.strftime('%Y-%m-%d'): {
+                'jornada': info['jornada'],
+                'sala': info['sala'],
+                'tipo': info['tipo'],
+                'es_cambio': info['es_cambio'],
+            }
+            for fecha, info in dias.items()
+        }
+
+
+class DatosMisTurnos:
+    """
+    Lo que muestra "Mis Turnos" para `fecha`: la semana actual y el mes actual con sus
+    adyacentes (el calendario navega sin pedirlos). Se calcula recién cuando la plantilla lo
+    usa: si los fragmentos de mis_turnos.html están en caché, no se consulta la base.
+    """
+
+    def __init__(self, empleado, fecha):
+        self.empleado = empleado
+        self.fecha = fecha
+        self.inicio_semana = fecha - timedelta(days=fecha.weekday())
+        self.fin_semana = self.inicio_semana + timedelta(days=6)
+
+    @cached_property
+    def dias(self):
+        # La semana puede cruzar el borde del mes: un solo rango para ambas
+        inicio_meses, fin_meses = CalendarioPersonal.rango_meses(self.fecha.year, self.fecha.month, 1)
+        return CalendarioPersonal.construir(
+            self.empleado, min(inicio_meses, self.inicio_semana), max(fin_meses, self.fin_semana)
+        )
+
+    @cached_property
+    def semana(self):
+        return {
+            self.inicio_semana + timedelta(days=i): self.dias[self.inicio_semana + timedelta(days=i)]
+            for i in range(7)
+        }
+
+    @cached_property
+    def turnos_mes(self):
+        inicio_mes, fin_mes = CalendarioPersonal.rango_meses(self.fecha.year, self.fecha.month)
+        return [info['turno'] for fecha, info in self.dias.items() if info['turno'] and inicio_mes <= fecha <= fin_mes]
+
+    @cached_property
+    def json(self):
+        return json.dumps(CalendarioPersonal.a_json(self.dias))
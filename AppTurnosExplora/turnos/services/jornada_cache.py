@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+
+# Memo de la petición actual: {(tipo, explorador_id, fecha): valor}. None fuera de una petición.
+_memo_peticion = ContextVar('jornada_cache_memo', default=None)
+
+
+class JornadaCache:
+    """
+    Caché de resoluciones de jornada/turno por (explorador_id, fecha).
+
+    Dos niveles:
+    - Memo por petición (lo activa JornadaCacheMiddleware): la misma consulta no se repite
+      dentro de una validación o aprobación.
+    - Caché compartida de Django (alias TURNOS_CACHE_ALIAS): locmem, archivo o Redis.
+
+    La invalidación es por explorador: cada explorador tiene un número de versión que forma
+    parte de la clave y que las señales de turnos/signals.py incrementan cuando cambian sus
+    Turno, asignaciones o competencias.
+    """
+
+    PREFIJO = 'turnos:jornada'
+
+    @staticmethod
+    def _cache():
+        return caches[getattr(settings, 'TURNOS_CACHE_ALIAS', 'default')]
+
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'TURNOS_CACHE_TIMEOUT', 60 * 60)
+
+    @staticmethod
+    def _clave_version(explorador_id):
+        return f'{JornadaCache.PREFIJO}:version:{explorador_id}'
+
+    @staticmethod
+    def _clave(tipo, explorador_id, version, fecha):
+        return f'{JornadaCache.PREFIJO}:{tipo}:{explorador_id}:{version}:{fecha.isoformat()}'
+
+    @staticmethod
+    @contextmanager
+    def alcance_peticion():
+        """Activa el memo por petición durante el bloque"""
+        token = _memo_peticion.set({})
+        try:
+            yield
+        finally:
+            _memo_peticion.reset(token)
+
+    @staticmethod
+    def obtener(tipo, explorador_id, fecha, calcular):
+        """
+        Devuelve el valor cacheado de (tipo, explorador_id, fecha) o lo calcula con `calcular()`.
+
+        Dentro de una transacción abierta no se escribe en la caché compartida, para no
+        publicar datos que aún podrían revertirse.
+        """
+        memo = _memo_peticion.get()
+        clave_memo = (tipo, explorador_id, fecha)
+        if memo is not None and clave_memo in memo:
+            return memo[clave_memo]
+
+        cache = JornadaCache._cache()
+        version = cache.get(JornadaCache._clave_version(explorador_id), 0)
+        clave = JornadaCache._clave(tipo, explorador_id, version, fecha)
+        # Se guarda envuelto en una tupla para distinguir "sin jornada" (None) de "no cacheado"
+        encontrado = cache.get(clave)
+        if encontrado is not None:
+            valor = encontrado[0]
+        else:
+            valor = calcular()
+            if not connection.in_atomic_block:
+                cache.set(clave, (valor,), JornadaCache._timeout())
+
+        if memo is not None:
+            memo[clave_memo] = valor
+        return valor
+
+    @staticmethod
+    def _incrementar_version(explorador_id):
+        cache = JornadaCache._cache()
+        clave_version = JornadaCache._clave_version(explorador_id)
+        cache.add(clave_version, 0, None)
+        try:
+            cache.incr(clave_version)
+        except ValueError:
+            # La clave expiró entre add e incr
+            cache.set(clave_version, 1, None)
+
+    @staticmethod
+    def invalidar_explorador(explorador_id):
+        """
+        Descarta todas las entradas del explorador (memo y caché compartida).
+
+        Dentro de una transacción se vuelve a invalidar al confirmarla, por si otro proceso
+        cacheó el estado anterior mientras tanto.
+        """
+        memo = _memo_peticion.get()
+        if memo:
+            for clave in [c for c in memo if c[1] == explorador_id]:
+                del memo[clave]
+
+        JornadaCache._incrementar_version(explorador_id)
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: JornadaCache._incrementar_version(explorador_id))
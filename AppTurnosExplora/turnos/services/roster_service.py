@@ -0,0 +1,217 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from empleados.models import Empleado
+from turnos.models import DiaEspecial, HorizonteRoster, RosterDia, VersionRoster
+from turnos.services.schedule_resolver import ScheduleResolver
+
+# Marca de la confirmación en curso de este hilo (ver RosterService.marcar_cambio)
+_confirmacion = threading.local()
+
+
+class RosterService:
+    """
+    Mantiene y consulta la tabla materializada RosterDia.
+
+    La tabla se llena para un horizonte móvil (TURNOS_ROSTER_DIAS_ATRAS días hacia atrás y
+    TURNOS_ROSTER_HORIZONTE_DIAS hacia adelante). Solo se mantiene y se lee con
+    TURNOS_ROSTER_ACTIVO, y las lecturas solo la usan si el rango pedido cae dentro del
+    horizonte y del rango que construyó el último reconstruir_horizonte.
+    """
+
+    ID_HORIZONTE = 1
+    CLAVE_CONSTRUIDO = 'turnos:roster:construido'
+
+    @staticmethod
+    def activo():
+        return getattr(settings, 'TURNOS_ROSTER_ACTIVO', False)
+
+    @staticmethod
+    def get_horizonte():
+        hoy = timezone.now().date()
+        dias_atras = getattr(settings, 'TURNOS_ROSTER_DIAS_ATRAS', 31)
+        dias_adelante = getattr(settings, 'TURNOS_ROSTER_HORIZONTE_DIAS', 120)
+        return hoy - timedelta(days=dias_atras), hoy + timedelta(days=dias_adelante)
+
+    @staticmethod
+    def get_construido():
+        """
+        (desde, hasta) del último reconstruir_horizonte, o None. Se cachea: un valor viejo
+        solo es más conservador, porque lo que sigue dentro del horizonte lo mantienen las señales.
+        """
+        cache = caches[getattr(settings, 'TURNOS_CACHE_ALIAS', 'default')]
+        construido = cache.get(RosterService.CLAVE_CONSTRUIDO)
+        if construido is None:
+            construido = HorizonteRoster.objects.filter(pk=RosterService.ID_HORIZONTE).values_list('desde', 'hasta').first()
+            if construido and not connection.in_atomic_block:
+                cache.set(RosterService.CLAVE_CONSTRUIDO, construido, getattr(settings, 'TURNOS_CACHE_TIMEOUT', 60 * 60))
+        return construido
+
+    @staticmethod
+    def cubre(fecha_inicio, fecha_fin=None):
+        """True si las lecturas de [fecha_inicio, fecha_fin] pueden servirse desde RosterDia"""
+        if not RosterService.activo():
+            return False
+        construido = RosterService.get_construido()
+        if construido is None:
+            return False
+        desde, hasta = RosterService.get_horizonte()
+        return max(desde, construido[0]) <= fecha_inicio and (fecha_fin or fecha_inicio) <= min(hasta, construido[1])
+
+    @staticmethod
+    def _recortar_al_horizonte(fecha_inicio, fecha_fin):
+        desde, hasta = RosterService.get_horizonte()
+        return max(fecha_inicio, desde), min(fecha_fin, hasta)
+
+    # ===== Escritura =====
+
+    @staticmethod
+    def reconstruir(fecha_inicio, fecha_fin, explorador_ids=None, batch_size=1000):
+        """
+        Recalcula las filas de RosterDia del rango para los exploradores dados (todos si es None).
+
+        Returns:
+            Número de filas escritas
+        """
+        if fecha_fin < fecha_inicio:
+            return 0
+        exploradores = Empleado.objects.all() if explorador_ids is None else list(explorador_ids)
+        resolver = ScheduleResolver(exploradores, fecha_inicio, fecha_fin)
+        ids = list(exploradores.values_list('id', flat=True)) if explorador_ids is None else exploradores
+
+        filas = []
+        for explorador_id in ids:
+            for fecha in resolver.fechas():
+                celda = resolver.resolver(explorador_id, fecha)
+                if not celda['jornada']:
+                    continue
+                tipos = resolver.get_dia_especial_tipos(fecha)
+                filas.append(RosterDia(
+                    explorador_id=explorador_id,
+                    fecha=fecha,
+                    jornada=celda['jornada'],
+                    sala=celda['sala'],
+                    origen=celda['tipo'],
+                    tipo_dia=','.join(sorted(tipos)) or None,
+                ))
+
+        with transaction.atomic():
+            existentes = RosterDia.objects.filter(fecha__gte=fecha_inicio, fecha__lte=fecha_fin)
+            if explorador_ids is not None:
+                existentes = existentes.filter(explorador_id__in=ids)
+            existentes.delete()
+            RosterDia.objects.bulk_create(filas, batch_size=batch_size)
+        return len(filas)
+
+    @staticmethod
+    def reconstruir_horizonte():
+        """Reconstruye todo el horizonte y lo registra como el rango que pueden leer las lecturas"""
+        desde, hasta = RosterService.get_horizonte()
+        with transaction.atomic():
+            filas = RosterService.reconstruir(desde, hasta)
+            HorizonteRoster.objects.update_or_create(
+                pk=RosterService.ID_HORIZONTE,
+                defaults={'desde': desde, 'hasta': hasta, 'construido': timezone.now()},
+            )
+            transaction.on_commit(
+                lambda: caches[getattr(settings, 'TURNOS_CACHE_ALIAS', 'default')].delete(RosterService.CLAVE_CONSTRUIDO)
+            )
+        return filas
+
+    @staticmethod
+    def actualizar_explorador(explorador_id, fecha_inicio=None, fecha_fin=None):
+        """Recalcula un explorador dentro del horizonte (todo el horizonte si no se da rango)"""
+        desde, hasta = RosterService.get_horizonte()
+        desde, hasta = RosterService._recortar_al_horizonte(fecha_inicio or desde, fecha_fin or hasta)
+        return RosterService.reconstruir(desde, hasta, [explorador_id])
+
+    @staticmethod
+    def actualizar_tipo_dia(fecha):
+        """Refresca tipo_dia de todas las filas de la fecha tras un cambio en DiaEspecial"""
+        tipos = sorted(set(DiaEspecial.objects.filter(fecha=fecha).values_list('tipo', flat=True)))
+        return RosterDia.objects.filter(fecha=fecha).update(tipo_dia=','.join(tipos) or None)
+
+    # ===== Versión =====
+    # Cambia con cualquier escritura que altere lo que muestran los calendarios. Vive en la
+    # base (no en la caché) para que todos los procesos vean el mismo valor.
+
+    ID_VERSION = 1
+
+    @staticmethod
+    def _incrementar_version():
+        ahora = timezone.now()
+        actualizadas = VersionRoster.objects.filter(pk=RosterService.ID_VERSION).update(
+            version=F('version') + 1, modificado=ahora
+        )
+        if not actualizadas:
+            VersionRoster.objects.get_or_create(
+                pk=RosterService.ID_VERSION, defaults={'version': 1, 'modificado': ahora}
+            )
+
+    @staticmethod
+    def marcar_cambio():
+        """
+        Incrementa la versión del roster. Dentro de una transacción se incrementa una sola
+        vez, al confirmarla: un CT PERMANENTE de 90 turnos no hace 90 UPDATE, y nadie ve la
+        versión nueva con los datos viejos.
+
+        Cada llamada registra su on_commit (así un rollback parcial descarta solo los suyos),
+        pero todos los de una confirmación comparten una marca y solo el primero incrementa.
+        Un error al incrementar se registra y no afecta lo ya confirmado.
+        """
+        if not connection.in_atomic_block:
+            RosterService._incrementar_version()
+            return
+        marca = getattr(_confirmacion, 'marca', None)
+        if marca is None or marca['incrementada']:
+            marca = _confirmacion.marca = {'incrementada': False}
+        transaction.on_commit(lambda: RosterService._incrementar_una_vez(marca), robust=True)
+
+    @staticmethod
+    def _incrementar_una_vez(marca):
+        if not marca['incrementada']:
+            marca['incrementada'] = True
+            RosterService._incrementar_version()
+
+    @staticmethod
+    def get_version():
+        """(versión, fecha de la última modificación) del roster"""
+        fila = VersionRoster.objects.filter(pk=RosterService.ID_VERSION).values_list('version', 'modificado').first()
+        return fila or (0, None)
+
+    # ===== Lectura =====
+
+    @staticmethod
+    def get_jornada(explorador_id, fecha):
+        fila = RosterDia.objects.select_related('jornada').filter(explorador_id=explorador_id, fecha=fecha).first()
+        return fila.jornada if fila else None
+
+    @staticmethod
+    def get_exploradores_por_jornada_rango(fecha_inicio, fecha_fin):
+        """Mismo formato que TurnoService.get_exploradores_por_jornada_rango, con un solo range scan"""
+        resultado = {}
+        dia = fecha_inicio
+        while dia <= fecha_fin:
+            resultado[str(dia)] = {'am': [], 'pm': []}
+            dia += timedelta(days=1)
+
+        filas = RosterDia.objects.filter(
+            fecha__gte=fecha_inicio,
+            fecha__lte=fecha_fin,
+            explorador__activo=True
+        ).order_by('fecha', 'explorador_id').values_list(
+            'fecha', 'explorador_id', 'explorador__nombre', 'explorador__apellido', 'jornada__nombre', 'origen'
+        )
+        for fecha, explorador_id, nombre, apellido, jornada, origen in filas:
+            grupo = jornada.strip().lower()
+            if grupo in ('am', 'pm'):
+                resultado[str(fecha)][grupo].append(
+                    {'id': explorador_id, 'nombre': nombre, 'apellido': apellido, 'tipo': origen}
+                )
+        return resultado
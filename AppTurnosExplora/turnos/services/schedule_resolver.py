@@ -0,0 +1,158 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import models
+
+from turnos.models import AsignarJornadaExplorador, AsignarSalaExplorador, DiaEspecial, Turno
+
+
+class ScheduleResolver:
+    """
+    Resuelve la jornada y la sala de un conjunto de exploradores en un rango de fechas.
+
+    En lugar de consultar Turno y AsignarJornadaExplorador por cada empleado y cada día,
+    carga cada modelo (Turno, AsignarJornadaExplorador, AsignarSalaExplorador, DiaEspecial)
+    con una sola consulta para todo el conjunto y responde desde memoria.
+    Las cargas son perezosas: solo se consulta el modelo que realmente se usa.
+    """
+
+    def __init__(self, exploradores, fecha_inicio, fecha_fin=None):
+        """
+        Args:
+            exploradores: QuerySet de Empleado, o iterable de Empleado / ids
+            fecha_inicio: date inicial del rango (incluida)
+            fecha_fin: date final del rango (incluida); por defecto igual a fecha_inicio
+        """
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin or fecha_inicio
+        if isinstance(exploradores, models.QuerySet):
+            # Se usa como subconsulta para no evaluar el queryset de empleados
+            self._filtro_exploradores = exploradores.values('id')
+        else:
+            self._filtro_exploradores = [getattr(e, 'id', e) for e in exploradores]
+        self._turnos = None
+        self._asignaciones_jornada = None
+        self._asignaciones_sala = None
+        self._dias_especiales = None
+
+    # ===== Cargas en bloque =====
+
+    def _filtro_intervalo(self):
+        """Intervalos que se solapan con el rango [fecha_inicio, fecha_fin] (los abiertos incluidos)"""
+        return models.Q(fecha_inicio__lte=self.fecha_fin, fecha_fin_efectiva__gte=self.fecha_inicio)
+
+    def _cargar_turnos(self):
+        if self._turnos is None:
+            self._turnos = {}
+            turnos = Turno.objects.select_related('jornada', 'sala').filter(
+                explorador_id__in=self._filtro_exploradores,
+                fecha__gte=self.fecha_inicio,
+                fecha__lte=self.fecha_fin
+            ).order_by('id')
+            for turno in turnos:
+                # Igual que .first(): gana el turno más antiguo de ese día
+                self._turnos.setdefault((turno.explorador_id, turno.fecha), turno)
+        return self._turnos
+
+    def _cargar_intervalos(self, modelo, relacion):
+        intervalos = defaultdict(list)
+        asignaciones = modelo.objects.select_related(relacion).filter(
+            self._filtro_intervalo(),
+            explorador_id__in=self._filtro_exploradores
+        ).order_by('fecha_inicio', 'id')
+        for asignacion in asignaciones:
+            intervalos[asignacion.explorador_id].append(asignacion)
+        return intervalos
+
+    def _cargar_asignaciones_jornada(self):
+        if self._asignaciones_jornada is None:
+            self._asignaciones_jornada = self._cargar_intervalos(AsignarJornadaExplorador, 'jornada')
+        return self._asignaciones_jornada
+
+    def _cargar_asignaciones_sala(self):
+        if self._asignaciones_sala is None:
+            self._asignaciones_sala = self._cargar_intervalos(AsignarSalaExplorador, 'sala')
+        return self._asignaciones_sala
+
+    def _cargar_dias_especiales(self):
+        if self._dias_especiales is None:
+            self._dias_especiales = defaultdict(set)
+            dias = DiaEspecial.objects.filter(
+                fecha__gte=self.fecha_inicio,
+                fecha__lte=self.fecha_fin
+            ).values_list('fecha', 'tipo')
+            for fecha, tipo in dias:
+                self._dias_especiales[fecha].add(tipo)
+        return self._dias_especiales
+
+    @staticmethod
+    def _intervalo_vigente(intervalos, fecha):
+        """Equivalente en memoria a filter(vigente en fecha).order_by('-fecha_inicio').first()"""
+        for asignacion in reversed(intervalos):
+            if asignacion.fecha_inicio <= fecha and (asignacion.fecha_fin is None or asignacion.fecha_fin >= fecha):
+                return asignacion
+        return None
+
+    # ===== Consultas en memoria =====
+
+    def fechas(self):
+        """Itera las fechas del rango"""
+        for i in range((self.fecha_fin - self.fecha_inicio).days + 1):
+            yield self.fecha_inicio + timedelta(days=i)
+
+    def get_turno(self, explorador_id, fecha):
+        """Turno específico (cambio aprobado o asignado) del explorador en esa fecha"""
+        return self._cargar_turnos().get((explorador_id, fecha))
+
+    def get_asignacion_jornada(self, explorador_id, fecha):
+        return self._intervalo_vigente(self._cargar_asignaciones_jornada().get(explorador_id, []), fecha)
+
+    def get_asignacion_sala(self, explorador_id, fecha):
+        return self._intervalo_vigente(self._cargar_asignaciones_sala().get(explorador_id, []), fecha)
+
+    def get_jornada(self, explorador_id, fecha):
+        """
+        Jornada del explorador en esa fecha: el Turno del día tiene prioridad
+        sobre la jornada fija asignada.
+        """
+        turno = self.get_turno(explorador_id, fecha)
+        if turno:
+            return turno.jornada
+        asignacion = self.get_asignacion_jornada(explorador_id, fecha)
+        return asignacion.jornada if asignacion else None
+
+    def get_dia_especial_tipos(self, fecha):
+        """Tipos de DiaEspecial registrados para la fecha (festivo, mantenimiento, ...)"""
+        return self._cargar_dias_especiales().get(fecha, set())
+
+    def es_dia_especial(self, fecha, tipo):
+        return tipo in self.get_dia_especial_tipos(fecha)
+
+    def resolver(self, explorador_id, fecha):
+        """
+        Celda (explorador, fecha) de la matriz de turnos.
+
+        Returns:
+            dict con 'jornada', 'sala', 'turno' y 'tipo' ('cambio' si viene de Turno,
+            'oficial' si viene de la jornada asignada, None si no tiene jornada)
+        """
+        turno = self.get_turno(explorador_id, fecha)
+        if turno:
+            return {'jornada': turno.jornada, 'sala': turno.sala, 'turno': turno, 'tipo': 'cambio'}
+        asignacion_jornada = self.get_asignacion_jornada(explorador_id, fecha)
+        asignacion_sala = self.get_asignacion_sala(explorador_id, fecha)
+        jornada = asignacion_jornada.jornada if asignacion_jornada else None
+        return {
+            'jornada': jornada,
+            'sala': asignacion_sala.sala if asignacion_sala else None,
+            'turno': None,
+            'tipo': 'oficial' if jornada else None,
+        }
+
+    def matriz(self, explorador_ids):
+        """Matriz completa {(explorador_id, fecha): celda} para los ids y el rango dados"""
+        return {
+            (explorador_id, fecha): self.resolver(explorador_id, fecha)
+            for explorador_id in explorador_ids
+            for fecha in self.fechas()
+        }
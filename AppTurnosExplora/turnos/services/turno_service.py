@@ -1,30 +1,16 @@
 from empleados.models import Empleado, Jornada
-from turnos.models import AsignarJornadaExplorador, Turno
-from datetime import datetime, timedelta
+from turnos.services.roster_service import RosterService
+from turnos.services.schedule_resolver import ScheduleResolver
+from datetime import datetime
 import re
-from django.db import models
 
 class TurnoService:
     @staticmethod
-    def get_exploradores_por_jornada(fecha):
-        fecha_str = re.match(r"\d{4}-\d{2}-\d{2}", fecha).group(0)
-        fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d').date()
-        exploradores = Empleado.objects.filter(activo=True)
+    def _agrupar_por_jornada(resolver, exploradores, fecha_obj):
         am, pm = [], []
         for explorador in exploradores:
-            turno = Turno.objects.filter(explorador=explorador, fecha=fecha_obj).first()
-            if turno:
-                jornada = turno.jornada
-                tipo = 'cambio'
-            else:
-                asignacion = AsignarJornadaExplorador.objects.filter(
-                    explorador=explorador,
-                    fecha_inicio__lte=fecha_obj
-                ).filter(
-                    models.Q(fecha_fin__isnull=True) | models.Q(fecha_fin__gte=fecha_obj)
-                ).order_by('-fecha_inicio').first()
-                jornada = asignacion.jornada if asignacion else None
-                tipo = 'oficial' if jornada else None
+            jornada = resolver.get_jornada(explorador.id, fecha_obj)
+            tipo = 'cambio' if resolver.get_turno(explorador.id, fecha_obj) else 'oficial'
             if jornada:
                 item = {'id': explorador.id, 'nombre': explorador.nombre, 'apellido': explorador.apellido, 'tipo': tipo}
                 if jornada.nombre.strip().lower() == 'am':
@@ -33,15 +19,32 @@ class TurnoService:
                     pm.append(item)
         return {'am': am, 'pm': pm}
 
+    @staticmethod
+    def get_exploradores_por_jornada(fecha):
+        fecha_str = re.match(r"\d{4}-\d{2}-\d{2}", fecha).group(0)
+        fecha_obj = datetime.strptime(fecha_str, '%Y-%m-%d').date()
+        if RosterService.cubre(fecha_obj):
+            return RosterService.get_exploradores_por_jornada_rango(fecha_obj, fecha_obj)[str(fecha_obj)]
+        exploradores = list(Empleado.objects.filter(activo=True))
+        resolver = ScheduleResolver(exploradores, fecha_obj)
+        return TurnoService._agrupar_por_jornada(resolver, exploradores, fecha_obj)
+
     @staticmethod
     def get_exploradores_por_jornada_rango(fecha_inicio, fecha_fin):
+        """
+        Exploradores AM/PM para cada día del rango.
+        Carga empleados, turnos y asignaciones de toda la ventana una sola vez y recorre
+        las fechas en memoria: el número de consultas no depende de los días ni del personal.
+        """
         inicio_str = re.match(r"\d{4}-\d{2}-\d{2}", fecha_inicio).group(0)
         fin_str = re.match(r"\d{4}-\d{2}-\d{2}", fecha_fin).group(0)
         inicio = datetime.strptime(inicio_str, '%Y-%m-%d').date()
         fin = datetime.strptime(fin_str, '%Y-%m-%d').date()
-        dias = (fin - inicio).days + 1
+        if RosterService.cubre(inicio, fin):
+            return RosterService.get_exploradores_por_jornada_rango(inicio, fin)
+        exploradores = list(Empleado.objects.filter(activo=True))
+        resolver = ScheduleResolver(exploradores, inicio, fin)
         resultado = {}
-        for i in range(dias):
-            dia = inicio + timedelta(days=i)
-            resultado[str(dia)] = TurnoService.get_exploradores_por_jornada(str(dia))
-        return resultado 
\ No newline at end of file
+        for dia in resolver.fechas():
+            resultado[str(dia)] = TurnoService._agrupar_por_jornada(resolver, exploradores, dia)
+        return resultado
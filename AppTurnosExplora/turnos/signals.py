@@ -0,0 +1,118 @@
+"""
+Señales que mantienen RosterDia y JornadaCache sincronizados de forma incremental.
+
+Cada cambio en Turno, AsignarJornadaExplorador, AsignarSalaExplorador o DiaEspecial
+invalida la caché de jornadas de los exploradores involucrados y, con TURNOS_ROSTER_ACTIVO,
+recalcula solo las celdas afectadas (antes y después del cambio) dentro del horizonte. Todos (y los cambios en
+Empleado, Jornada y Sala, cuyos nombres muestran los calendarios) incrementan la versión
+del roster que usan las APIs del calendario para responder 304.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils.dateparse import parse_date
+
+from empleados.models import CompetenciaEmpleado, Empleado, Jornada, Sala
+from turnos.models import AsignarJornadaExplorador, AsignarSalaExplorador, DiaEspecial, Turno
+from turnos.services.jornada_cache import JornadaCache
+from turnos.services.roster_service import RosterService
+
+
+def _a_fecha(valor):
+    """Las instancias recién creadas pueden traer la fecha como string"""
+    return parse_date(valor) if isinstance(valor, str) else valor
+
+
+def _guardar_estado_anterior(sender, instance, campos):
+    """Recuerda los valores previos para recalcular también la celda que se abandona"""
+    instance._roster_anterior = None
+    if instance.pk:
+        instance._roster_anterior = sender.objects.filter(pk=instance.pk).values(*campos).first()
+
+
+@receiver(pre_save, sender=Turno)
+def turno_pre_save(sender, instance, **kwargs):
+    _guardar_estado_anterior(sender, instance, ['explorador_id', 'fecha'])
+
+
+@receiver(post_save, sender=Turno)
+@receiver(post_delete, sender=Turno)
+def turno_cambiado(sender, instance, **kwargs):
+    celdas = {(instance.explorador_id, _a_fecha(instance.fecha))}
+    anterior = getattr(instance, '_roster_anterior', None)
+    if anterior:
+        celdas.add((anterior['explorador_id'], anterior['fecha']))
+    for explorador_id, fecha in celdas:
+        JornadaCache.invalidar_explorador(explorador_id)
+        if RosterService.activo():
+            RosterService.actualizar_explorador(explorador_id, fecha, fecha)
+    RosterService.marcar_cambio()
+
+
+@receiver(pre_save, sender=AsignarJornadaExplorador)
+@receiver(pre_save, sender=AsignarSalaExplorador)
+def asignacion_pre_save(sender, instance, **kwargs):
+    _guardar_estado_anterior(sender, instance, ['explorador_id', 'fecha_inicio', 'fecha_fin'])
+
+
+@receiver(post_save, sender=AsignarJornadaExplorador)
+@receiver(post_save, sender=AsignarSalaExplorador)
+@receiver(post_delete, sender=AsignarJornadaExplorador)
+@receiver(post_delete, sender=AsignarSalaExplorador)
+def asignacion_cambiada(sender, instance, **kwargs):
+    intervalos = [(instance.explorador_id, _a_fecha(instance.fecha_inicio), _a_fecha(instance.fecha_fin))]
+    anterior = getattr(instance, '_roster_anterior', None)
+    if anterior:
+        intervalos.append((anterior['explorador_id'], anterior['fecha_inicio'], anterior['fecha_fin']))
+    for explorador_id, fecha_inicio, fecha_fin in intervalos:
+        JornadaCache.invalidar_explorador(explorador_id)
+        if RosterService.activo():
+            RosterService.actualizar_explorador(explorador_id, fecha_inicio, fecha_fin)
+    RosterService.marcar_cambio()
+
+
+@receiver(pre_save, sender=DiaEspecial)
+def dia_especial_pre_save(sender, instance, **kwargs):
+    _guardar_estado_anterior(sender, instance, ['fecha'])
+
+
+@receiver(post_save, sender=DiaEspecial)
+@receiver(post_delete, sender=DiaEspecial)
+def dia_especial_cambiado(sender, instance, **kwargs):
+    fechas = {_a_fecha(instance.fecha)}
+    anterior = getattr(instance, '_roster_anterior', None)
+    if anterior:
+        fechas.add(anterior['fecha'])
+    if RosterService.activo():
+        for fecha in fechas:
+            RosterService.actualizar_tipo_dia(fecha)
+    RosterService.marcar_cambio()
+
+
+@receiver(pre_save, sender=CompetenciaEmpleado)
+def competencia_pre_save(sender, instance, **kwargs):
+    _guardar_estado_anterior(sender, instance, ['empleado_id'])
+
+
+@receiver(post_save, sender=CompetenciaEmpleado)
+@receiver(post_delete, sender=CompetenciaEmpleado)
+def competencia_cambiada(sender, instance, **kwargs):
+    """Las salas de competencia forman parte de get_turno_explorador"""
+    empleados = {instance.empleado_id}
+    anterior = getattr(instance, '_roster_anterior', None)
+    if anterior:
+        empleados.add(anterior['empleado_id'])
+    for empleado_id in empleados:
+        JornadaCache.invalidar_explorador(empleado_id)
+    RosterService.marcar_cambio()
+
+
+@receiver(post_save, sender=Empleado)
+@receiver(post_delete, sender=Empleado)
+@receiver(post_save, sender=Jornada)
+@receiver(post_delete, sender=Jornada)
+@receiver(post_save, sender=Sala)
+@receiver(post_delete, sender=Sala)
+def catalogo_cambiado(sender, instance, **kwargs):
+    """Nombres y estado activo que muestran los calendarios"""
+    RosterService.marcar_cambio()
@@ -1,3 +1,513 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from empleados.models import CompetenciaEmpleado, Empleado, Jornada, Sala
+from solicitudes.models import Notificacion, SolicitudCambio
+from solicitudes.services.solicitud_service import SolicitudService
+from turnos.models import (
+    AsignarJornadaExplorador, AsignarSalaExplorador, DiaEspecial, HorizonteRoster, RosterDia, Turno
+)
+from turnos.services.calendario_personal import CalendarioPersonal
+from turnos.services.jornada_cache import JornadaCache
+from turnos.services.roster_service import RosterService
+from turnos.services.turno_service import TurnoService
+
+
+class TurnosPorMesQueryCountTest(TestCase):
+    """Benchmark de consultas del calendario mensual (/turnos/api/turnos-por-mes/)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        cls.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        cls.sala = Sala.objects.create(nombre='Acuario')
+
+    def _crear_exploradores(self, cantidad):
+        inicio = Empleado.objects.count()
+        for i in range(inicio, inicio + cantidad):
+            user = User.objects.create(username=f'explorador{i}')
+            empleado = Empleado.objects.create(
+                user=user, nombre=f'Explorador{i}', apellido='Prueba', cedula=str(1000 + i), email=f'e{i}@test.com'
+            )
+            AsignarJornadaExplorador.objects.create(
+                explorador=empleado, jornada=self.am if i % 2 else self.pm, fecha_inicio=date(2025, 1, 1)
+            )
+            AsignarSalaExplorador.objects.create(explorador=empleado, sala=self.sala, fecha_inicio=date(2025, 1, 1))
+            Turno.objects.create(
+                explorador=empleado, fecha=date(2025, 3, 10), jornada=self.pm if i % 2 else self.am,
+                sala=self.sala, tipo_cambio='CT'
+            )
+
+    def _contar_consultas(self, fecha_inicio, fecha_fin):
+        with CaptureQueriesContext(connection) as ctx:
+            TurnoService.get_exploradores_por_jornada_rango(fecha_inicio, fecha_fin)
+        return len(ctx.captured_queries)
+
+    def test_consultas_constantes_con_rango_y_personal(self):
+        self._crear_exploradores(3)
+        base = self._contar_consultas('2025-03-11', '2025-03-11')
+        self.assertEqual(self._contar_consultas('2025-03-01', '2025-03-31'), base)
+
+        self._crear_exploradores(40)
+        self.assertEqual(self._contar_consultas('2025-03-01', '2025-03-31'), base)
+        self.assertEqual(self._contar_consultas('2025-01-01', '2025-12-31'), base)
+
+    def test_rango_coincide_con_consulta_por_dia(self):
+        self._crear_exploradores(6)
+        inicio = date(2025, 3, 8)
+        rango = TurnoService.get_exploradores_por_jornada_rango(str(inicio), str(inicio + timedelta(days=4)))
+        for i in range(5):
+            dia = str(inicio + timedelta(days=i))
+            self.assertEqual(rango[dia], TurnoService.get_exploradores_por_jornada(dia))
+        self.assertTrue(all(item['tipo'] == 'cambio' for item in rango['2025-03-10']['am']))
+
+    def test_api_turnos_por_mes(self):
+        self._crear_exploradores(4)
+        user = User.objects.create_user(username='calendario', password='x')
+        self.client.force_login(user)
+        response = self.client.get(
+            reverse('turnos_por_mes_api'), {'fecha_inicio': '2025-03-01', 'fecha_fin': '2025-03-31'}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data), 31)
+        self.assertEqual(len(data['2025-03-10']['am']) + len(data['2025-03-10']['pm']), 4)
+
+
+class CalendarioPersonalTest(TestCase):
+    """Calendario de Mis Turnos: un número fijo de consultas para cualquier rango"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        cls.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        cls.sala = Sala.objects.create(nombre='Acuario')
+        cls.user = User.objects.create_user(username='mis_turnos', password='x')
+        cls.empleado = Empleado.objects.create(
+            user=cls.user, nombre='Mis', apellido='Turnos', cedula='7001', email='mis@test.com'
+        )
+        AsignarJornadaExplorador.objects.create(
+            explorador=cls.empleado, jornada=cls.am, fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 3, 31)
+        )
+        AsignarSalaExplorador.objects.create(explorador=cls.empleado, sala=cls.sala, fecha_inicio=date(2025, 1, 1))
+        for dia in (3, 10, 17):
+            Turno.objects.create(
+                explorador=cls.empleado, fecha=date(2025, 3, dia), jornada=cls.pm, sala=cls.sala, tipo_cambio='CT'
+            )
+
+    def test_turno_manda_y_descanso_segun_jornada(self):
+        dias = CalendarioPersonal.construir(self.empleado, date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(len(dias), 31)
+        self.assertEqual(dias[date(2025, 3, 10)]['jornada'], 'PM')
+        self.assertEqual(dias[date(2025, 3, 10)]['tipo'], 'asignado')
+        self.assertTrue(dias[date(2025, 3, 10)]['es_cambio'])
+        self.assertEqual(dias[date(2025, 3, 11)]['jornada'], 'AM')
+        self.assertEqual(dias[date(2025, 3, 11)]['sala'], 'Acuario')
+        # AM descansa el sábado
+        self.assertEqual(dias[date(2025, 3, 15)]['jornada'], CalendarioPersonal.DESCANSO)
+        self.assertEqual(dias[date(2025, 3, 16)]['jornada'], 'AM')
+        # Vencida la asignación, sigue la última que empezó antes
+        abril = CalendarioPersonal.construir(self.empleado, date(2025, 4, 1), date(2025, 4, 7))
+        self.assertEqual(abril[date(2025, 4, 1)]['jornada'], 'AM')
+
+    def test_rango_meses(self):
+        self.assertEqual(CalendarioPersonal.rango_meses(2025, 1, 1), (date(2024, 12, 1), date(2025, 2, 28)))
+        self.assertEqual(CalendarioPersonal.rango_meses(2024, 12), (date(2024, 12, 1), date(2024, 12, 31)))
+        with self.assertRaises(ValueError):
+            CalendarioPersonal.rango_meses(2025, 13)
+
+    def test_consultas_constantes_con_el_rango(self):
+        def contar(inicio, fin):
+            with CaptureQueriesContext(connection) as ctx:
+                CalendarioPersonal.construir(self.empleado, inicio, fin)
+            return len(ctx.captured_queries)
+
+        base = contar(date(2025, 3, 1), date(2025, 3, 31))
+        self.assertEqual(contar(*CalendarioPersonal.rango_meses(2025, 2, 1)), base)
+        self.assertEqual(contar(*CalendarioPersonal.rango_meses(2025, 6, 6)), base + 1)
+
+    def test_api_con_adyacentes(self):
+        self.client.force_login(self.user)
+        url = reverse('mis_turnos_por_mes_api')
+        data = self.client.get(url, {'anio': '2025', 'mes': '03', 'adyacentes': '1'}).json()
+        self.assertEqual(len(data), 28 + 31 + 30)
+        self.assertEqual(data['2025-03-10'], {'jornada': 'PM', 'sala': 'Acuario', 'tipo': 'asignado', 'es_cambio': True})
+        self.assertEqual(len(self.client.get(url, {'anio': '2025', 'mes': '03'}).json()), 31)
+        self.assertEqual(self.client.get(url, {'anio': '2025', 'mes': '03', 'adyacentes': '9'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'anio': '2025', 'mes': '13'}).status_code, 400)
+
+
+class CalendarioCondicionalTest(TransactionTestCase):
+    """
+    ETag/Last-Modified y gzip de las APIs del calendario. TransactionTestCase: la versión del
+    roster se incrementa al confirmar la transacción.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        self.sala = Sala.objects.create(nombre='Acuario')
+        self.user = User.objects.create_user(username='condicional', password='x')
+        self.empleado = Empleado.objects.create(
+            user=self.user, nombre='Con', apellido='Dicional', cedula='7101', email='cond@test.com'
+        )
+        AsignarJornadaExplorador.objects.create(explorador=self.empleado, jornada=self.am, fecha_inicio=date(2025, 1, 1))
+        self.client.force_login(self.user)
+        self.url = reverse('turnos_por_mes_api')
+        self.parametros = {'fecha_inicio': '2025-03-01', 'fecha_fin': '2025-03-31'}
+
+    def test_304_hasta_que_cambia_el_roster(self):
+        response = self.client.get(self.url, self.parametros)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        # sesión, usuario y versión: el mes no se recalcula
+        self.assertEqual(len(consultas), 3)
+
+        Turno.objects.create(explorador=self.empleado, fecha=date(2025, 3, 10), jornada=self.am, sala=self.sala)
+        response = self.client.get(self.url, self.parametros, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_una_version_por_transaccion(self):
+        version, _ = RosterService.get_version()
+        with CaptureQueriesContext(connection) as consultas:
+            with transaction.atomic():
+                for dia in (3, 4, 5):
+                    Turno.objects.create(
+                        explorador=self.empleado, fecha=date(2025, 3, dia), jornada=self.am, sala=self.sala
+                    )
+                self.assertEqual(RosterService.get_version()[0], version)
+        self.assertEqual(RosterService.get_version()[0], version + 1)
+        self.assertEqual(sum('versionroster' in c['sql'] for c in consultas), 2)
+
+        # Una transacción revertida no incrementa ni impide incrementar a la siguiente
+        with transaction.atomic():
+            Turno.objects.create(explorador=self.empleado, fecha=date(2025, 3, 6), jornada=self.am, sala=self.sala)
+            transaction.set_rollback(True)
+        with transaction.atomic():
+            Turno.objects.create(explorador=self.empleado, fecha=date(2025, 3, 7), jornada=self.am, sala=self.sala)
+        self.assertEqual(RosterService.get_version()[0], version + 2)
+
+    def test_etag_por_usuario_y_gzip(self):
+        url = reverse('mis_turnos_por_mes_api')
+        parametros = {'anio': '2025', 'mes': '03', 'adyacentes': '1'}
+        response = self.client.get(url, parametros, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        otro = User.objects.create_user(username='condicional2', password='x')
+        Empleado.objects.create(user=otro, nombre='Otro', apellido='Usuario', cedula='7102', email='otro@test.com')
+        self.client.force_login(otro)
+        response_otro = self.client.get(url, parametros, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response_otro.status_code, 200)
+
+class FragmentosCalendarioTest(TransactionTestCase):
+    """Mis Turnos y turnos-por-mes salen de la caché hasta que cambia la versión del roster"""
+
+    def setUp(self):
+        cache.clear()
+        self.hoy = timezone.now().date()
+        self.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        self.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        self.sala = Sala.objects.create(nombre='Acuario')
+        self.user = User.objects.create_user(username='fragmentos', password='x')
+        self.empleado = Empleado.objects.create(
+            user=self.user, nombre='Frag', apellido='Mentos', cedula='7201', email='frag@test.com'
+        )
+        AsignarJornadaExplorador.objects.create(
+            explorador=self.empleado, jornada=self.am, fecha_inicio=date(2025, 1, 1)
+        )
+        self.admin = User.objects.create_user(username='fragmentos_admin', password='x', is_staff=True)
+
+    def _mis_turnos(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('mis_turnos'))
+        self.assertEqual(response.status_code, 200)
+        turnos = [c for c in consultas if 'turnos_turno' in c['sql']]
+        return response.content.decode(), turnos
+
+    def test_mis_turnos_desde_cache_hasta_que_el_admin_cambia_un_turno(self):
+        html, turnos = self._mis_turnos()
+        self.assertTrue(turnos)
+        html_cache, turnos = self._mis_turnos()
+        self.assertEqual(turnos, [])
+        self.assertEqual(html_cache, html)
+
+        self.client.force_login(self.admin)
+        self.client.post(reverse('turnos_create'), {
+            'explorador': self.empleado.id, 'fecha': self.hoy, 'jornada': self.pm.id, 'sala': self.sala.id,
+        })
+        self.assertTrue(Turno.objects.filter(explorador=self.empleado, fecha=self.hoy).exists())
+
+        html, turnos = self._mis_turnos()
+        self.assertTrue(turnos)
+        self.assertIn(f'"{self.hoy.isoformat()}": {{"jornada": "PM", "sala": "Acuario", "tipo": "asignado"', html)
+
+    def test_rango_compartido_hasta_cambio_en_transaccion(self):
+        url = reverse('turnos_por_mes_api')
+        parametros = {'fecha_inicio': '2025-03-01', 'fecha_fin': '2025-03-31'}
+        self.client.force_login(self.user)
+        self.client.get(url, parametros)
+
+        # Otro usuario, mismo rango: no recalcula
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as consultas:
+            data = self.client.get(url, parametros).json()
+        self.assertFalse(any('turnos_turno' in c['sql'] for c in consultas))
+        self.assertEqual(data['2025-03-10']['am'][0]['tipo'], 'oficial')
+
+        # Como en SolicitudFactory.aplicar_cambios: el cambio se ve al confirmar la transacción
+        with transaction.atomic():
+            Turno.objects.create(
+                explorador=self.empleado, fecha=date(2025, 3, 10), jornada=self.pm, sala=self.sala, tipo_cambio='CT'
+            )
+        data = self.client.get(url, parametros).json()
+        self.assertEqual(data['2025-03-10']['am'], [])
+        self.assertEqual(data['2025-03-10']['pm'][0]['tipo'], 'cambio')
+
+
+@override_settings(TURNOS_ROSTER_ACTIVO=True)
+class RosterDiaTest(TestCase):
+    """La tabla materializada debe coincidir siempre con el cálculo en vivo"""
+
+    def setUp(self):
+        self.hoy = timezone.now().date()
+        self.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        self.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        self.sala = Sala.objects.create(nombre='Acuario')
+        self.empleados = []
+        for i in range(4):
+            user = User.objects.create(username=f'roster{i}')
+            empleado = Empleado.objects.create(
+                user=user, nombre=f'Roster{i}', apellido='Prueba', cedula=str(2000 + i), email=f'r{i}@test.com'
+            )
+            AsignarJornadaExplorador.objects.create(
+                explorador=empleado, jornada=self.am if i % 2 else self.pm, fecha_inicio=self.hoy - timedelta(days=60)
+            )
+            self.empleados.append(empleado)
+
+    def _comparar_con_calculo_en_vivo(self, inicio, fin):
+        en_vivo = TurnoService.get_exploradores_por_jornada_rango(str(inicio), str(fin))
+        self.assertEqual(RosterService.get_exploradores_por_jornada_rango(inicio, fin), en_vivo)
+
+    def test_comando_reconstruye_rango(self):
+        RosterDia.objects.all().delete()
+        call_command('reconstruir_roster', desde=str(self.hoy), hasta=str(self.hoy + timedelta(days=9)), stdout=StringIO())
+        self.assertEqual(RosterDia.objects.count(), 4 * 10)
+        self._comparar_con_calculo_en_vivo(self.hoy, self.hoy + timedelta(days=9))
+
+    def test_senales_mantienen_roster_sincronizado(self):
+        fecha = self.hoy + timedelta(days=3)
+        turno = Turno.objects.create(
+            explorador=self.empleados[0], fecha=fecha, jornada=self.am, sala=self.sala, tipo_cambio='CT'
+        )
+        fila = RosterDia.objects.get(explorador=self.empleados[0], fecha=fecha)
+        self.assertEqual((fila.jornada, fila.origen), (self.am, 'cambio'))
+
+        turno.fecha = fecha + timedelta(days=1)
+        turno.save()
+        self.assertEqual(RosterDia.objects.get(explorador=self.empleados[0], fecha=fecha).origen, 'oficial')
+
+        turno.delete()
+        AsignarSalaExplorador.objects.create(explorador=self.empleados[1], sala=self.sala, fecha_inicio=self.hoy)
+        DiaEspecial.objects.create(fecha=fecha, tipo='festivo')
+        fila = RosterDia.objects.get(explorador=self.empleados[1], fecha=fecha)
+        self.assertEqual((fila.sala, fila.tipo_dia), (self.sala, 'festivo'))
+        self._comparar_con_calculo_en_vivo(self.hoy, self.hoy + timedelta(days=14))
+
+    def test_lectura_desde_roster_es_un_solo_range_scan(self):
+        inicio, fin = self.hoy, self.hoy + timedelta(days=30)
+        RosterService.reconstruir_horizonte()
+        # El rango construido (cacheado fuera de transacciones) y un range scan
+        with self.assertNumQueries(2):
+            TurnoService.get_exploradores_por_jornada_rango(str(inicio), str(fin))
+
+    def test_cubre_solo_el_rango_construido(self):
+        self.assertFalse(RosterService.cubre(self.hoy))
+        RosterService.reconstruir_horizonte()
+        self.assertTrue(RosterService.cubre(self.hoy, self.hoy + timedelta(days=30)))
+        # El comando diario se atrasó: los días nuevos del horizonte se resuelven en vivo
+        HorizonteRoster.objects.update(hasta=self.hoy + timedelta(days=10))
+        self.assertTrue(RosterService.cubre(self.hoy + timedelta(days=10)))
+        self.assertFalse(RosterService.cubre(self.hoy, self.hoy + timedelta(days=11)))
+
+    @override_settings(TURNOS_ROSTER_ACTIVO=False)
+    def test_inactivo_no_mantiene_roster(self):
+        RosterDia.objects.all().delete()
+        Turno.objects.create(
+            explorador=self.empleados[0], fecha=self.hoy, jornada=self.am, sala=self.sala, tipo_cambio='CT'
+        )
+        DiaEspecial.objects.create(fecha=self.hoy, tipo='festivo')
+        self.assertFalse(RosterDia.objects.exists())
+        self.assertFalse(RosterService.cubre(self.hoy))
+
+
+class JornadaCacheTest(TransactionTestCase):
+    """Las resoluciones se reutilizan y las señales las invalidan sin dejar respuestas viejas"""
+
+    def setUp(self):
+        cache.clear()
+        self.fecha = date(2025, 3, 10)
+        self.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        self.pm = Jornada.objects.create(nombre='PM', hora_inicio=time(14, 0), hora_fin=time(20, 0))
+        self.sala = Sala.objects.create(nombre='Acuario')
+        user = User.objects.create(username='cache')
+        self.empleado = Empleado.objects.create(
+            user=user, nombre='Cache', apellido='Prueba', cedula='3000', email='c@test.com'
+        )
+        self.asignacion = AsignarJornadaExplorador.objects.create(
+            explorador=self.empleado, jornada=self.am, fecha_inicio=date(2025, 1, 1)
+        )
+
+    def _jornada(self):
+        return SolicitudService.get_jornada_explorador_fecha(self.empleado.id, '2025-03-10')
+
+    def test_memo_por_peticion_e_invalidacion_por_turno(self):
+        with JornadaCache.alcance_peticion():
+            self.assertEqual(self._jornada(), self.am)
+            with self.assertNumQueries(0):
+                self.assertEqual(self._jornada(), self.am)
+            Turno.objects.create(
+                explorador=self.empleado, fecha=self.fecha, jornada=self.pm, sala=self.sala, tipo_cambio='CT'
+            )
+            self.assertEqual(self._jornada(), self.pm)
+
+    def test_cache_compartida_entre_peticiones(self):
+        self.assertEqual(self._jornada(), self.am)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._jornada(), self.am)
+
+        self.asignacion.jornada = self.pm
+        self.asignacion.save()
+        self.assertEqual(self._jornada(), self.pm)
+
+        turno = SolicitudService.get_turno_explorador(self.empleado.id, '2025-03-10')
+        self.assertEqual(turno['salas_competencia'], [])
+        CompetenciaEmpleado.objects.create(empleado=self.empleado, sala=self.sala)
+        turno = SolicitudService.get_turno_explorador(self.empleado.id, '2025-03-10')
+        self.assertEqual(turno['salas_competencia'], [{'id': self.sala.id, 'nombre': 'Acuario'}])
+
+
+class VigenciaAsignacionIndexTest(TestCase):
+    """'Asignación vigente en X' usa fecha_fin_efectiva y el índice compuesto"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.am = Jornada.objects.create(nombre='AM', hora_inicio=time(8, 0), hora_fin=time(14, 0))
+        users = User.objects.bulk_create([User(username=f'vigencia{i}') for i in range(200)])
+        empleados = Empleado.objects.bulk_create([
+            Empleado(user=u, nombre=f'Vigencia{i}', apellido='Prueba', cedula=str(4000 + i), email=f'v{i}@test.com')
+            for i, u in enumerate(users)
+        ])
+        asignaciones = []
+        for empleado in empleados:
+            # Cuatro intervalos cerrados de un trimestre y uno abierto desde 2025
+            for trimestre in range(4):
+                inicio = date(2024, 1 + trimestre * 3, 1)
+                asignaciones.append(AsignarJornadaExplorador(
+                    explorador=empleado, jornada=cls.am, fecha_inicio=inicio, fecha_fin=inicio + timedelta(days=89)
+                ))
+            asignaciones.append(AsignarJornadaExplorador(explorador=empleado, jornada=cls.am, fecha_inicio=date(2025, 1, 1)))
+        AsignarJornadaExplorador.objects.bulk_create(asignaciones)
+        cls.empleado = empleados[100]
+
+    def test_columna_generada_equivale_al_filtro_con_null(self):
+        for fecha in (date(2024, 2, 10), date(2024, 12, 31), date(2025, 6, 1), date(2030, 1, 1)):
+            base = AsignarJornadaExplorador.objects.filter(fecha_inicio__lte=fecha).order_by('id')
+            legado = base.filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=fecha))
+            self.assertEqual(list(base.filter(fecha_fin_efectiva__gte=fecha)), list(legado))
+
+    def test_plan_usa_indice_de_vigencia(self):
+        fecha = date(2025, 6, 1)
+        plan = AsignarJornadaExplorador.objects.filter(
+            explorador=self.empleado, fecha_inicio__lte=fecha, fecha_fin_efectiva__gte=fecha
+        ).explain()
+        self.assertIn('asig_jornada_vigencia_idx', plan)
+
+        salida = StringIO()
+        call_command('explicar_vigencia', fecha='2025-06-01', repeticiones=1, stdout=salida)
+        self.assertIn('fecha_fin_efectiva >=', salida.getvalue())
+
+
+class SeedLoadTest(TestCase):
+    """seed_load genera un conjunto reproducible y coherente, y lo borra con --limpiar"""
+
+    OPCIONES = dict(exploradores=10, anios=1, solicitudes=60, hasta='2025-06-30', sin_roster=True)
+
+    def _sembrar(self, **opciones):
+        call_command('seed_load', stdout=StringIO(), **{**self.OPCIONES, **opciones})
+
+    def _resumen(self):
+        return (
+            list(Empleado.objects.order_by('cedula').values_list('cedula', 'nombre', 'apellido', 'supervisor__cedula')),
+            list(Turno.objects.order_by('explorador__cedula', 'fecha').values_list('explorador__cedula', 'fecha', 'jornada__nombre')),
+            list(SolicitudCambio.objects.order_by('id').values_list('estado', 'fecha_solicitud', 'fecha_cambio_turno')),
+        )
+
+    def test_volumenes_y_coherencia(self):
+        self._sembrar()
+        self.assertEqual(Empleado.objects.count(), 11)
+        self.assertEqual(Turno.objects.count(), 10 * round(366 * 0.1))
+        self.assertEqual(SolicitudCambio.objects.count(), 60)
+        self.assertEqual(set(SolicitudCambio.objects.values_list('estado', flat=True)),
+                         {'pendiente', 'aprobada', 'rechazada', 'cancelada', 'pagada'})
+        # Asignaciones de jornada consecutivas y sin huecos: la última queda abierta
+        for explorador in Empleado.objects.all():
+            intervalos = list(AsignarJornadaExplorador.objects.filter(explorador=explorador).order_by('fecha_inicio'))
+            self.assertEqual(intervalos[0].fecha_inicio, date(2024, 6, 30))
+            self.assertIsNone(intervalos[-1].fecha_fin)
+            for anterior, siguiente in zip(intervalos, intervalos[1:]):
+                self.assertEqual(anterior.fecha_fin + timedelta(days=1), siguiente.fecha_inicio)
+        # Cada turno es un cambio a la jornada contraria a la oficial
+        turno = Turno.objects.select_related('jornada').first()
+        oficial = AsignarJornadaExplorador.objects.filter(
+            explorador_id=turno.explorador_id, fecha_inicio__lte=turno.fecha, fecha_fin_efectiva__gte=turno.fecha
+        ).get()
+        self.assertNotEqual(oficial.jornada_id, turno.jornada_id)
+        # Las notificaciones llevan la fecha de su solicitud
+        notificacion = Notificacion.objects.filter(tipo='solicitud_cambio').select_related('solicitud').first()
+        self.assertEqual(notificacion.fecha_creacion, notificacion.solicitud.fecha_solicitud)
+
+    def test_reproducible_y_limpiar(self):
+        self._sembrar()
+        primero = self._resumen()
+        with self.assertRaises(CommandError):
+            self._sembrar()
+        self._sembrar(limpiar=True)
+        self.assertEqual(self._resumen(), primero)
+
+        self._sembrar(solo_limpiar=True)
+        self.assertFalse(Empleado.objects.exists())
+        self.assertFalse(Notificacion.objects.exists())
+
+    def test_limpiar_con_solicitud_origen(self):
+        self._sembrar()
+        primera, *resto = SolicitudCambio.objects.order_by('id').values_list('id', flat=True)
+        SolicitudCambio.objects.filter(id__in=resto[:5]).update(solicitud_origen_id=primera)
+
+        tabla = SolicitudCambio._meta.db_table
+        with CaptureQueriesContext(connection) as ctx:
+            self._sembrar(solo_limpiar=True)
+        self.assertFalse(SolicitudCambio.objects.exists())
+        self.assertFalse(Empleado.objects.exists())
+        # MySQL rechaza un UPDATE o DELETE con una subconsulta sobre la misma tabla (error 1093)
+        for consulta in ctx.captured_queries:
+            escritura, _, filtro = consulta['sql'].partition('WHERE')
+            if escritura.startswith(('UPDATE', 'DELETE')) and tabla in escritura:
+                self.assertFalse('SELECT' in filtro and tabla in filtro, consulta['sql'])
@@ -2,15 +2,47 @@ from django.shortcuts import render
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView, View
 from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
 from empleados.views import AdminRequiredMixin
-from .models import Turno, DiaEspecial, AsignarSalaExplorador, AsignarJornadaExplorador
+from .models import Turno, DiaEspecial
 from .services.turno_service import TurnoService
-from datetime import datetime, timedelta
+from .services.calendario_cache import CalendarioCache
+from .services.calendario_personal import CalendarioPersonal, DatosMisTurnos
+from .services.roster_service import RosterService
 from django.utils import timezone
-import json
+import hashlib
 
 # Create your views here.
 
+# ===== GET condicional de las APIs del calendario =====
+# El ETag combina la versión del roster con el usuario y la URL completa: mientras nada
+# cambie, la navegación del calendario se responde con 304 sin recalcular el mes.
+
+def _version_roster(request):
+    """Una sola lectura de la versión por petición (la piden el ETag y el Last-Modified)"""
+    if not hasattr(request, '_version_roster'):
+        request._version_roster = RosterService.get_version()
+    return request._version_roster
+
+def _etag_roster(request, *args, **kwargs):
+    version, _ = _version_roster(request)
+    clave = f'{version}:{request.user.pk}:{request.get_full_path()}'
+    return hashlib.md5(clave.encode()).hexdigest()
+
+def _ultima_modificacion_roster(request, *args, **kwargs):
+    return _version_roster(request)[1]
+
+# gzip por fuera: comprime solo respuestas completas (un 304 no tiene cuerpo).
+# no-cache obliga al navegador a revalidar, con If-None-Match, cada vez que reusa el JSON.
+calendario_condicional = [
+    gzip_page,
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=_etag_roster, last_modified_func=_ultima_modificacion_roster),
+]
+
 class MisTurnosView(LoginRequiredMixin, TemplateView):
     template_name = 'turnos/mis_turnos.html'
     
@@ -20,146 +52,19 @@ class MisTurnosView(LoginRequiredMixin, TemplateView):
         if hasattr(self.request.user, 'empleado'):
             empleado = self.request.user.empleado
             fecha_actual = timezone.now().date()
-            
-            # Obtener fecha actual y calcular solo el mes actual (optimizado)
-            from datetime import timedelta
-            fecha_actual = timezone.now().date()
-            
-            # Calcular solo el mes actual para optimizar rendimiento
-            inicio_mes = fecha_actual.replace(day=1)
-            if fecha_actual.month == 12:
-                fin_mes = fecha_actual.replace(year=fecha_actual.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                fin_mes = fecha_actual.replace(month=fecha_actual.month + 1, day=1) - timedelta(days=1)
-            
-            # Calcular inicio y fin de la semana actual para el resumen semanal
-            inicio_semana = fecha_actual - timedelta(days=fecha_actual.weekday())
-            fin_semana = inicio_semana + timedelta(days=6)
-            
-            # Obtener turnos asignados solo para el mes actual (optimizado)
-            turnos_mes = Turno.objects.filter(
-                explorador=empleado,
-                fecha__gte=inicio_mes,
-                fecha__lte=fin_mes
-            ).order_by('fecha')
-            
-            # Obtener asignaciones de sala activas
-            from .models import AsignarSalaExplorador
-            asignaciones_activas = AsignarSalaExplorador.objects.filter(
-                explorador=empleado,
-                fecha_inicio__lte=fecha_actual,
-                fecha_fin__gte=fecha_actual
-            ).first()
-            
-            # Obtener jornada predeterminada del empleado
-            jornada_predeterminada = AsignarJornadaExplorador.objects.filter(
-                explorador=empleado
-            ).order_by('-fecha_inicio').first()
-            
-            # Crear estructura de datos solo para el mes actual (optimizado)
-            turnos_mes_dict = {}
-            for i in range((fin_mes - inicio_mes).days + 1):
-                fecha = inicio_mes + timedelta(days=i)
-                turno = turnos_mes.filter(fecha=fecha).first()
-                
-                if turno:
-                    # Hay turno asignado (puede ser cambio aprobado)
-                    turnos_mes_dict[fecha] = {
-                        'turno': turno,
-                        'jornada': turno.jornada.nombre,
-                        'sala': turno.sala.nombre,
-                        'tipo': 'asignado',
-                        'es_cambio': turno.tipo_cambio is not None
-                    }
-                else:
-                    # No hay turno asignado, usar jornada predeterminada
-                    if jornada_predeterminada:
-                        jornada_base = jornada_predeterminada.jornada.nombre
-                        
-                        # Aplicar regla de descanso según la jornada
-                        if jornada_base == "AM":
-                            # AM: descansan los sábados
-                            if fecha.weekday() == 5:  # Sábado
-                                jornada_nombre = "Descanso"
-                            else:
-                                jornada_nombre = jornada_base
-                        elif jornada_base == "PM":
-                            # PM: descansan los domingos
-                            if fecha.weekday() == 6:  # Domingo
-                                jornada_nombre = "Descanso"
-                            else:
-                                jornada_nombre = jornada_base
-                        else:
-                            jornada_nombre = jornada_base
-                    else:
-                        # Si no hay jornada configurada, usar PM por defecto
-                        jornada_nombre = "PM"
-                    
-                    # Intentar obtener sala de asignación activa
-                    sala_nombre = 'Por asignar'
-                    if asignaciones_activas:
-                        sala_nombre = asignaciones_activas.sala.nombre
-                    
-                    turnos_mes_dict[fecha] = {
-                        'turno': None,
-                        'jornada': jornada_nombre,
-                        'sala': sala_nombre,
-                        'tipo': 'predeterminado',
-                        'es_cambio': False
-                    }
-            
-            # Crear estructura de datos para la semana actual (resumen semanal)
-            semana_turnos = {}
-            for i in range(7):
-                fecha = inicio_semana + timedelta(days=i)
-                if fecha in turnos_mes_dict:
-                    semana_turnos[fecha] = turnos_mes_dict[fecha]
-                else:
-                    # Si la fecha no está en el mes actual, usar jornada predeterminada
-                    if jornada_predeterminada:
-                        jornada_base = jornada_predeterminada.jornada.nombre
-                        if jornada_base == "AM" and fecha.weekday() == 5:
-                            jornada_nombre = "Descanso"
-                        elif jornada_base == "PM" and fecha.weekday() == 6:
-                            jornada_nombre = "Descanso"
-                        else:
-                            jornada_nombre = jornada_base
-                    else:
-                        jornada_nombre = "PM"
-                    
-                    semana_turnos[fecha] = {
-                        'turno': None,
-                        'jornada': jornada_nombre,
-                        'sala': 'Por asignar',
-                        'tipo': 'predeterminado',
-                        'es_cambio': False
-                    }
-            
-            # Convertir fechas a strings para JSON (solo mes actual)
-            turnos_mes_json = {}
-            for fecha, info in turnos_mes_dict.items():
-                turnos_mes_json[fecha.strftime('%Y-%m-%d')] = {
-                    'jornada': info['jornada'],
-                    'sala': info['sala'],
-                    'tipo': info['tipo'],
-                    'es_cambio': info['es_cambio']
-                }
-            
-            # Convertir a string JSON válido
-            turnos_mes_json_str = json.dumps(turnos_mes_json)
+            # Perezoso: solo se calcula si algún fragmento de la plantilla no está en caché
+            calendario = DatosMisTurnos(empleado, fecha_actual)
             
             context.update({
                 'empleado': empleado,
                 'semana_actual': {
-                    'inicio': inicio_semana,
-                    'fin': fin_semana
+                    'inicio': calendario.inicio_semana,
+                    'fin': calendario.fin_semana
                 },
-                'semana_turnos': semana_turnos,
-                'turnos_mes': turnos_mes,
-                'turnos_mes_json_str': turnos_mes_json_str,
-                'asignaciones_activas': asignaciones_activas,
+                'calendario': calendario,
                 'fecha_actual': fecha_actual
             })
+        context.update(CalendarioCache.contexto_fragmentos(RosterService.get_version()[0]))
         
         return context
 
@@ -221,24 +126,32 @@ class DiaEspecialDeleteView(LoginRequiredMixin, AdminRequiredMixin, DeleteView):
 class TurnosCalendarioView(LoginRequiredMixin, TemplateView):
     template_name = 'turnos/turnos_calendario.html'
 
+@method_decorator(calendario_condicional, name='get')
 class TurnosPorDiaView(LoginRequiredMixin, View):
     def get(self, request):
         fecha = request.GET.get('fecha')
         if not fecha:
             return JsonResponse({'error': 'Debe seleccionar una fecha'}, status=400)
         data = TurnoService.get_exploradores_por_jornada(fecha)
-        # Serializar empleados (solo nombre y apellido)
-        am = [{'id': e.id, 'nombre': e.nombre, 'apellido': e.apellido} for e in data['am']]
-        pm = [{'id': e.id, 'nombre': e.nombre, 'apellido': e.apellido} for e in data['pm']]
-        return JsonResponse({'am': am, 'pm': pm})
+        # El servicio ya entrega dicts (id, nombre, apellido, tipo)
+        return JsonResponse({'am': data['am'], 'pm': data['pm']})
 
+@method_decorator(calendario_condicional, name='get')
 class TurnosPorMesView(LoginRequiredMixin, View):
     def get(self, request):
         fecha_inicio = request.GET.get('fecha_inicio')
         fecha_fin = request.GET.get('fecha_fin')
         if not fecha_inicio or not fecha_fin:
             return JsonResponse({'error': 'Debe enviar fecha_inicio y fecha_fin'}, status=400)
-        data = TurnoService.get_exploradores_por_jornada_rango(fecha_inicio, fecha_fin)
+        version, _ = _version_roster(request)
+        serializado = CalendarioCache.obtener_rango(
+            version, fecha_inicio[:10], fecha_fin[:10],
+            lambda: TurnosPorMesView._serializar(TurnoService.get_exploradores_por_jornada_rango(fecha_inicio, fecha_fin))
+        )
+        return JsonResponse(serializado)
+
+    @staticmethod
+    def _serializar(data):
         # Serializar empleados (ya son dicts)
         serializado = {}
         for dia, grupos in data.items():
@@ -246,79 +159,35 @@ class TurnosPorMesView(LoginRequiredMixin, View):
                 'am': grupos['am'],
                 'pm': grupos['pm'],
             }
-        return JsonResponse(serializado)
+        return serializado
 
+@method_decorator(calendario_condicional, name='get')
 class MisTurnosPorMesView(LoginRequiredMixin, View):
-    """Vista para obtener jornadas de un mes específico (cálculo dinámico)"""
+    """
+    Jornadas del usuario para un mes ({'YYYY-MM-DD': {...}}). Con adyacentes=N incluye
+    también los N meses anteriores y siguientes en la misma respuesta.
+    """
     
     def get(self, request):
         if not hasattr(request.user, 'empleado'):
             return JsonResponse({'error': 'Usuario no es empleado'}, status=400)
         
-        empleado = request.user.empleado
-        mes = request.GET.get('mes')  # formato: '2025-08'
+        mes = request.GET.get('mes')  # formato: '08'
         anio = request.GET.get('anio')  # formato: '2025'
         
         if not mes or not anio:
             return JsonResponse({'error': 'Debe enviar mes y anio'}, status=400)
         
         try:
-            # Calcular inicio y fin del mes solicitado
-            fecha_inicio = datetime.strptime(f"{anio}-{mes}-01", "%Y-%m-%d").date()
-            if int(mes) == 12:
-                fecha_fin = datetime.strptime(f"{int(anio)+1}-01-01", "%Y-%m-%d").date() - timedelta(days=1)
-            else:
-                fecha_fin = datetime.strptime(f"{anio}-{int(mes)+1:02d}-01", "%Y-%m-%d").date() - timedelta(days=1)
-            
-            # Obtener turnos del mes solicitado
-            turnos_mes = Turno.objects.filter(
-                explorador=empleado,
-                fecha__gte=fecha_inicio,
-                fecha__lte=fecha_fin
-            ).order_by('fecha')
-            
-            # Obtener jornada predeterminada
-            jornada_predeterminada = AsignarJornadaExplorador.objects.filter(
-                explorador=empleado
-            ).order_by('-fecha_inicio').first()
-            
-            # Crear estructura de datos para el mes
-            turnos_mes_dict = {}
-            for i in range((fecha_fin - fecha_inicio).days + 1):
-                fecha = fecha_inicio + timedelta(days=i)
-                turno = turnos_mes.filter(fecha=fecha).first()
-                
-                if turno:
-                    turnos_mes_dict[fecha.strftime('%Y-%m-%d')] = {
-                        'jornada': turno.jornada.nombre,
-                        'sala': turno.sala.nombre,
-                        'tipo': 'asignado',
-                        'es_cambio': turno.tipo_cambio is not None
-                    }
-                else:
-                    # Usar jornada predeterminada
-                    if jornada_predeterminada:
-                        jornada_base = jornada_predeterminada.jornada.nombre
-                        if jornada_base == "AM" and fecha.weekday() == 5:
-                            jornada_nombre = "Descanso"
-                        elif jornada_base == "PM" and fecha.weekday() == 6:
-                            jornada_nombre = "Descanso"
-                        else:
-                            jornada_nombre = jornada_base
-                    else:
-                        jornada_nombre = "PM"
-                    
-                    turnos_mes_dict[fecha.strftime('%Y-%m-%d')] = {
-                        'jornada': jornada_nombre,
-                        'sala': 'Por asignar',
-                        'tipo': 'predeterminado',
-                        'es_cambio': False
-                    }
-            
-            return JsonResponse(turnos_mes_dict)
-            
-        except Exception as e:
+            adyacentes = int(request.GET.get('adyacentes', 0))
+            if not 0 <= adyacentes <= CalendarioPersonal.MAXIMO_ADYACENTES:
+                raise ValueError(f'adyacentes debe estar entre 0 y {CalendarioPersonal.MAXIMO_ADYACENTES}')
+            fecha_inicio, fecha_fin = CalendarioPersonal.rango_meses(int(anio), int(mes), adyacentes)
+        except ValueError as e:
             return JsonResponse({'error': f'Error al procesar fechas: {str(e)}'}, status=400)
+        
+        dias = CalendarioPersonal.construir(request.user.empleado, fecha_inicio, fecha_fin)
+        return JsonResponse(CalendarioPersonal.a_json(dias))
 
 # Vista solo visualización para Consultas Rápidas
 class DiaEspecialVisualizarListView(LoginRequiredMixin, ListView):